@@ -0,0 +1,137 @@
+"""
+Import-time profile of the server entry point, and a cold-start regression check.
+
+Imports src/<app>/main.py in a fresh interpreter under `python -X importtime`,
+the way the container starts, and reports the slowest imports. Fails (exit 1)
+if start-up imports something that must stay deferred until the agent tree
+is built (see conversational_agent/__init__.py), or if importing main takes
+longer than --budget-ms.
+
+Usage:
+    python benchmarks/bench_import_time.py [--app solo|host] [--repeat 3] [--top 15]
+        [--budget-ms 0] [--record benchmarks/results/import_time.jsonl]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules built or initialized with the agent tree; none may be imported by main itself
+DEFERRED_MODULES = (
+    "conversational_agent.agent",
+    "conversational_agent.adk_agents",
+    "conversational_agent.tools.firebase_client",
+    "firebase_admin",
+)
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _profile_import(app: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) for every module imported by main."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=REPO_ROOT / "src" / app, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ Importing src/{app}/main.py failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def _main_children(imports: List[Tuple[str, int, int, int]]) -> List[Tuple[str, int, int, int]]:
+    """The imports made directly by main (importtime lists children before their parent)."""
+    main_index = next(i for i, (module, _, _, depth) in enumerate(imports) if module == "main" and depth == 0)
+    children = []
+    for entry in reversed(imports[:main_index]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            children.append(entry)
+    return children
+
+
+def _deferred_violations(imports: List[Tuple[str, int, int, int]]) -> List[str]:
+    return sorted({
+        module for module, _, _, _ in imports
+        if any(module == name or module.startswith(name + ".") for name in DEFERRED_MODULES)
+    })
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", choices=["solo", "host"], default="solo")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to profile; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=0.0, help="fail if importing main takes longer; 0 disables")
+    parser.add_argument("--record", type=Path, help="append the summary as a JSON line to this file")
+    args = parser.parse_args()
+
+    runs = [_profile_import(args.app) for _ in range(max(1, args.repeat))]
+    totals = [next(cumulative for module, _, cumulative, depth in run if module == "main" and depth == 0) for run in runs]
+    imports = runs[totals.index(min(totals))]
+    total_ms = min(totals) / 1000.0
+    children = _main_children(imports)
+    app_ms = sum(cumulative for module, _, cumulative, _ in children if module.startswith("conversational_agent")) / 1000.0
+
+    print(f"Import time of src/{args.app}/main.py (best of {len(runs)}): {total_ms:.0f} ms, "
+          f"{len(imports)} modules, conversational_agent {app_ms:.0f} ms")
+    print("\nSlowest imports, self time (ms):")
+    for module, self_us, cumulative, _ in sorted(imports, key=lambda i: i[1], reverse=True)[:args.top]:
+        print(f"  {module:<60} {self_us / 1000.0:8.1f}  (cumulative {cumulative / 1000.0:.1f})")
+    print("\nImports made by main, cumulative (ms):")
+    for module, _, cumulative, _ in sorted(children, key=lambda i: i[2], reverse=True)[:args.top]:
+        print(f"  {module:<60} {cumulative / 1000.0:8.1f}")
+
+    violations = _deferred_violations(imports)
+    over_budget = args.budget_ms > 0 and total_ms > args.budget_ms
+
+    if args.record:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "app": args.app,
+            "total_ms": round(total_ms, 1),
+            "app_ms": round(app_ms, 1),
+            "modules": len(imports),
+            "deferred_violations": violations,
+        }
+        args.record.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    if violations:
+        print(f"\n❌ Imported at start-up, but must wait for the agent tree: {violations}")
+    if over_budget:
+        print(f"\n❌ Import took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if violations or over_budget:
+        sys.exit(1)
+    print("\n✅ Agent tree stays out of start-up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+End-to-end latency benchmark for the search -> enrich -> recommend pipeline.
+
+Runs SequentialSearchAgent followed by FinalReviewAgent against a recorded
+scenario (benchmarks/fixtures/*.json) with every external dependency replaced
+by a local stand-in with a fixed, configurable latency:
+
+- Gemini         -> stubs/scripted_llm.py, replaying the fixture's llm_scripts
+- Google Maps MCP -> stubs/fake_maps_mcp.py, started via MAPS_MCP_COMMAND
+- Yelp / Foursquare / BestTime -> stubs/api_server.py, via *_API_BASE_URL
+
+so the numbers reflect the pipeline's own structure (sequencing, fan-out,
+pooling, caching) rather than third-party variance. Reports p50/p95/p99 per
+pipeline stage, per agent, per model and tool call, and end to end.
+
+By default every iteration starts cold (response caches and the entity index
+cleared); --warm keeps them, measuring the repeat-query path instead.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--app solo|host] [--iterations 20] [--warm]
+        [--llm-latency-ms 400] [--api-latency-ms 80] [--mcp-latency-ms 100]
+        [--record benchmarks/results/pipeline.jsonl]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.stubs.api_server import ApiStubServer  # noqa: E402
+
+DEFAULT_FIXTURE = REPO_ROOT / "benchmarks" / "fixtures" / "mission_group_dinner.json"
+PERCENTILES = (50, 95, 99)
+
+
+def _configure_environment(args: argparse.Namespace, api_base_url: str) -> None:
+    """Point the app at the stand-ins; must run before conversational_agent is imported."""
+    os.environ.update({
+        "YELP_API_BASE_URL": api_base_url,
+        "FOURSQUARE_API_BASE_URL": api_base_url,
+        "BESTTIME_API_BASE_URL": api_base_url,
+        "MAPS_MCP_COMMAND": shlex.join([sys.executable, str(REPO_ROOT / "benchmarks" / "stubs" / "fake_maps_mcp.py"), str(args.fixture)]),
+        "BENCH_MCP_LATENCY_MS": str(args.mcp_latency_ms),
+        "YELP_API_KEY": "bench",
+        "FOURSQUARE_API_KEY": "bench",
+        "BESTTIME_API_KEY": "bench",
+        "GOOGLE_MAPS_API_KEY": "bench",
+        # Keep caches in memory so runs never read or pollute a real cache file
+        "CACHE_DB_PATH": "",
+        "ENTITY_INDEX_DB_PATH": "",
+        "QUOTA_DB_PATH": "",
+    })
+    if not args.with_rate_limits:
+        for provider in ("YELP", "FSQ", "BESTTIME"):
+            os.environ[f"{provider}_RATE_LIMIT_QPS"] = "0"
+            os.environ[f"{provider}_DAILY_QUOTA"] = "0"
+
+
+# ===================================================================
+# TIMING
+# ===================================================================
+
+class PipelineTimer:
+    """Agent, model and tool callbacks recording how long each step of an invocation takes."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[tuple, float] = {}
+        self._current: Dict[str, float] = defaultdict(float)
+
+    def _start(self, key: tuple) -> None:
+        self._started[key] = time.perf_counter()
+
+    def _stop(self, key: tuple, label: str) -> None:
+        started = self._started.pop(key, None)
+        if started is not None:
+            self._current[label] += (time.perf_counter() - started) * 1000.0
+
+    def before_agent(self, callback_context):
+        self._start(("agent", callback_context.invocation_id, callback_context.agent_name))
+
+    def after_agent(self, callback_context):
+        name = callback_context.agent_name
+        self._stop(("agent", callback_context.invocation_id, name), f"agent:{name}")
+
+    def before_model(self, callback_context, llm_request):
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name))
+
+    def after_model(self, callback_context, llm_response):
+        name = callback_context.agent_name
+        self._stop(("model", callback_context.invocation_id, name), f"model:{name}")
+
+    def before_tool(self, tool, args, tool_context):
+        self._start(("tool", tool_context.function_call_id))
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        self._stop(("tool", tool_context.function_call_id), f"tool:{tool.name}")
+
+    def finish_iteration(self, total_ms: float) -> None:
+        """Record this iteration's totals (model and tool time summed over all calls)."""
+        self._current["end_to_end"] = total_ms
+        for label, value in self._current.items():
+            self.samples[label].append(value)
+        self.discard_iteration()
+
+    def discard_iteration(self) -> None:
+        self._current = defaultdict(float)
+        self._started.clear()
+
+
+def _prepend(agent, attribute: str, callback) -> None:
+    existing = getattr(agent, attribute)
+    if existing is None:
+        existing = []
+    elif not isinstance(existing, list):
+        existing = [existing]
+    setattr(agent, attribute, [callback] + existing)
+
+
+def _walk(agent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+    writer_agent = getattr(agent, "writer_agent", None)
+    if writer_agent is not None and writer_agent not in agent.sub_agents:
+        yield from _walk(writer_agent)
+
+
+def _instrument(agents, fixture: Dict[str, Any], timer: PipelineTimer, llm_latency_s: float) -> None:
+    """Swap every LlmAgent's model for a ScriptedLlm and attach the timing callbacks."""
+    from google.adk.agents import LlmAgent
+
+    from benchmarks.stubs.scripted_llm import ScriptedLlm
+
+    for root in agents:
+        for agent in _walk(root):
+            _prepend(agent, "before_agent_callback", timer.before_agent)
+            _prepend(agent, "after_agent_callback", timer.after_agent)
+            if not isinstance(agent, LlmAgent):
+                continue
+            script = fixture["llm_scripts"].get(agent.name)
+            if script is None:
+                sys.exit(f"❌ Fixture has no llm_scripts entry for {agent.name}")
+            agent.model = ScriptedLlm(
+                agent_name=agent.name, script=script, outputs=fixture["outputs"], latency_s=llm_latency_s
+            )
+            _prepend(agent, "before_model_callback", timer.before_model)
+            _prepend(agent, "after_model_callback", timer.after_model)
+            _prepend(agent, "before_tool_callback", timer.before_tool)
+            _prepend(agent, "after_tool_callback", timer.after_tool)
+
+
+# ===================================================================
+# RUN
+# ===================================================================
+
+async def _run(args: argparse.Namespace, fixture: Dict[str, Any]) -> Dict[str, Any]:
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from conversational_agent.agent import final_review_agent, sequential_search_agent
+    from conversational_agent.tools.entity_index import get_entity_index
+    from conversational_agent.tools.http_client import close_http_client
+    from conversational_agent.tools.maps_mcp_pool import maps_mcp_pool
+    from conversational_agent.tools.ttl_cache import clear_all_caches
+
+    timer = PipelineTimer()
+    _instrument([sequential_search_agent, final_review_agent], fixture, timer, args.llm_latency_ms / 1000.0)
+    stages = [f"agent:{a.name}" for a in sequential_search_agent.sub_agents] + [f"agent:{final_review_agent.name}"]
+
+    pipeline = SequentialAgent(name="BenchmarkPipeline", sub_agents=[sequential_search_agent, final_review_agent])
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="forkcast_bench", agent=pipeline, session_service=session_service)
+    message = types.Content(role="user", parts=[types.Part(text="Find restaurants for my group.")])
+    query_details = json.dumps(fixture["query_details"])
+
+    await maps_mcp_pool.warm_up()
+    failures = 0
+    try:
+        for iteration in range(args.warmup + args.iterations):
+            if not args.warm:
+                clear_all_caches()
+                get_entity_index().clear()
+            session = await session_service.create_session(
+                app_name="forkcast_bench", user_id="bench", state={"query_details": query_details}
+            )
+            started = time.perf_counter()
+            async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+                pass
+            total_ms = (time.perf_counter() - started) * 1000.0
+
+            session = await session_service.get_session(app_name="forkcast_bench", user_id="bench", session_id=session.id)
+            final_results = json.loads(session.state.get("final_results") or "{}")
+            recommendations = (final_results.get("final_results") or {}).get("recommendations") or []
+            if not recommendations:
+                failures += 1
+            if iteration < args.warmup:
+                timer.discard_iteration()
+                continue
+            timer.finish_iteration(total_ms)
+            print(f"  iteration {iteration - args.warmup + 1}/{args.iterations}: {total_ms:.0f} ms, "
+                  f"{len(recommendations)} recommendations")
+    finally:
+        await maps_mcp_pool.close()
+        await close_http_client()
+
+    return {"samples": timer.samples, "stages": stages, "failures": failures}
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(values, PERCENTILES)
+    return {"n": len(values), "mean": float(np.mean(values)), "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def _print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    if not rows:
+        return
+    width = max(len(name) for name in rows) + 2
+    print(f"\n{title}")
+    print(f"  {'':<{width}}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}")
+    for name, s in rows.items():
+        print(f"  {name:<{width}}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['mean']:>10.1f}")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", choices=["solo", "host"], default="solo")
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed iterations run first")
+    parser.add_argument("--warm", action="store_true", help="keep caches between iterations")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--api-latency-ms", type=float, default=80.0)
+    parser.add_argument("--mcp-latency-ms", type=float, default=100.0)
+    parser.add_argument("--with-rate-limits", action="store_true", help="keep the configured provider rate limits")
+    parser.add_argument("--record", type=Path, help="append the summary as a JSON line to this file")
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    api_server = ApiStubServer(fixture, args.api_latency_ms / 1000.0).start()
+    _configure_environment(args, api_server.base_url)
+    sys.path.insert(0, str(REPO_ROOT / "src" / args.app))
+
+    print(f"Benchmarking {args.app} pipeline on {args.fixture.name} "
+          f"({args.iterations} iterations, {'warm' if args.warm else 'cold'} caches)")
+    try:
+        result = asyncio.run(_run(args, fixture))
+    finally:
+        api_server.stop()
+
+    samples = result["samples"]
+    summary = {label: _summarize(values) for label, values in sorted(samples.items())}
+    _print_table("Pipeline stages (ms)", {s[len("agent:"):]: summary[s] for s in result["stages"] if s in summary})
+    _print_table("Agents (ms)", {k[len("agent:"):]: v for k, v in summary.items() if k.startswith("agent:")})
+    _print_table("Model time per agent, all calls (ms)", {k[len("model:"):]: v for k, v in summary.items() if k.startswith("model:")})
+    _print_table("Tool time per tool, all calls (ms)", {k[len("tool:"):]: v for k, v in summary.items() if k.startswith("tool:")})
+    _print_table("End to end (ms)", {"pipeline": summary["end_to_end"]})
+    print(f"\nAPI stub requests: {dict(api_server.request_counts)}")
+    if result["failures"]:
+        print(f"⚠️ {result['failures']} iteration(s) produced no recommendations")
+
+    if args.record:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "app": args.app,
+            "fixture": args.fixture.name,
+            "cache": "warm" if args.warm else "cold",
+            "latency_ms": {"llm": args.llm_latency_ms, "api": args.api_latency_ms, "mcp": args.mcp_latency_ms},
+            "failures": result["failures"],
+            "results": summary,
+        }
+        args.record.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"✅ Recorded results to {args.record}")
+
+
+if __name__ == "__main__":
+    main()
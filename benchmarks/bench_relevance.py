@@ -0,0 +1,119 @@
+"""
+Micro-benchmark for callback.is_restaurant_relevant.
+
+Compares the precompiled classifier against the previous implementation,
+which rebuilt the keyword set and re-scanned the text once per keyword on
+every call, and checks both classify every message identically.
+
+Usage:
+    python benchmarks/bench_relevance.py [--app solo|host|guest] [--number 2000]
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import timeit
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MESSAGES = [
+    "hi",
+    "hello there",
+    "yes please",
+    "6 people",
+    "what's the weather like tomorrow",
+    "asdf",
+    "!!!???",
+    "aaaaaaa",
+    "find me cheap thai food near downtown",
+    "we are a group of six looking for a quiet place in the mission district tonight with vegan options",
+    "my stock portfolio and crypto investments are down, any advice",
+    "can you recommend a romantic italian restaurant with outdoor seating for our anniversary on friday",
+    "i need help with my python homework assignment about sorting algorithms",
+    "somewhere within 2 miles of 94107 that takes reservations",
+    "tell me about the history of the roman empire and its emperors in great detail please",
+    "show me some options for places that are good for a business lunch around union square",
+    "xqzv " * 20,
+]
+
+
+def _load_callback_module(app: str):
+    """Load <app>/conversational_agent/callback.py without importing the agent package."""
+    path = REPO_ROOT / "src" / app / "conversational_agent" / "callback.py"
+    spec = importlib.util.spec_from_file_location("relevance_callback", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _make_legacy_classifier(callback):
+    """The pre-compilation classifier: every call rebuilds its keyword set and scans once per keyword."""
+
+    def count_food_keywords(text):
+        food_keywords = set(callback._FOOD_KEYWORDS)
+        return sum(1 for word in food_keywords if word in text)
+
+    def is_obviously_irrelevant(text):
+        return any(re.search(pattern, text) for pattern in list(callback._IRRELEVANT_PATTERNS))
+
+    def contains_location_patterns(text):
+        return any(re.search(pattern, text) for pattern in list(callback._LOCATION_PATTERNS))
+
+    def contains_recommendation_request(text):
+        return any(re.search(pattern, text, re.IGNORECASE) for pattern in list(callback._RECOMMENDATION_PATTERNS))
+
+    def is_restaurant_relevant(user_input):
+        if not user_input:
+            return False
+        text = user_input.lower().strip()
+        if len(text) < 3:
+            return False
+        if is_obviously_irrelevant(text):
+            if count_food_keywords(text) < 1:
+                return False
+        food_word_count = count_food_keywords(text)
+        location_match = contains_location_patterns(text)
+        word_count = len(text.split())
+        if word_count <= 3:
+            return food_word_count >= 1
+        elif word_count <= 10:
+            return food_word_count >= 1 or location_match
+        else:
+            return food_word_count >= 1 or location_match or contains_recommendation_request(text)
+
+    return is_restaurant_relevant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default="solo", choices=["solo", "host", "guest"])
+    parser.add_argument("--number", type=int, default=2000, help="Passes over the message corpus per timing")
+    args = parser.parse_args()
+
+    callback = _load_callback_module(args.app)
+    legacy = _make_legacy_classifier(callback)
+    compiled = callback.is_restaurant_relevant
+
+    mismatches = [m for m in MESSAGES if legacy(m) != compiled(m)]
+    if mismatches:
+        print(f"❌ Classifiers disagree on: {mismatches}")
+        sys.exit(1)
+
+    def run(classifier):
+        for message in MESSAGES:
+            classifier(message)
+
+    calls = args.number * len(MESSAGES)
+    legacy_s = min(timeit.repeat(lambda: run(legacy), number=args.number, repeat=3))
+    compiled_s = min(timeit.repeat(lambda: run(compiled), number=args.number, repeat=3))
+
+    print(f"Messages: {len(MESSAGES)} ({sum(map(compiled, MESSAGES))} relevant), {calls} calls per run")
+    print(f"legacy:   {legacy_s / calls * 1e6:8.2f} µs/message")
+    print(f"compiled: {compiled_s / calls * 1e6:8.2f} µs/message")
+    print(f"speedup:  {legacy_s / compiled_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
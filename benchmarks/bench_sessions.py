@@ -0,0 +1,210 @@
+"""
+Concurrency benchmark for the SQLite session store.
+
+Runs --workers processes against one SQLite file, the way several uvicorn
+workers share sessions.db. Each worker plays --sessions conversations of
+--turns turns. A turn reads the session (get_session) and appends
+--events-per-turn events carrying a state delta, which is what the runner
+does per invocation: tool responses, then the answer. Every run compares
+ADK's plain DatabaseSessionService (rollback journal, default pool) with the
+tuned SqliteSessionService from tools/session_store.py (WAL,
+synchronous=NORMAL, mmap, sized pool). `--stores default,tuned,firestore`
+adds the FirestoreSessionService from tools/firestore_session_service.py,
+against the emulator named by FIRESTORE_EMULATOR_HOST
+(`gcloud emulators firestore start`).
+
+Reports throughput, p50/p95/p99 per operation, failed operations
+("database is locked") and the final file size (database + WAL).
+
+Usage:
+    python benchmarks/bench_sessions.py [--app solo|host] [--workers 8] [--sessions 4] [--turns 10]
+        [--events-per-turn 6] [--state-kb 4] [--stores default,tuned]
+        [--record benchmarks/results/sessions.jsonl]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PERCENTILES = (50, 95, 99)
+STORES = ("default", "tuned", "firestore")
+APP_NAME = "bench"
+
+
+def _create_service(store: str, db_url: str):
+    if store == "firestore":
+        from conversational_agent.tools.firestore_session_service import FirestoreSessionService
+        return FirestoreSessionService(root_collection=db_url)
+    if store == "tuned":
+        from conversational_agent.tools.session_store import SqliteSessionService
+        return SqliteSessionService(db_url)
+    from google.adk.sessions.database_session_service import DatabaseSessionService
+    return DatabaseSessionService(db_url)
+
+
+async def _play(args: Dict[str, Any], worker: int) -> Dict[str, Any]:
+    from google.adk.events import Event, EventActions
+    from google.genai import types
+
+    service = _create_service(args["store"], args["db_url"])
+    samples: Dict[str, List[float]] = {"get_session": [], "append_event": []}
+    errors = 0
+    payload = "x" * (args["state_kb"] * 1024)
+
+    # Start together, so the workers really contend
+    await asyncio.sleep(max(0.0, args["start_at"] - time.time()))
+    for s in range(args["sessions"]):
+        session = await service.create_session(app_name=APP_NAME, user_id=f"user-{worker}")
+        for turn in range(args["turns"]):
+            started = time.perf_counter()
+            try:
+                session = await service.get_session(app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+                samples["get_session"].append((time.perf_counter() - started) * 1000.0)
+            except Exception:
+                errors += 1
+                continue
+            for e in range(args["events_per_turn"]):
+                # Tool responses carrying state deltas, then the turn's answer
+                if e < args["events_per_turn"] - 1:
+                    part = types.Part(function_response=types.FunctionResponse(name=f"tool_{e}", response={"turn": turn}))
+                else:
+                    part = types.Part(text=f"answer of turn {turn}")
+                event = Event(
+                    author="BenchmarkAgent",
+                    invocation_id=f"turn-{turn}",
+                    content=types.Content(role="model", parts=[part]),
+                    actions=EventActions(state_delta={f"key_{e}": payload}),
+                )
+                started = time.perf_counter()
+                try:
+                    await service.append_event(session, event)
+                    samples["append_event"].append((time.perf_counter() - started) * 1000.0)
+                except Exception:
+                    errors += 1
+    if hasattr(service, "close"):
+        await service.close()
+    return {"samples": samples, "errors": errors}
+
+
+def _worker(args: Dict[str, Any], worker: int) -> Dict[str, Any]:
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, str(REPO_ROOT / "src" / args["app"]))
+    started = time.time()
+    result = asyncio.run(_play(args, worker))
+    result["elapsed_s"] = time.time() - max(started, args["start_at"])
+    return result
+
+
+def _run_store(args: argparse.Namespace, store: str, directory: Path) -> Dict[str, Any]:
+    db_path = directory / f"{store}.db"
+    db_url = f"bench_sessions_{int(time.time())}" if store == "firestore" else f"sqlite:///{db_path}"
+    worker_args = {
+        "app": args.app, "store": store, "db_url": db_url,
+        "sessions": args.sessions, "turns": args.turns, "events_per_turn": args.events_per_turn,
+        "state_kb": args.state_kb,
+    }
+    if store != "firestore":
+        # Create the schema and the app's state row once; ADK's create_session races on both
+        sys.path.insert(0, str(REPO_ROOT / "src" / args.app))
+        service = _create_service(store, db_url)
+        asyncio.run(service.create_session(app_name=APP_NAME, user_id="setup"))
+        service.db_engine.dispose()
+
+    worker_args["start_at"] = time.time() + 3.0
+    with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+        results = pool.starmap(_worker, [(worker_args, w) for w in range(args.workers)])
+
+    samples = {op: [v for r in results for v in r["samples"][op]] for op in ("get_session", "append_event")}
+    elapsed_s = max(r["elapsed_s"] for r in results)
+    operations = sum(len(v) for v in samples.values())
+    size_bytes = sum(p.stat().st_size for p in directory.glob(f"{store}.db*"))
+    return {
+        "ops_per_s": operations / elapsed_s if elapsed_s else 0.0,
+        "elapsed_s": elapsed_s,
+        "errors": sum(r["errors"] for r in results),
+        "size_mb": size_bytes / 1e6,
+        "latency_ms": {op: _summarize(values) for op, values in samples.items()},
+    }
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary["mean"] = float(np.mean(values))
+    summary["n"] = len(values)
+    return summary
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", choices=["solo", "host"], default="solo")
+    parser.add_argument("--workers", type=int, default=8, help="processes sharing the database file")
+    parser.add_argument("--sessions", type=int, default=4, help="conversations per worker")
+    parser.add_argument("--turns", type=int, default=10, help="turns per conversation")
+    parser.add_argument("--events-per-turn", type=int, default=6)
+    parser.add_argument("--state-kb", type=int, default=4, help="size of each state delta value")
+    parser.add_argument("--stores", default="default,tuned", help=f"comma-separated, from {','.join(STORES)}")
+    parser.add_argument("--record", type=Path, help="append the summary as a JSON line to this file")
+    args = parser.parse_args()
+    stores = [store.strip() for store in args.stores.split(",") if store.strip()]
+    unknown = [store for store in stores if store not in STORES]
+    if unknown:
+        parser.error(f"unknown stores: {unknown}")
+    if "firestore" in stores and not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        parser.error("the firestore store needs FIRESTORE_EMULATOR_HOST (gcloud emulators firestore start)")
+
+    print(f"Session store benchmark: {args.workers} workers x {args.sessions} sessions x {args.turns} turns, "
+          f"{args.events_per_turn} events/turn, {args.state_kb} KB state deltas")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for store in stores:
+            results[store] = _run_store(args, store, Path(directory))
+
+    print(f"\n{'':<10}{'ops/s':>10}{'errors':>8}{'size MB':>9}   "
+          + "".join(f"{op + ' ' + label:>22}" for op in ("get_session", "append_event") for label in ("p50", "p99")))
+    for store, result in results.items():
+        latency = result["latency_ms"]
+        print(f"{store:<10}{result['ops_per_s']:>10.0f}{result['errors']:>8}{result['size_mb']:>9.1f}   "
+              + "".join(f"{latency[op].get(label, float('nan')):>22.1f}" for op in ("get_session", "append_event") for label in ("p50", "p99")))
+
+    if args.record:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "app": args.app,
+            "workload": {
+                "workers": args.workers, "sessions": args.sessions, "turns": args.turns,
+                "events_per_turn": args.events_per_turn, "state_kb": args.state_kb,
+            },
+            "results": results,
+        }
+        args.record.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Local stand-ins for the external services the agent pipeline calls (see bench_pipeline.py)."""
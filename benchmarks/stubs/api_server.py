@@ -0,0 +1,142 @@
+"""
+Stub Yelp Fusion, Foursquare Places and BestTime APIs served from a recorded fixture.
+
+Implements only the endpoints Forkcast calls, with the same paths and
+response shapes, plus a fixed per-request delay standing in for network and
+API latency. Runs in a background thread inside the benchmark, or on its own:
+
+    python benchmarks/stubs/api_server.py benchmarks/fixtures/mission_group_dinner.json --port 8099
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_YELP_BUSINESS_RE = re.compile(r"^/v3/businesses/(?P<id>[^/]+)$")
+_FSQ_PLACE_RE = re.compile(r"^/v3/places/(?P<id>[^/]+)$")
+
+
+def _by_lower_name(entries: Dict[str, Any]) -> Dict[str, Any]:
+    return {name.strip().lower(): value for name, value in entries.items()}
+
+
+class ApiStubServer:
+    """Serves the fixture's `yelp`, `fsq` and `besttime` sections over HTTP."""
+
+    def __init__(self, fixture: Dict[str, Any], latency_s: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_s = latency_s
+        self.request_counts: Counter = Counter()
+        self._yelp_search = _by_lower_name(fixture["yelp"]["search"])
+        self._yelp_businesses = {b["id"]: b for results in self._yelp_search.values() for b in results}
+        self._fsq_search = _by_lower_name(fixture["fsq"]["search"])
+        self._fsq_places = {p["fsq_id"]: p for results in self._fsq_search.values() for p in results}
+        self._forecasts = _by_lower_name(fixture["besttime"]["forecasts"])
+        self._forecasts_by_id = {f["venue_info"]["venue_id"]: f for f in self._forecasts.values()}
+        self._live = fixture["besttime"]["live"]
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ApiStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="api-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ===================================================================
+    # ROUTES
+    # ===================================================================
+
+    def _route(self, method: str, path: str, query: Dict[str, str]) -> Tuple[str, int, Any]:
+        if method == "GET" and path == "/v3/businesses/search":
+            return "yelp.search", 200, {"businesses": self._yelp_search.get(query.get("term", "").lower(), [])}
+        match = _YELP_BUSINESS_RE.match(path)
+        if method == "GET" and match:
+            business = self._yelp_businesses.get(match["id"])
+            return "yelp.business", (200 if business else 404), business or {"error": {"code": "BUSINESS_NOT_FOUND"}}
+        if method == "GET" and path == "/v3/places/search":
+            return "fsq.search", 200, {"results": self._fsq_search.get(query.get("query", "").lower(), [])}
+        match = _FSQ_PLACE_RE.match(path)
+        if method == "GET" and match:
+            place = self._fsq_places.get(match["id"])
+            return "fsq.place", (200 if place else 404), place or {"message": "Place not found"}
+        if method == "POST" and path == "/api/v1/forecasts":
+            forecast = self._find_forecast(query)
+            return "besttime.forecast", (200 if forecast else 404), forecast or {"status": "Error", "message": "Venue not found"}
+        if method == "POST" and path == "/api/v1/forecasts/live":
+            forecast = self._find_forecast(query)
+            live = self._live.get(forecast["venue_info"]["venue_id"]) if forecast else None
+            return "besttime.live", (200 if live else 404), live or {"status": "Error", "message": "Venue not found"}
+        return "unknown", 404, {"error": f"No stub for {method} {path}"}
+
+    def _find_forecast(self, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        if query.get("venue_id"):
+            return self._forecasts_by_id.get(query["venue_id"])
+        return self._forecasts.get(query.get("venue_name", "").strip().lower())
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        if length:
+            handler.rfile.read(length)
+        url = urlparse(handler.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        route, status, payload = self._route(method, url.path, query)
+        self.request_counts[route] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        body = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub Yelp / Foursquare / BestTime APIs from a fixture.")
+    parser.add_argument("fixture")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as f:
+        server = ApiStubServer(json.load(f), args.latency_ms / 1000.0, port=args.port)
+    print(f"Serving stub APIs on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Stand-in Google Maps MCP server answering from a recorded fixture.
+
+Speaks MCP over stdio like @modelcontextprotocol/server-google-maps and
+returns the same JSON-text tool results. Started through MAPS_MCP_COMMAND:
+
+    MAPS_MCP_COMMAND="python benchmarks/stubs/fake_maps_mcp.py <fixture.json>"
+
+BENCH_MCP_LATENCY_MS adds a fixed delay to every tool call.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+with open(sys.argv[1], encoding="utf-8") as f:
+    _MAPS = json.load(f)["maps"]
+_SEARCH = {query.lower(): places for query, places in _MAPS["search"].items()}
+_LATENCY_S = float(os.getenv("BENCH_MCP_LATENCY_MS", "0")) / 1000.0
+
+mcp = FastMCP("fake-google-maps")
+
+
+async def _respond(payload: Any) -> str:
+    if _LATENCY_S:
+        await asyncio.sleep(_LATENCY_S)
+    return json.dumps(payload, ensure_ascii=False)
+
+
+@mcp.tool()
+async def maps_search_places(query: str, location: Optional[Dict[str, float]] = None, radius: Optional[float] = None) -> str:
+    """Search for places using Google Places API"""
+    # Unrecorded queries get the first recorded result set, so scripted agents never come back empty
+    places = _SEARCH.get(query.strip().lower()) or next(iter(_SEARCH.values()), [])
+    return await _respond({"places": places})
+
+
+@mcp.tool()
+async def maps_place_details(place_id: str) -> str:
+    """Get detailed information about a specific place"""
+    details = _MAPS["details"].get(place_id)
+    if details is None:
+        return await _respond({"error": f"Place details request failed: NOT_FOUND ({place_id})"})
+    return await _respond(details)
+
+
+if __name__ == "__main__":
+    mcp.run()
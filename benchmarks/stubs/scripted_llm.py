@@ -0,0 +1,79 @@
+"""
+Deterministic stand-in for Gemini that replays a recorded script per agent.
+
+Each agent's script is a list of turns from the fixture's `llm_scripts`:
+
+    {"calls": [{"name": "maps_place_details", "args": {"place_id": "{place_id}"}}],
+     "for_each_place": true}          # one call per place in outputs.search_results
+    {"text_from": "google_reviews_data"}   # final answer: outputs[key] as JSON text
+
+The current turn is recovered from the ids of the function responses already
+in the request, so the model holds no per-invocation state and one instance
+can serve concurrent invocations. A fixed delay per call stands in for model
+latency.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+_CALL_ID_RE = re.compile(r"^bench-(?P<agent>.+)-(?P<turn>\d+)-\d+$")
+
+
+def _fill(template: Any, place: Dict[str, Any]) -> Any:
+    if isinstance(template, str):
+        return template.format_map({k: v for k, v in place.items() if isinstance(v, (str, int, float))})
+    if isinstance(template, dict):
+        return {k: _fill(v, place) for k, v in template.items()}
+    return template
+
+
+class ScriptedLlm(BaseLlm):
+    """Replays `script` for one agent, answering from the fixture's recorded outputs."""
+
+    model: str = "scripted"
+    agent_name: str
+    script: List[Dict[str, Any]]
+    outputs: Dict[str, Any]
+    latency_s: float = 0.0
+
+    def _turn(self, llm_request: LlmRequest) -> int:
+        """Index of the next turn: one past the latest turn whose function responses are in the history."""
+        turn = 0
+        for content in llm_request.contents or []:
+            for part in content.parts or []:
+                response = part.function_response
+                match = _CALL_ID_RE.match(response.id or "") if response else None
+                if match and match["agent"] == self.agent_name:
+                    turn = max(turn, int(match["turn"]) + 1)
+        return min(turn, len(self.script) - 1)
+
+    def _parts(self, turn: int) -> List[types.Part]:
+        step = self.script[turn]
+        if "text_from" in step:
+            text = json.dumps(self.outputs[step["text_from"]], separators=(",", ":"), ensure_ascii=False)
+            return [types.Part(text=text)]
+
+        places = self.outputs["search_results"] if step.get("for_each_place") else [{}]
+        parts = []
+        for place in places:
+            for call in step["calls"]:
+                call_id = f"bench-{self.agent_name}-{turn}-{len(parts)}"
+                parts.append(types.Part(function_call=types.FunctionCall(
+                    id=call_id, name=call["name"], args=_fill(call["args"], place)
+                )))
+        return parts
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        parts = self._parts(self._turn(llm_request))
+        yield LlmResponse(content=types.Content(role="model", parts=parts))
@@ -195,10 +195,10 @@ Author: Forkcast Team
 """
 
 import re
-from typing import Optional, List, Set
+from typing import Iterable, Optional, List
 
-from google.adk.callback import CallbackContext
-from google.adk import types
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
 
 
 # ===================================================================
@@ -296,33 +296,27 @@ def is_restaurant_relevant(user_input: str) -> bool:
     if len(text) < 3:
         return False
     
-    # Check for obvious irrelevant patterns first
-    if _is_obviously_irrelevant(text):
-        # But give benefit of doubt if it also contains food keywords
-        food_word_count = _count_food_keywords(text)
-        if food_word_count < 1:
-            return False
+    # Check for food/restaurant keywords (one scan over the text)
+    has_food_keyword = _contains_food_keyword(text)
     
-    # Check for food/restaurant keywords
-    food_word_count = _count_food_keywords(text)
-    
-    # Check for location patterns
-    location_match = _contains_location_patterns(text)
+    # Obviously irrelevant text is rejected, unless it also mentions food
+    if not has_food_keyword and _is_obviously_irrelevant(text):
+        return False
     
     # Determine relevance based on multiple factors
     word_count = len(text.split())
     
     # Short messages need stronger food relevance
     if word_count <= 3:
-        return food_word_count >= 1
+        return has_food_keyword
     
     # Medium messages need some food relevance or location context
     elif word_count <= 10:
-        return food_word_count >= 1 or location_match
+        return has_food_keyword or _contains_location_patterns(text)
     
     # Longer messages can be relevant with less strict requirements
     else:
-        return food_word_count >= 1 or location_match or _contains_recommendation_request(text)
+        return has_food_keyword or _contains_location_patterns(text) or _contains_recommendation_request(text)
 
 
 # ===================================================================
@@ -333,13 +327,10 @@ def _extract_user_input(callback_context: CallbackContext, current_state: dict)
     """Extract user input from callback context or state."""
     user_input = ""
     
-    # Try to get from messages first
-    if hasattr(callback_context, 'messages') and callback_context.messages:
-        # Get the last user message
-        for message in reversed(callback_context.messages):
-            if message.role == "user" and message.parts:
-                user_input = message.parts[0].text if message.parts[0].text else ""
-                break
+    # Try the message that started this invocation first
+    user_content = callback_context.user_content
+    if user_content and user_content.role == "user" and user_content.parts:
+        user_input = user_content.parts[0].text or ""
     
     # If no user input found, check state for current input
     if not user_input and "current_user_input" in current_state:
@@ -359,111 +350,140 @@ def _get_redirection_message() -> str:
     )
 
 
-def _get_food_keywords() -> Set[str]:
-    """Get the comprehensive set of food and restaurant related keywords."""
-    return {
-        # Food types and cuisines
-        'food', 'eat', 'hungry', 'restaurant', 'cafe', 'dine', 'dining', 'meal', 'lunch', 'dinner', 
-        'breakfast', 'brunch', 'snack', 'cuisine', 'dish', 'menu', 'order', 'delivery', 'takeout',
-        'italian', 'chinese', 'mexican', 'indian', 'thai', 'japanese', 'american', 'french', 
-        'mediterranean', 'asian', 'european', 'latin', 'african', 'korean', 'vietnamese',
-        'greek', 'turkish', 'lebanese', 'persian', 'moroccan', 'ethiopian', 'brazilian',
-        
-        # Food items
-        'pizza', 'burger', 'pasta', 'sushi', 'tacos', 'sandwich', 'salad', 'soup', 'steak', 
-        'chicken', 'seafood', 'vegetarian', 'vegan', 'dessert', 'drinks', 'coffee', 'tea',
-        'burrito', 'quesadilla', 'ramen', 'pho', 'curry', 'noodles', 'rice', 'bread',
-        'fish', 'beef', 'pork', 'lamb', 'shrimp', 'lobster', 'crab', 'oyster',
-        
-        # Dining preferences and attributes
-        'cheap', 'expensive', 'budget', 'fancy', 'casual', 'formal', 'fast', 'slow', 'romantic',
-        'family', 'kids', 'date', 'group', 'business', 'quiet', 'loud', 'outdoor', 'indoor',
-        'reservation', 'booking', 'table', 'bar', 'patio', 'terrace', 'rooftop', 'cozy',
-        'upscale', 'fine dining', 'fast food', 'street food', 'food truck', 'buffet',
-        
-        # Location and logistics
-        'near', 'nearby', 'close', 'around', 'location', 'address', 'directions', 'distance',
-        'walk', 'drive', 'uber', 'delivery', 'pickup', 'open', 'hours', 'closed',
-        'downtown', 'uptown', 'neighborhood', 'area', 'district', 'zone',
-        
-        # Restaurant features
-        'rating', 'review', 'recommend', 'good', 'best', 'popular', 'favorite', 'new', 'trendy',
-        'authentic', 'fresh', 'quality', 'service', 'atmosphere', 'ambiance', 'vibe',
-        'clean', 'busy', 'crowded', 'empty', 'wait time', 'reservation', 'book',
-        
-        # Dietary requirements
-        'gluten', 'dairy', 'nuts', 'allergy', 'kosher', 'halal', 'organic', 'healthy', 'diet',
-        'lactose', 'celiac', 'paleo', 'keto', 'low carb', 'sugar free', 'fat free',
-        
-        # Common greetings/conversation starters that might be relevant
-        'hello', 'hi', 'hey', 'morning', 'afternoon', 'evening', 'hungry', 'craving', 'want', 'need',
-        'looking', 'search', 'find', 'help', 'suggest', 'recommend', 'advice', 'opinion',
-        
-        # Restaurant types
-        'bistro', 'pub', 'gastropub', 'tavern', 'grill', 'steakhouse', 'diner', 'bakery',
-        'pizzeria', 'taqueria', 'sushi bar', 'wine bar', 'cocktail bar', 'lounge',
-        'food court', 'market', 'delicatessen', 'deli', 'cafeteria', 'brewery'
-    }
-
-
-def _get_irrelevant_patterns() -> List[str]:
-    """Get regex patterns for obviously irrelevant content."""
-    return [
-        r'\b(weather|news|sports|politics|science|technology|programming|code|math|history)\b',
-        r'\b(cat|dog|pet|animal|car|house|movie|book|game|music|song)\b',
-        r'\b(job|work|career|school|study|homework|assignment)\b',
-        r'\b(health|doctor|medicine|symptom|sick|pain|ache)\b',
-        r'\b(stock|investment|money|bank|finance|crypto|bitcoin)\b',
-        r'^\s*(test|testing|hello world|123|abc|xyz|asdf|qwerty)\s*$',  # Common test inputs
-        r'^\s*[!@#$%^&*()_+=\[\]{}|;:,.<>?]+\s*$',  # Only special characters
-        r'^(.)\1{4,}$',  # Repeated characters (aaaaa, 11111, etc.)
-        r'\b(shopping|clothing|fashion|shoes|makeup|beauty)\b',
-        r'\b(travel|vacation|hotel|flight|airline|ticket)\b',
-        r'\b(love|relationship|dating|marriage|family drama)\b'
-    ]
-
-
-def _get_location_patterns() -> List[str]:
-    """Get regex patterns for location-related content."""
-    return [
-        r'\b(in|near|around|at|by)\s+[a-zA-Z\s]+\b',  # "in downtown", "near me", etc.
-        r'\b\d+\s*(mile|km|block|min|minute)s?\b',      # Distance references
-        r'\b(downtown|uptown|city|suburb|mall|plaza|street|avenue|boulevard)\b',
-        r'\b(zip|zipcode|postal|area code)\b',
-        r'\b\d{5}(-\d{4})?\b',  # ZIP codes
-        r'\b[A-Z]{2}\s+\d{5}\b'  # State + ZIP
-    ]
-
-
-def _count_food_keywords(text: str) -> int:
-    """Count food-related keywords in the text."""
-    food_keywords = _get_food_keywords()
-    return sum(1 for word in food_keywords if word in text)
+# ===================================================================
+# COMPILED MATCHERS
+# ===================================================================
+# Built once at import so the callback can run on every turn: the keyword set
+# becomes a single prefix-trie regex, and each pattern group one alternation.
+
+_FOOD_KEYWORDS = frozenset({
+    # Food types and cuisines
+    'food', 'eat', 'hungry', 'restaurant', 'cafe', 'dine', 'dining', 'meal', 'lunch', 'dinner', 
+    'breakfast', 'brunch', 'snack', 'cuisine', 'dish', 'menu', 'order', 'delivery', 'takeout',
+    'italian', 'chinese', 'mexican', 'indian', 'thai', 'japanese', 'american', 'french', 
+    'mediterranean', 'asian', 'european', 'latin', 'african', 'korean', 'vietnamese',
+    'greek', 'turkish', 'lebanese', 'persian', 'moroccan', 'ethiopian', 'brazilian',
+    
+    # Food items
+    'pizza', 'burger', 'pasta', 'sushi', 'tacos', 'sandwich', 'salad', 'soup', 'steak', 
+    'chicken', 'seafood', 'vegetarian', 'vegan', 'dessert', 'drinks', 'coffee', 'tea',
+    'burrito', 'quesadilla', 'ramen', 'pho', 'curry', 'noodles', 'rice', 'bread',
+    'fish', 'beef', 'pork', 'lamb', 'shrimp', 'lobster', 'crab', 'oyster',
+    
+    # Dining preferences and attributes
+    'cheap', 'expensive', 'budget', 'fancy', 'casual', 'formal', 'fast', 'slow', 'romantic',
+    'family', 'kids', 'date', 'group', 'business', 'quiet', 'loud', 'outdoor', 'indoor',
+    'reservation', 'booking', 'table', 'bar', 'patio', 'terrace', 'rooftop', 'cozy',
+    'upscale', 'fine dining', 'fast food', 'street food', 'food truck', 'buffet',
+    
+    # Location and logistics
+    'near', 'nearby', 'close', 'around', 'location', 'address', 'directions', 'distance',
+    'walk', 'drive', 'uber', 'delivery', 'pickup', 'open', 'hours', 'closed',
+    'downtown', 'uptown', 'neighborhood', 'area', 'district', 'zone',
+    
+    # Restaurant features
+    'rating', 'review', 'recommend', 'good', 'best', 'popular', 'favorite', 'new', 'trendy',
+    'authentic', 'fresh', 'quality', 'service', 'atmosphere', 'ambiance', 'vibe',
+    'clean', 'busy', 'crowded', 'empty', 'wait time', 'reservation', 'book',
+    
+    # Dietary requirements
+    'gluten', 'dairy', 'nuts', 'allergy', 'kosher', 'halal', 'organic', 'healthy', 'diet',
+    'lactose', 'celiac', 'paleo', 'keto', 'low carb', 'sugar free', 'fat free',
+    
+    # Common greetings/conversation starters that might be relevant
+    'hello', 'hi', 'hey', 'morning', 'afternoon', 'evening', 'hungry', 'craving', 'want', 'need',
+    'looking', 'search', 'find', 'help', 'suggest', 'recommend', 'advice', 'opinion',
+    
+    # Restaurant types
+    'bistro', 'pub', 'gastropub', 'tavern', 'grill', 'steakhouse', 'diner', 'bakery',
+    'pizzeria', 'taqueria', 'sushi bar', 'wine bar', 'cocktail bar', 'lounge',
+    'food court', 'market', 'delicatessen', 'deli', 'cafeteria', 'brewery'
+})
+
+_IRRELEVANT_PATTERNS = [
+    r'\b(weather|news|sports|politics|science|technology|programming|code|math|history)\b',
+    r'\b(cat|dog|pet|animal|car|house|movie|book|game|music|song)\b',
+    r'\b(job|work|career|school|study|homework|assignment)\b',
+    r'\b(health|doctor|medicine|symptom|sick|pain|ache)\b',
+    r'\b(stock|investment|money|bank|finance|crypto|bitcoin)\b',
+    r'^\s*(test|testing|hello world|123|abc|xyz|asdf|qwerty)\s*$',  # Common test inputs
+    r'^\s*[!@#$%^&*()_+=\[\]{}|;:,.<>?]+\s*$',  # Only special characters
+    r'^(?P<repeated>.)(?P=repeated){4,}$',  # Repeated characters (aaaaa, 11111, etc.)
+    r'\b(shopping|clothing|fashion|shoes|makeup|beauty)\b',
+    r'\b(travel|vacation|hotel|flight|airline|ticket)\b',
+    r'\b(love|relationship|dating|marriage|family drama)\b'
+]
+
+_LOCATION_PATTERNS = [
+    r'\b(in|near|around|at|by)\s+[a-zA-Z\s]+\b',  # "in downtown", "near me", etc.
+    r'\b\d+\s*(mile|km|block|min|minute)s?\b',      # Distance references
+    r'\b(downtown|uptown|city|suburb|mall|plaza|street|avenue|boulevard)\b',
+    r'\b(zip|zipcode|postal|area code)\b',
+    r'\b\d{5}(-\d{4})?\b',  # ZIP codes
+    r'\b[A-Z]{2}\s+\d{5}\b'  # State + ZIP
+]
+
+_RECOMMENDATION_PATTERNS = [
+    r'\b(what|where|which|how|can you|could you|would you)\b.*\b(recommend|suggest|good|best|find)\b',
+    r'\b(i want|i need|i\'m looking|looking for|help me)\b',
+    r'\b(any suggestions|any recommendations|what do you think)\b',
+    r'\b(show me|tell me|give me)\b.*\b(options|choices|places)\b'
+]
+
+
+def _keyword_trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex matching any of the keywords, with shared prefixes factored out.
+
+    A flat 'a|b|c' alternation retries every keyword at every position; the
+    trie form lets the regex engine discard most of them after one character.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a keyword
+
+    def render(node: dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A keyword ends here, so the rest is optional
+            body = f'(?:{body})?'
+        return body
+
+    return render(trie)
+
+
+def _compile_any(patterns: List[str], flags: int = 0) -> re.Pattern:
+    """Combine patterns into one regex that matches wherever any of them would."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+_FOOD_KEYWORD_RE = re.compile(_keyword_trie_pattern(_FOOD_KEYWORDS))
+_IRRELEVANT_RE = _compile_any(_IRRELEVANT_PATTERNS)
+_LOCATION_RE = _compile_any(_LOCATION_PATTERNS)
+_RECOMMENDATION_RE = _compile_any(_RECOMMENDATION_PATTERNS, re.IGNORECASE)
+
+
+def _contains_food_keyword(text: str) -> bool:
+    """Check if any food-related keyword occurs in the text."""
+    return _FOOD_KEYWORD_RE.search(text) is not None
 
 
 def _is_obviously_irrelevant(text: str) -> bool:
     """Check if text matches obviously irrelevant patterns."""
-    irrelevant_patterns = _get_irrelevant_patterns()
-    
-    for pattern in irrelevant_patterns:
-        if re.search(pattern, text):
-            return True
-    return False
+    return _IRRELEVANT_RE.search(text) is not None
 
 
 def _contains_location_patterns(text: str) -> bool:
     """Check if text contains location-related patterns."""
-    location_patterns = _get_location_patterns()
-    return any(re.search(pattern, text) for pattern in location_patterns)
+    return _LOCATION_RE.search(text) is not None
 
 
 def _contains_recommendation_request(text: str) -> bool:
     """Check if the text contains questions that could be about recommendations."""
-    question_patterns = [
-        r'\b(what|where|which|how|can you|could you|would you)\b.*\b(recommend|suggest|good|best|find)\b',
-        r'\b(i want|i need|i\'m looking|looking for|help me)\b',
-        r'\b(any suggestions|any recommendations|what do you think)\b',
-        r'\b(show me|tell me|give me)\b.*\b(options|choices|places)\b'
-    ]
-    
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in question_patterns)
+    return _RECOMMENDATION_RE.search(text) is not None
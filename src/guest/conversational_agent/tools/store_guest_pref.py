@@ -2,10 +2,10 @@
 import json
 import logging
 import os
-from datetime import datetime
 from typing import Dict, Any, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore as admin_firestore
+from google.api_core.exceptions import NotFound
 
 logger = logging.getLogger(__name__)
 
@@ -114,33 +114,34 @@ def upload_preferences(query_details: str, party_code: str, user_id: str) -> Dic
             }
         user_preferences = preferences_data.get('preferences', {})
         
-        # CHECK: Verify party exists first
         party_ref = db.collection('parties').document(party_code)
-        party_doc = party_ref.get()
-        
-        if not party_doc.exists:
-            return {
-                "success": False,
-                "message": f"Party {party_code} not found. Please check the party code."
-            }
         
         # Create guest document reference
         guest_ref = party_ref.collection('guests').document(user_id)
         
-        # Upload guest data
-        guest_ref.set({
+        # Guest upload and party status change commit atomically in one RPC. The
+        # party update doubles as the existence check: it fails with NotFound for
+        # an unknown party code, and then the guest document isn't written either.
+        batch = db.batch()
+        batch.set(guest_ref, {
             'preferences': user_preferences,
             'user_id': user_id,
             'uploaded_at': admin_firestore.SERVER_TIMESTAMP,
             'status': 'submitted'
         })
-        
-        # Update party status (safe because we verified it exists)
-        party_ref.update({
+        batch.update(party_ref, {
             'last_updated': admin_firestore.SERVER_TIMESTAMP,
             'status': 'collecting_preferences'
         })
         
+        try:
+            batch.commit()
+        except NotFound:
+            return {
+                "success": False,
+                "message": f"Party {party_code} not found. Please check the party code."
+            }
+        
         logger.info(f"✅ Preferences uploaded for user {user_id} to party {party_code}")
         
         return {
@@ -161,6 +161,8 @@ For EACH restaurant, follow this optimized approach:
 **If forecast fails, try alternative search:**
 - Simplify venue_name (remove "Restaurant", "Cafe", etc.)
 - Simplify venue_address (remove suite numbers, apt details)
+- Exception: if the response has `"quota_exhausted": true`, do NOT retry. Mark that restaurant
+  "failed" with null data fields and move on to the next one.
 
 **Second: Get Live Data** 
 2. If forecast succeeded and returned venue_id:
@@ -0,0 +1,58 @@
+# adk_agents/code_enrichment_agent.py
+"""
+Base class for enrichment stages that run as plain Python instead of an LLM.
+
+Subclasses implement `enrich()`; the base agent reads `search_results` from
+session state and writes the result to `output_key` as compact JSON (see
+tools/state_compaction.py), exactly
+like an LlmAgent with an output_key would, so it can sit in
+ParallelEnrichmentAgent next to LLM-driven agents.
+"""
+
+import logging
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from conversational_agent.tools.enrichment_utils import get_search_results
+from conversational_agent.tools.state_compaction import compact_state_json
+
+logger = logging.getLogger(__name__)
+
+
+class CodeEnrichmentAgent(BaseAgent):
+    """Deterministic enrichment agent writing its result to `output_key`."""
+
+    output_key: str
+    """Session state key the enrichment JSON is stored under."""
+
+    async def enrich(self, places: List[Dict[str, Any]], state: Dict[str, Any]) -> Any:
+        """
+        Enrich the restaurants found by LocationSearchAgent.
+
+        Args:
+            places: Parsed `search_results` entries.
+            state: Read-only view of the session state.
+
+        Returns:
+            A JSON-serializable value stored under `output_key`.
+        """
+        raise NotImplementedError
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        places = get_search_results(state)
+        result = await self.enrich(places, state)
+        output = compact_state_json(result)
+        logger.info(f"✅ {self.name} enriched {len(places)} restaurants")
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=output)]),
+            actions=EventActions(state_delta={self.output_key: output}),
+        )
@@ -0,0 +1,245 @@
+# adk_agents/deadline_parallel_agent.py
+"""
+ParallelAgent whose branches have deadlines.
+
+ADK's ParallelAgent only finishes when its slowest sub-agent does, so one slow
+BestTime forecast or stuck MCP call holds up the whole search. Here each
+branch gets `branch_timeout_s` (overridable per sub-agent), and no branch
+runs past `deadline_s` after the agent started. A branch that misses its
+deadline is cut off and a placeholder with null fields is written to its
+`output_key` instead, the same shape its agent writes for an unmatched
+restaurant, so FinalReviewAgent ranks without that source.
+
+With `attach_late_results` a cut-off branch is not cancelled: it keeps
+running in the background and its state delta (including the real output)
+is kept for the root session. The search runs inside AgentTool's throwaway
+session, so the root agent's `merge_late_results` before-agent callback
+merges the delta into the root session on its next turn, replacing the
+placeholder for later turns to use. Late results are kept in process, per
+root session, and dropped once a newer search starts for that session.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Set, Tuple
+
+from google.adk.agents import BaseAgent, ParallelAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.parallel_agent import _create_branch_ctx_for_sub_agent
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from conversational_agent.config.settings import (
+    ENRICHMENT_ATTACH_LATE_RESULTS,
+    ENRICHMENT_BRANCH_TIMEOUT_S,
+    ENRICHMENT_DEADLINE_S,
+)
+from conversational_agent.tools.enrichment_utils import dump_state_json, get_search_results
+from conversational_agent.tools.telemetry import record_branch_timeout
+
+logger = logging.getLogger(__name__)
+
+# Builds a branch's placeholder output from the parsed search_results
+PlaceholderFactory = Callable[[List[Dict[str, Any]]], Any]
+
+# Background tasks for cut-off branches, referenced so they are not garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# ===================================================================
+# LATE RESULTS
+# ===================================================================
+
+# (app_name, user_id, session_id) of a root session
+SessionKey = Tuple[str, str, str]
+
+# Root session of the running invocation, set by merge_late_results; like the
+# progress channel, it is inherited down through AgentTools and parallel branches
+_root_session: contextvars.ContextVar[Optional[SessionKey]] = contextvars.ContextVar("root_session", default=None)
+
+# Root session -> (invocation id of its latest search, late state delta not merged yet)
+_late_results: "OrderedDict[SessionKey, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+LATE_RESULTS_MAX_SESSIONS = 1024
+
+
+def merge_late_results(callback_context: CallbackContext) -> None:
+    """Before-agent callback for the root agent: merge late branch outputs into its session."""
+    session = callback_context._invocation_context.session
+    key = (session.app_name, session.user_id, session.id)
+    _root_session.set(key)
+    entry = _late_results.get(key)
+    if entry and entry[1]:
+        late = dict(entry[1])
+        entry[1].clear()
+        callback_context.state.update(late)
+        logger.info(f"✅ Merged late results into session {session.id}: {sorted(late)}")
+
+
+def _start_search(search_id: str) -> Optional[SessionKey]:
+    """Register a new search for the root session, superseding late results of earlier ones."""
+    key = _root_session.get()
+    if key is not None:
+        _late_results[key] = (search_id, {})
+        _late_results.move_to_end(key)
+        while len(_late_results) > LATE_RESULTS_MAX_SESSIONS:
+            _late_results.popitem(last=False)
+    return key
+
+
+def _keep_late_delta(key: SessionKey, search_id: str, state_delta: Dict[str, Any]) -> bool:
+    """Keep a late state delta for the root session; False if a newer search superseded it."""
+    entry = _late_results.get(key)
+    if entry is None or entry[0] != search_id:
+        return False
+    entry[1].update(state_delta)
+    return True
+
+
+class _Branch:
+    """One sub-agent's event stream and deadline."""
+
+    def __init__(self, agent: BaseAgent, ctx: InvocationContext, deadline: float):
+        self.agent = agent
+        self.ctx = ctx
+        self.events = agent.run_async(ctx)
+        self.deadline = deadline
+        self.output_key: Optional[str] = getattr(agent, "output_key", None)
+        self.wrote_output = False
+
+    def next_event(self) -> asyncio.Task:
+        return asyncio.create_task(self.events.__anext__())
+
+    def saw(self, event: Event) -> None:
+        if self.output_key and self.output_key in (event.actions.state_delta or {}):
+            self.wrote_output = True
+
+
+class DeadlineParallelAgent(ParallelAgent):
+    """ParallelAgent that writes placeholders for branches that miss their deadline."""
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    branch_timeout_s: float = ENRICHMENT_BRANCH_TIMEOUT_S
+    """Default time each branch gets; 0 disables the per-branch limit."""
+
+    branch_timeouts_s: Dict[str, float] = {}
+    """Per sub-agent name overrides of branch_timeout_s."""
+
+    deadline_s: float = ENRICHMENT_DEADLINE_S
+    """Time after which every remaining branch is cut off; 0 disables it."""
+
+    placeholders: Dict[str, PlaceholderFactory] = {}
+    """output_key -> placeholder factory; branches without one get a JSON null."""
+
+    attach_late_results: bool = ENRICHMENT_ATTACH_LATE_RESULTS
+    """Keep cut-off branches running and append their events to the session when they finish."""
+
+    def _deadline_for(self, agent: BaseAgent, started: float) -> float:
+        limits = [
+            limit for limit in (self.branch_timeouts_s.get(agent.name, self.branch_timeout_s), self.deadline_s)
+            if limit > 0
+        ]
+        return started + min(limits) if limits else float("inf")
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        started = time.monotonic()
+        root_session = _start_search(ctx.invocation_id) if self.attach_late_results else None
+        branches = [
+            _Branch(sub_agent, _create_branch_ctx_for_sub_agent(self, sub_agent, ctx), self._deadline_for(sub_agent, started))
+            for sub_agent in self.sub_agents
+        ]
+        # Like ParallelAgent, a branch only moves on once its last event has been processed upstream
+        pending: Dict[asyncio.Task, _Branch] = {branch.next_event(): branch for branch in branches}
+
+        while pending:
+            timeout = max(0.0, min(b.deadline for b in pending.values()) - time.monotonic())
+            done, _ = await asyncio.wait(
+                pending, timeout=None if timeout == float("inf") else timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                branch = pending.pop(task)
+                try:
+                    event = task.result()
+                except StopAsyncIteration:
+                    continue
+                branch.saw(event)
+                yield event
+                pending[branch.next_event()] = branch
+
+            now = time.monotonic()
+            for task, branch in list(pending.items()):
+                if branch.deadline <= now:
+                    del pending[task]
+                    event = self._cut_off(ctx, branch, task, now - started, root_session)
+                    if event is not None:
+                        yield event
+
+    def _cut_off(self, ctx: InvocationContext, branch: _Branch, task: asyncio.Task, elapsed_s: float,
+                 root_session: Optional[SessionKey]) -> Optional[Event]:
+        """Stop waiting for a branch; returns the placeholder event, if the branch has not written its output."""
+        logger.warning(f"⚠️ {self.name}: {branch.agent.name} missed its deadline after {elapsed_s:.1f}s")
+        record_branch_timeout(ctx.invocation_id, branch.agent.name)
+        if self.attach_late_results:
+            _spawn(self._attach_late_events(ctx, branch, task, root_session))
+        else:
+            task.cancel()
+            _spawn(self._close_branch(branch, task))
+
+        if branch.wrote_output or not branch.output_key:
+            return None
+        factory = self.placeholders.get(branch.output_key)
+        output = dump_state_json(factory(get_search_results(ctx.session.state)) if factory else None)
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=branch.agent.name,
+            branch=branch.ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=output)]),
+            actions=EventActions(state_delta={branch.output_key: output}),
+        )
+
+    @staticmethod
+    async def _close_branch(branch: _Branch, task: asyncio.Task) -> None:
+        await asyncio.gather(task, return_exceptions=True)
+        try:
+            await branch.events.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ {branch.agent.name} did not shut down cleanly: {e}")
+
+    async def _attach_late_events(self, ctx: InvocationContext, branch: _Branch, task: asyncio.Task,
+                                  root_session: Optional[SessionKey]) -> None:
+        """
+        Drain a cut-off branch, appending its events to the branch's session as
+        the runner would have, so a multi-step branch sees its own earlier calls.
+
+        With a root session (merge_late_results is the root agent's callback)
+        the state deltas are also kept for it, unless a newer search started.
+        """
+        try:
+            event = await task
+            while True:
+                state_delta = event.actions.state_delta or {}
+                if not event.partial:
+                    if root_session is not None and state_delta and not _keep_late_delta(
+                        root_session, ctx.invocation_id, state_delta
+                    ):
+                        logger.warning(f"⚠️ {self.name}: dropped late {branch.agent.name} results, a newer search started")
+                        await branch.events.aclose()
+                        return
+                    await branch.ctx.session_service.append_event(session=branch.ctx.session, event=event)
+                if branch.output_key and branch.output_key in state_delta:
+                    logger.info(f"✅ {self.name}: attached late {branch.output_key} from {branch.agent.name}")
+                event = await branch.events.__anext__()
+        except StopAsyncIteration:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name}: late {branch.agent.name} run failed: {e}")
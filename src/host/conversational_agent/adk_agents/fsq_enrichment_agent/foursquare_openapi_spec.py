@@ -1,6 +1,8 @@
 # Assume FOURSQUARE_API_KEY is available in your environment for ADK to use
 # from config.settings import FOURSQUARE_API_KEY
 
+from conversational_agent.config.settings import FOURSQUARE_API_BASE_URL
+
 FOURSQUARE_OPENAPI_SPEC = {
     "openapi": "3.0.0",
     "info": {
@@ -10,7 +12,7 @@ FOURSQUARE_OPENAPI_SPEC = {
     },
     "servers": [
         {
-            "url": "https://api.foursquare.com"
+            "url": FOURSQUARE_API_BASE_URL
         }
     ],
     "components": {
@@ -33,6 +35,8 @@ FOURSQUARE_OPENAPI_SPEC = {
             "get": {
                 "summary": "Search for a specific place on Foursquare to get its details.",
                 "operationId": "searchFoursquarePlaceDetails",
+                # Place details change rarely; see tools/caching_openapi_toolset.py
+                "x-cache-ttl": 24 * 3600,
                 "description": "Searches for businesses on Foursquare. Intended to find a specific place using its name and location (address or lat/lon) and retrieve a comprehensive set of fields.",
                 "parameters": [
                     {
@@ -310,6 +314,43 @@ FOURSQUARE_OPENAPI_SPEC = {
                     "401": {"description": "Unauthorized - API key issue"}
                 }
             }
+        },
+        "/v3/places/{fsq_id}": {
+            "get": {
+                "summary": "Get a place on Foursquare by its fsq_id.",
+                "operationId": "getFoursquarePlaceDetails",
+                # Same policy as the search the id came from
+                "x-cache-ttl": 24 * 3600,
+                "description": "Returns the details of one place, looked up by the fsq_id a previous search returned.",
+                "parameters": [
+                    {
+                        "name": "fsq_id",
+                        "in": "path",
+                        "required": True,
+                        "description": "The unique Foursquare ID of the place.",
+                        "schema": {"type": "string"}
+                    },
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "description": "Comma-separated list of fields to return, as for the search.",
+                        "schema": {"type": "string"}
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Successful lookup. Returns one place object, with the fields of a search result.",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "object"}
+                            }
+                        }
+                    },
+                    "401": {"description": "Unauthorized - API key issue"},
+                    "404": {"description": "Place not found"}
+                }
+            }
         }
     }
 }
\ No newline at end of file
@@ -1,9 +1,11 @@
+from typing import Any, Dict, List
+
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
 
 from conversational_agent.adk_agents.google_reviews_agent.prompt import GOOGLE_REVIEWS_AGENT_INSTRUCTIONS
-from conversational_agent.config.settings import GOOGLE_MAPS_API_KEY as google_maps_api_key
 from conversational_agent.config.settings import GEMINI_MODEL
+from conversational_agent.tools.maps_mcp_pool import MapsMCPToolset
+from conversational_agent.tools.state_compaction import compact_json_output
 
 # root_agent = LlmAgent(
 google_reviews_agent = LlmAgent(
@@ -13,19 +15,22 @@ google_reviews_agent = LlmAgent(
         "Helps extract reviews, ratings, popular items, menu and more for restaurants using the Google Maps MCP tools."
     ),
     instruction=GOOGLE_REVIEWS_AGENT_INSTRUCTIONS,
-        tools=[
-        MCPToolset(
-            connection_params=StdioServerParameters(
-                command="npx",
-                args=[
-                    "-y",
-                    "@modelcontextprotocol/server-google-maps",
-                ],
-                env={
-                    "GOOGLE_MAPS_API_KEY": google_maps_api_key
-                }
-            ),
-        )
-    ],
+    tools=[MapsMCPToolset()],  # Leases sessions from the shared Google Maps MCP server pool
     output_key='google_reviews_data',  # The output will be a JSON string of the search results
+    after_model_callback=compact_json_output,  # Stored minified, without null fields, review texts capped
 )
+
+
+def google_reviews_placeholder(places: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """`google_reviews_data` with null fields for every restaurant, for when the agent runs out of time."""
+    return [
+        {
+            "place_id": place.get("place_id"),
+            "name": place.get("name"),
+            "website": None,
+            "all_reviews": None,
+            "reviews_summary": None,
+            "special_items": None,
+        }
+        for place in places
+    ]
@@ -0,0 +1,171 @@
+# adk_agents/progressive_results_agent.py
+"""
+Progressive results: stream recommendations while the search is still running.
+
+The search and final review run inside AgentTools, so none of their events
+reach the client until ConversationalAgent answers. ProgressiveResultsAgent
+wraps the root agent and opens a progress channel for the invocation; the
+after-agent callbacks below publish to it, and the wrapper interleaves what
+they publish with the root agent's own events:
+
+1. `preliminary` - once GeoFilterAgent has kept the candidate places, a
+   ranked list scored from the Google Places data alone;
+2. `patch` - as each enrichment branch lands, the re-ranked order plus the
+   sections (ratings, media, timing, ...) that changed per restaurant;
+3. `final` - FinalReviewAgent's final_results, in the FinalReviewOutput format.
+
+Progress events are `partial` ADK events carrying the payload in
+`custom_metadata["forkcast_progress"]`: they go out over /run_sse like any
+other event, but the runner does not store them in the session, so they never
+reach the LLM's context.
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from conversational_agent.adk_agents.final_review_agent.recommendation_builder import build_final_results
+from conversational_agent.tools.enrichment_utils import load_state_json
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_METADATA_KEY = "forkcast_progress"
+
+
+class ProgressChannel:
+    """Progress payloads of one invocation, plus the last ranking sent (to compute patches)."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.sent: Dict[str, Dict[str, Any]] = {}
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        self.queue.put_nowait(payload)
+
+
+_channel: contextvars.ContextVar[Optional[ProgressChannel]] = contextvars.ContextVar("progress_channel", default=None)
+
+
+# ===================================================================
+# PAYLOADS
+# ===================================================================
+
+def _ranked(state: Any) -> List[Dict[str, Any]]:
+    return build_final_results(state)["final_results"]["recommendations"]
+
+
+def _diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """The top-level recommendation fields that changed; always includes place_id and rank."""
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    return {"place_id": current["place_id"], "rank": current["rank"], **changed}
+
+
+def publish_preliminary_results(callback_context: CallbackContext) -> None:
+    """After-agent callback: the first ranked list, before any enrichment."""
+    channel = _channel.get()
+    if channel is None:
+        return
+    recommendations = _ranked(callback_context.state)
+    channel.sent = {rec["place_id"]: rec for rec in recommendations}
+    channel.publish({"type": "preliminary", "stage": callback_context.agent_name, "recommendations": recommendations})
+
+
+def publish_enrichment_patch(callback_context: CallbackContext) -> None:
+    """After-agent callback for an enrichment branch: what its data changed in the ranking."""
+    channel = _channel.get()
+    if channel is None:
+        return
+    recommendations = _ranked(callback_context.state)
+    updates = [
+        _diff(channel.sent.get(rec["place_id"]) or {}, rec)
+        for rec in recommendations
+    ]
+    channel.sent = {rec["place_id"]: rec for rec in recommendations}
+    channel.publish({
+        "type": "patch",
+        "stage": callback_context.agent_name,
+        "order": [rec["place_id"] for rec in recommendations],
+        "updates": [update for update in updates if len(update) > 2],
+    })
+
+
+def publish_final_results(callback_context: CallbackContext) -> None:
+    """After-agent callback for FinalReviewAgent: the finished FinalReviewOutput."""
+    channel = _channel.get()
+    if channel is None:
+        return
+    final_results = load_state_json(callback_context.state.get("final_results"))
+    if isinstance(final_results, dict):
+        channel.publish({"type": "final", "stage": callback_context.agent_name, **final_results})
+
+
+def _add_after_callback(agent: BaseAgent, callback) -> None:
+    existing = agent.after_agent_callback
+    if existing is None:
+        existing = []
+    elif not isinstance(existing, list):
+        existing = [existing]
+    if callback not in existing:
+        agent.after_agent_callback = existing + [callback]
+
+
+def attach_progress_callbacks(
+    filter_agent: BaseAgent, enrichment_agents: List[BaseAgent], final_agent: BaseAgent
+) -> None:
+    """Publish progress after `filter_agent`, each of `enrichment_agents`, and `final_agent`."""
+    _add_after_callback(filter_agent, publish_preliminary_results)
+    for agent in enrichment_agents:
+        _add_after_callback(agent, publish_enrichment_patch)
+    _add_after_callback(final_agent, publish_final_results)
+
+
+# ===================================================================
+# AGENT
+# ===================================================================
+
+class ProgressiveResultsAgent(BaseAgent):
+    """Runs its single sub-agent and streams the progress published meanwhile as partial events."""
+
+    def _progress_event(self, ctx: InvocationContext, payload: Dict[str, Any]) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            partial=True,
+            custom_metadata={PROGRESS_METADATA_KEY: payload},
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        channel = ProgressChannel()
+        # The sub-agent runs in a context that carries the channel, down through AgentTools and parallel branches
+        run_context = contextvars.copy_context()
+        run_context.run(_channel.set, channel)
+        agent_run = self.sub_agents[0].run_async(ctx)
+
+        next_event = asyncio.create_task(agent_run.__anext__(), context=run_context)
+        next_progress = asyncio.create_task(channel.queue.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event, next_progress}, return_when=asyncio.FIRST_COMPLETED)
+                if next_progress in done:
+                    yield self._progress_event(ctx, next_progress.result())
+                    next_progress = asyncio.create_task(channel.queue.get())
+                if next_event in done:
+                    try:
+                        event = next_event.result()
+                    except StopAsyncIteration:
+                        break
+                    yield event
+                    next_event = asyncio.create_task(agent_run.__anext__(), context=run_context)
+            while not channel.queue.empty():
+                yield self._progress_event(ctx, channel.queue.get_nowait())
+        finally:
+            next_progress.cancel()
+            if not next_event.done():
+                next_event.cancel()
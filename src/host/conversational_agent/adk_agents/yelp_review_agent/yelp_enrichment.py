@@ -0,0 +1,199 @@
+# adk_agents/yelp_review_agent/yelp_enrichment.py
+"""
+Batched Yelp enrichment.
+
+Replaces the LLM loop that called searchBusinesses once per restaurant: all
+lookups are fired concurrently over the shared HTTP client and the
+name/vicinity match rule from YELP_REVIEW_AGENT_INSTRUCTIONS is applied in
+code, producing the same `yelp_data` shape the prompt asked the model for.
+Restaurants already in the entity index are fetched by business id instead
+of searched for. Uncached calls take a slot from the Yelp rate limiter; once
+the daily quota is spent, restaurants get the null entry.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from conversational_agent.config.settings import YELP_API_KEY
+from conversational_agent.adk_agents.code_enrichment_agent import CodeEnrichmentAgent
+from conversational_agent.adk_agents.yelp_review_agent.yelp_fusion_openapi_spec import YELP_OPENAPI_SPEC
+from conversational_agent.tools.enrichment_utils import (
+    addresses_match,
+    haversine_km,
+    names_match,
+    place_coordinates,
+)
+from conversational_agent.tools.caching_openapi_toolset import CachedOperation
+from conversational_agent.tools.entity_index import get_entity_index
+from conversational_agent.tools.http_client import get_http_client
+from conversational_agent.tools.rate_limiter import QuotaExceededError, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+YELP_API_BASE_URL = YELP_OPENAPI_SPEC["servers"][0]["url"]
+YELP_SEARCH_PATH = "/v3/businesses/search"
+YELP_BUSINESS_PATH = "/v3/businesses/{business_id}"
+YELP_SEARCH_LIMIT = 3  # A few candidates so a near-miss first hit doesn't lose the match
+YELP_MAX_RESTAURANTS = 10
+YELP_MATCH_MAX_DISTANCE_KM = 0.15
+
+# Search and by-id responses are cached with the spec's x-cache-ttl policy
+_search_cache = CachedOperation.from_spec(YELP_OPENAPI_SPEC, "searchYelpBusinesses", "yelp:search_yelp_businesses")
+_business_cache = CachedOperation.from_spec(YELP_OPENAPI_SPEC, "getYelpBusiness", "yelp:get_yelp_business")
+
+
+def _null_entry(place: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "place_id": place.get("place_id"),
+        "original_name": place.get("name"),
+        "title": None,
+        "image_url": None,
+        "review_count": None,
+        "rating": None,
+        "price": None,
+        "location": None,
+    }
+
+
+def _business_address(business: Dict[str, Any]) -> Optional[str]:
+    location = business.get("location") or {}
+    display_address = location.get("display_address")
+    if display_address:
+        return ", ".join(display_address)
+    return location.get("address1")
+
+
+def _is_same_vicinity(place: Dict[str, Any], business: Dict[str, Any]) -> bool:
+    """Vicinity matches if the addresses agree or the coordinates are a few doors apart."""
+    vicinity = place.get("vicinity") or place.get("formatted_address")
+    if addresses_match(vicinity, _business_address(business)):
+        return True
+
+    place_coords = place_coordinates(place)
+    business_coords = place_coordinates(business.get("coordinates") or {})
+    if place_coords and business_coords:
+        return haversine_km(*place_coords, *business_coords) <= YELP_MATCH_MAX_DISTANCE_KM
+    return False
+
+
+def match_yelp_business(place: Dict[str, Any], businesses: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the first business whose title matches the name and whose location matches the vicinity."""
+    for business in businesses:
+        if names_match(place.get("name"), business.get("name")) and _is_same_vicinity(place, business):
+            return business
+    return None
+
+
+def to_yelp_entry(place: Dict[str, Any], business: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build one `yelp_data` entry; unmatched restaurants get null fields."""
+    entry = _null_entry(place)
+    if business:
+        entry.update({
+            "title": business.get("name"),
+            "image_url": business.get("image_url") or None,
+            "review_count": business.get("review_count"),
+            "rating": business.get("rating"),
+            "price": business.get("price"),
+            "location": _business_address(business),
+        })
+    return entry
+
+
+async def search_yelp_businesses(client: httpx.AsyncClient, place: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run one searchBusinesses call for a restaurant."""
+    location = place.get("vicinity") or place.get("formatted_address")
+    if not location:
+        return []
+    params = {"term": place["name"], "location": location, "limit": YELP_SEARCH_LIMIT}
+    cached = await _search_cache.aget(params) if _search_cache else None
+    if cached is not None:
+        return cached.get("businesses", [])
+
+    await get_rate_limiter("yelp").acquire()
+    response = await client.get(
+        f"{YELP_API_BASE_URL}{YELP_SEARCH_PATH}",
+        params=params,
+        headers={"Authorization": f"Bearer {YELP_API_KEY}"},
+    )
+    response.raise_for_status()
+    data = response.json()
+    if _search_cache:
+        _search_cache.set(params, data)
+    return data.get("businesses", [])
+
+
+async def get_yelp_business(client: httpx.AsyncClient, business_id: str) -> Dict[str, Any]:
+    """Fetch one business by its Yelp id."""
+    params = {"business_id": business_id}
+    cached = await _business_cache.aget(params) if _business_cache else None
+    if cached is not None:
+        return cached
+
+    await get_rate_limiter("yelp").acquire()
+    response = await client.get(
+        f"{YELP_API_BASE_URL}{YELP_BUSINESS_PATH.format(business_id=business_id)}",
+        headers={"Authorization": f"Bearer {YELP_API_KEY}"},
+    )
+    response.raise_for_status()
+    data = response.json()
+    if _business_cache:
+        _business_cache.set(params, data)
+    return data
+
+
+async def _enrich_indexed_place(client: httpx.AsyncClient, place: Dict[str, Any], business_id: str) -> Optional[Dict[str, Any]]:
+    """Detail lookup for an already-resolved restaurant; None means fall back to searching."""
+    try:
+        return to_yelp_entry(place, await get_yelp_business(client, business_id))
+    except (httpx.HTTPError, ValueError, QuotaExceededError) as e:
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+            get_entity_index().unlink("yelp", place.get("place_id"))
+        logger.warning(f"⚠️ Yelp business {business_id} lookup failed for {place.get('name')}: {e}")
+    return None
+
+
+async def _enrich_place(client: httpx.AsyncClient, place: Dict[str, Any]) -> Dict[str, Any]:
+    index = get_entity_index()
+    business_id = index.lookup("yelp", place)
+    if business_id:
+        entry = await _enrich_indexed_place(client, place, business_id)
+        if entry is not None:
+            return entry
+
+    try:
+        businesses = await search_yelp_businesses(client, place)
+    except (httpx.HTTPError, ValueError, QuotaExceededError) as e:
+        logger.warning(f"⚠️ Yelp lookup failed for {place.get('name')}: {e}")
+        return _null_entry(place)
+    business = match_yelp_business(place, businesses)
+    if business:
+        index.link("yelp", place, business.get("id"))
+    return to_yelp_entry(place, business)
+
+
+async def fetch_yelp_reviews_data(places: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Look up every restaurant on Yelp concurrently.
+
+    Returns:
+        {"yelp_data": [...]} with one entry per restaurant, in input order.
+    """
+    client = get_http_client()
+    places = places[:YELP_MAX_RESTAURANTS]
+    entries = await asyncio.gather(*(_enrich_place(client, place) for place in places))
+    return {"yelp_data": list(entries)}
+
+
+def yelp_placeholder(places: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """`yelp_reviews_data` with null fields for every restaurant, for when the lookups run out of time."""
+    return {"yelp_data": [_null_entry(place) for place in places[:YELP_MAX_RESTAURANTS]]}
+
+
+class YelpEnrichmentAgent(CodeEnrichmentAgent):
+    """Writes `yelp_reviews_data` from concurrent Yelp Fusion lookups."""
+
+    async def enrich(self, places: List[Dict[str, Any]], state: Dict[str, Any]) -> Any:
+        return await fetch_yelp_reviews_data(places)
@@ -1,3 +1,5 @@
+from conversational_agent.config.settings import YELP_API_BASE_URL
+
 YELP_OPENAPI_SPEC = {
     "openapi": "3.0.0",
     "info": {
@@ -7,7 +9,7 @@ YELP_OPENAPI_SPEC = {
     },
     "servers": [
         {
-            "url": "https://api.yelp.com"
+            "url": YELP_API_BASE_URL
         }
     ],
     "components": { # Define security schemes here
@@ -25,6 +27,8 @@ YELP_OPENAPI_SPEC = {
             "get": {
                 "summary": "Search for businesses on Yelp",
                 "operationId": "searchYelpBusinesses",
+                # Business listings (and their ids) change rarely; see tools/caching_openapi_toolset.py
+                "x-cache-ttl": 24 * 3600,
                 "description": "Searches for businesses based on a term (e.g., restaurant name) and a location (e.g., address/city). Intended for finding specific matches or a limited list of relevant businesses.",
     
                 "parameters": [
@@ -129,6 +133,38 @@ YELP_OPENAPI_SPEC = {
                     "401": {"description": "Unauthorized (e.g., API key issue)."}
                 }
             }
+        },
+        "/v3/businesses/{business_id}": {
+            "get": {
+                "summary": "Get a business on Yelp by its id",
+                "operationId": "getYelpBusiness",
+                # Same policy as the search the id came from
+                "x-cache-ttl": 24 * 3600,
+                "description": "Returns the details of one business, looked up by the Yelp id a previous search returned.",
+                "parameters": [
+                    {
+                        "name": "business_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {
+                            "type": "string"
+                        },
+                        "description": "Unique Yelp ID of the business."
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Successful lookup. Returns one business object, with the fields of a search result.",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "object"}
+                            }
+                        }
+                    },
+                    "401": {"description": "Unauthorized (e.g., API key issue)."},
+                    "404": {"description": "Business not found."}
+                }
+            }
         }
     }
 }
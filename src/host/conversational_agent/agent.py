@@ -1,26 +1,41 @@
 import json
 from typing import Optional
 
-from google.adk.agents import LlmAgent, SequentialAgent, ParallelAgent
+from google.adk.agents import LlmAgent, SequentialAgent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools.exit_loop_tool import exit_loop
 
-from conversational_agent.config.settings import NEW_GEMINI_MODEL
+from conversational_agent.config.settings import (
+    ENRICHMENT_DEADLINE_S,
+    METRICS_ENABLED,
+    NEW_GEMINI_MODEL,
+    PROGRESSIVE_RESULTS_ENABLED,
+    warn_missing_api_keys,
+)
 
 from conversational_agent.adk_agents.user_preference_agent.agent import user_preference_agent
-from conversational_agent.adk_agents.location_search_agent.agent import location_search_agent
+from conversational_agent.adk_agents.location_search_agent.agent import geo_filter_agent, location_search_agent
 from conversational_agent.adk_agents.yelp_review_agent.agent import yelp_review_agent
+from conversational_agent.adk_agents.yelp_review_agent.yelp_enrichment import yelp_placeholder
 from conversational_agent.adk_agents.fsq_enrichment_agent.agent import fsq_enrichment_agent
-from conversational_agent.adk_agents.google_reviews_agent.agent import google_reviews_agent
-from conversational_agent.adk_agents.busyness_forecast_agent.agent import busyness_forecast_agent
+from conversational_agent.adk_agents.fsq_enrichment_agent.fsq_enrichment import fsq_placeholder
+from conversational_agent.adk_agents.google_reviews_agent.agent import google_reviews_agent, google_reviews_placeholder
+from conversational_agent.adk_agents.busyness_forecast_agent.agent import busyness_forecast_agent, busyness_placeholder
+from conversational_agent.adk_agents.deadline_parallel_agent import DeadlineParallelAgent, merge_late_results
+from conversational_agent.adk_agents.progressive_results_agent import ProgressiveResultsAgent, attach_progress_callbacks
 from conversational_agent.adk_agents.final_review_agent.agent import final_review_agent
 
 from conversational_agent.prompt import CONVERSATIONAL_AGENT_INSTRUCTIONS
+from conversational_agent.tools.state_compaction import clear_previous_search
+from conversational_agent.tools.telemetry import instrument_agents
 # from conversational_agent.callback import validate_restaurant_relevance
 
 
-# Define the parallel agent that enriches location data with reviews, forecasts and more
-parallel_enrichment_agent = ParallelAgent(
+warn_missing_api_keys()
+
+# Define the parallel agent that enriches location data with reviews, forecasts and more.
+# A branch that misses its deadline is cut off and its output filled with nulls.
+parallel_enrichment_agent = DeadlineParallelAgent(
     name="ParallelEnrichmentAgent",
     sub_agents=[
         yelp_review_agent,
@@ -29,6 +44,14 @@ parallel_enrichment_agent = ParallelAgent(
         busyness_forecast_agent,
     ],
     description="Enriches location data with reviews and forecasts in parallel.",
+    # BusynessForecastAgent makes two rounds of BestTime calls, so it may use the whole deadline
+    branch_timeouts_s={busyness_forecast_agent.name: ENRICHMENT_DEADLINE_S},
+    placeholders={
+        yelp_review_agent.output_key: yelp_placeholder,
+        fsq_enrichment_agent.output_key: fsq_placeholder,
+        google_reviews_agent.output_key: google_reviews_placeholder,
+        busyness_forecast_agent.output_key: busyness_placeholder,
+    },
 )
 
 # Define the sequential agent that first searches for locations and then enriches data
@@ -36,9 +59,12 @@ sequential_search_agent = SequentialAgent(
     name="SequentialSearchAgent",
     sub_agents=[
         location_search_agent,  # Use the location_search_agent tool
+        geo_filter_agent,  # Drop places ruled out by location preferences before paying for enrichment
         parallel_enrichment_agent,  # Enrich data with reviews and forecasts
     ],
     description="Sequentially searches for locations based on user preferences and then parallelly enriches data with reviews and forecasts.",
+    # Drop the previous search's blobs so they are not carried into this one's prompts
+    before_agent_callback=clear_previous_search,
 )
 
 # Instantiate user_preference_agent, sequential_search_agent and final_review_agent as a tool for the ConversationalAgent
@@ -62,4 +88,19 @@ root_agent = LlmAgent(
         final_review_agent_instance,  # Final review agent to summarize and finalize the results
     ],
     # before_agent_callback=validate_restaurant_relevance,
-)
\ No newline at end of file
+    # Results of enrichment branches that finished after their deadline (ENRICHMENT_ATTACH_LATE_RESULTS)
+    before_agent_callback=merge_late_results,
+)
+
+# Record latency, tokens and errors of every agent, model and tool call (served at /metrics)
+if METRICS_ENABLED:
+    instrument_agents(root_agent, user_preference_agent, sequential_search_agent, final_review_agent)
+
+# Stream a preliminary ranking, per-branch patches and the final results while the search runs
+if PROGRESSIVE_RESULTS_ENABLED:
+    attach_progress_callbacks(geo_filter_agent, parallel_enrichment_agent.sub_agents, final_review_agent)
+    root_agent = ProgressiveResultsAgent(
+        name="ProgressiveConversationalAgent",
+        sub_agents=[root_agent],
+        description="Runs the ConversationalAgent and streams search progress as partial events.",
+    )
@@ -0,0 +1,162 @@
+# tools/entity_index.py
+"""
+Persistent cross-source entity-resolution index.
+
+Maps a Google `place_id` to the matching Yelp business id, Foursquare
+`fsq_id` and BestTime `venue_id`, so once a restaurant has been matched by a
+search-style lookup, later runs can go straight to the cheaper detail-by-id
+call. Links are stored in SQLite together with the restaurant's name and a
+coordinate grid cell: when a place_id is not indexed yet (Google ids are
+occasionally reissued), the neighbouring grid cells are used as a blocking key
+and the closest link with a similar name is reused.
+"""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from conversational_agent.config.settings import ENTITY_INDEX_DB_PATH
+from conversational_agent.tools.enrichment_utils import haversine_km, name_similarity, place_coordinates
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("yelp", "fsq", "besttime")
+
+# ~550 m of latitude per cell; a 3x3 block always covers ENTITY_MATCH_MAX_DISTANCE_KM
+GRID_CELL_DEG = 0.005
+ENTITY_MATCH_MAX_DISTANCE_KM = 0.2
+ENTITY_MIN_NAME_SIMILARITY = 0.85
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[int, int]:
+    """Blocking key: the GRID_CELL_DEG cell containing a coordinate."""
+    return math.floor(latitude / GRID_CELL_DEG), math.floor(longitude / GRID_CELL_DEG)
+
+
+class EntityIndex:
+    """SQLite table of (place_id, source) -> external id links."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entity_links ("
+            " place_id TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " external_id TEXT NOT NULL,"
+            " name TEXT,"
+            " latitude REAL,"
+            " longitude REAL,"
+            " cell_lat INTEGER,"
+            " cell_lng INTEGER,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (place_id, source))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entity_links_cell ON entity_links (source, cell_lat, cell_lng)"
+        )
+        self._conn.commit()
+
+    def link(self, source: str, place: Dict[str, Any], external_id: Optional[str]) -> None:
+        """Record that `place` (a search_results entry) is `external_id` on `source`."""
+        place_id = place.get("place_id")
+        if not place_id or not external_id:
+            return
+        coords = place_coordinates(place)
+        cell = grid_cell(*coords) if coords else (None, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entity_links"
+                " (place_id, source, external_id, name, latitude, longitude, cell_lat, cell_lng, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (place_id, source, str(external_id), place.get("name"), *(coords or (None, None)), *cell, time.time()),
+            )
+            self._conn.commit()
+
+    def unlink(self, source: str, place_id: str) -> None:
+        """Forget a link, e.g. after the external id stopped resolving."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entity_links WHERE place_id = ? AND source = ?", (place_id, source))
+            self._conn.commit()
+
+    def _nearby_links(self, source: str, latitude: float, longitude: float) -> List[tuple]:
+        cell_lat, cell_lng = grid_cell(latitude, longitude)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT place_id, external_id, name, latitude, longitude FROM entity_links"
+                " WHERE source = ? AND cell_lat BETWEEN ? AND ? AND cell_lng BETWEEN ? AND ?",
+                (source, cell_lat - 1, cell_lat + 1, cell_lng - 1, cell_lng + 1),
+            ).fetchall()
+
+    def lookup(self, source: str, place: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the `source` id for a restaurant, or None if it was never matched.
+
+        Tries the place_id first, then a nearby link with a similar name; a
+        blocked match is re-filed under the new place_id.
+        """
+        place_id = place.get("place_id")
+        if place_id:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT external_id FROM entity_links WHERE place_id = ? AND source = ?", (place_id, source)
+                ).fetchone()
+            if row:
+                return row[0]
+
+        coords = place_coordinates(place)
+        if not coords:
+            return None
+        best_id, best_score = None, ENTITY_MIN_NAME_SIMILARITY
+        for _, external_id, name, latitude, longitude in self._nearby_links(source, *coords):
+            if latitude is None or haversine_km(*coords, latitude, longitude) > ENTITY_MATCH_MAX_DISTANCE_KM:
+                continue
+            score = name_similarity(place.get("name"), name)
+            if score >= best_score:
+                best_id, best_score = external_id, score
+        if best_id:
+            logger.info(f"✅ Entity index resolved {place.get('name')} on {source} by location")
+            self.link(source, place, best_id)
+        return best_id
+
+    def links(self, place_id: str) -> Dict[str, str]:
+        """Every known external id for a place_id, keyed by source."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, external_id FROM entity_links WHERE place_id = ?", (place_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def clear(self) -> None:
+        """Forget every link."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entity_links")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[EntityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_entity_index() -> EntityIndex:
+    """Return the process-wide index, opening it on first use (in memory if no path is configured)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            if not ENTITY_INDEX_DB_PATH:
+                logger.warning("⚠️ ENTITY_INDEX_DB_PATH is empty: entity links are kept in memory and lost on restart")
+            try:
+                _index = EntityIndex(ENTITY_INDEX_DB_PATH or ":memory:")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Entity index could not open {ENTITY_INDEX_DB_PATH}, using memory only: {e}")
+                _index = EntityIndex(":memory:")
+        return _index
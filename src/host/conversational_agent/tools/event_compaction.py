@@ -0,0 +1,99 @@
+# tools/event_compaction.py
+"""
+Compaction of the session event log.
+
+ADK appends every event of the conversation to the session, and the runner
+loads all of them on every turn. In the root session a search turn leaves a
+function response per AgentTool call, carrying the sub-agents' whole output
+(Yelp, Foursquare and BestTime payloads), and a state delta with the same
+blobs again. A long group-planning conversation piles up hundreds of them,
+though only the latest search's data is still used: it is in session state.
+
+When a new search cycle starts (the root agent calls one of
+SEARCH_CYCLE_TOOLS), every event from before that turn is compacted:
+
+- function response payloads are replaced by a short summary
+  ({"compacted": true, "chars": <original size>, "summary": <first chars>});
+- state deltas are dropped.
+
+Function calls, user messages and the agents' answers are kept, so the
+conversation (and every call / response pair the model sees) stays intact.
+Session state is stored apart from the events and is never touched.
+
+The session stores (tools/session_store.py, tools/firestore_session_service.py)
+rewrite the compacted events in place, so both the stored log and the
+session loaded on the next turn stay small.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+
+from conversational_agent.config.settings import EVENT_COMPACTION_ENABLED, EVENT_COMPACTION_SUMMARY_CHARS
+
+logger = logging.getLogger(__name__)
+
+# AgentTool calls of the root agent that start a new search cycle (AgentTool names match the agents)
+SEARCH_CYCLE_TOOLS = {"SequentialSearchAgent"}
+
+
+def starts_search_cycle(event: Event) -> bool:
+    """Whether the event is the root agent calling a search tool."""
+    return any(call.name in SEARCH_CYCLE_TOOLS for call in event.get_function_calls())
+
+
+def _summarize(response: Optional[Dict[str, Any]], max_chars: int) -> Dict[str, Any]:
+    text = json.dumps(response, ensure_ascii=False, default=str)
+    summary = text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+    return {"compacted": True, "chars": len(text), "summary": summary}
+
+
+def compact_event(event: Event, max_chars: int = EVENT_COMPACTION_SUMMARY_CHARS) -> Optional[Event]:
+    """A copy of `event` without its payloads, or None if it has nothing to compact."""
+    responses = [
+        part.function_response for part in (event.content.parts if event.content else None) or []
+        if part.function_response and not (part.function_response.response or {}).get("compacted")
+    ]
+    has_delta = bool(event.actions and event.actions.state_delta)
+    if not responses and not has_delta:
+        return None
+
+    compacted = event.model_copy(deep=True)
+    for part in (compacted.content.parts if compacted.content else None) or []:
+        response = part.function_response
+        if response and not (response.response or {}).get("compacted"):
+            response.response = _summarize(response.response, max_chars)
+    if has_delta:
+        compacted.actions.state_delta = {}
+    return compacted
+
+
+def compact_session_events(session: Session, enabled: bool = EVENT_COMPACTION_ENABLED) -> List[Event]:
+    """
+    Compact, in place, the session's events from before the latest search
+    cycle's turn. Returns the compacted events, for the session store to
+    rewrite; empty if there was nothing to compact.
+    """
+    if not enabled:
+        return []
+    latest = next((i for i in range(len(session.events) - 1, -1, -1) if starts_search_cycle(session.events[i])), None)
+    if latest is None:
+        return []
+    # The cycle's turn starts with the user's message, which shares the call's invocation_id
+    cycle_start = latest
+    invocation_id = session.events[latest].invocation_id
+    while cycle_start > 0 and session.events[cycle_start - 1].invocation_id == invocation_id:
+        cycle_start -= 1
+
+    compacted_events = []
+    for i in range(cycle_start):
+        compacted = compact_event(session.events[i])
+        if compacted is not None:
+            session.events[i] = compacted
+            compacted_events.append(compacted)
+    if compacted_events:
+        logger.info(f"✅ Compacted {len(compacted_events)} events of session {session.id} before its latest search")
+    return compacted_events
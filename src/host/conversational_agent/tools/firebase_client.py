@@ -0,0 +1,33 @@
+# tools/firebase_client.py
+"""
+Firestore client shared by the party tools, created on first use.
+
+Initializing Firebase Admin reads the service account file and opens a
+Firestore client; doing that when the tools are first called, rather than
+when their modules are imported, keeps it out of agent start-up.
+"""
+
+import logging
+from typing import Optional
+
+import firebase_admin
+from firebase_admin import credentials, firestore as admin_firestore
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_CREDENTIALS_PATH = "conversational_agent/config/forkcast-0248-firebase-adminsdk-fbsvc-c8f0336fb6.json"
+
+_db: Optional[admin_firestore.firestore.Client] = None
+
+
+def get_firestore_client() -> admin_firestore.firestore.Client:
+    """Return the shared Firestore client, initializing Firebase Admin (once) if needed."""
+    global _db
+    if _db is None:
+        try:
+            firebase_admin.get_app()
+        except ValueError:
+            firebase_admin.initialize_app(credentials.Certificate(FIREBASE_CREDENTIALS_PATH))
+            logger.info("✅ Firebase Admin initialized")
+        _db = admin_firestore.client()
+    return _db
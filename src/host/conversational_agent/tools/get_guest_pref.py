@@ -1,21 +1,111 @@
 # tools/host_preference_aggregator_simple.py
 import json
 import logging
+import time
 from typing import Dict, Any, List, Optional
-from collections import Counter
-import firebase_admin
-from firebase_admin import credentials, firestore as admin_firestore
+from firebase_admin import firestore as admin_firestore
+
+from conversational_agent.tools.firebase_client import get_firestore_client
+from conversational_agent.tools.preference_aggregate import GuestPreferenceAggregate
+from conversational_agent.tools.ttl_cache import LRUTTLCache
 
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin (same as other files)
-try:
-    firebase_admin.get_app()
-except ValueError:
-    cred = credentials.Certificate("conversational_agent/config/forkcast-0248-firebase-adminsdk-fbsvc-c8f0336fb6.json")
-    firebase_admin.initialize_app(cred)
+# Aggregated guest preferences per party, tagged with the newest guest upload
+# they include and the number of guest documents. UserPreferenceAgent calls the
+# tool several times per conversation; while no guest has submitted or been
+# removed since, the snapshot is reused and the call costs a document read and
+# a count. When guests do submit, only their documents are read and folded
+# into the aggregate; a removed guest is retracted from it.
+_SNAPSHOT_TTL_S = 3600
+_guest_snapshots = LRUTTLCache(max_entries=256)
+
+
+def _latest_guest_upload(guests_ref) -> Optional[Any]:
+    """Return the newest `uploaded_at` in a party's guests subcollection (one document read)."""
+    latest = list(guests_ref.order_by('uploaded_at', direction=admin_firestore.Query.DESCENDING).limit(1).stream())
+    return latest[0].get('uploaded_at') if latest else None
+
+
+def _guest_count(guests_ref) -> int:
+    """Number of documents in a party's guests subcollection (a count aggregation, no document reads)."""
+    return int(guests_ref.count().get()[0][0].value)
+
+
+def _apply_guest_docs(snapshot: Dict[str, Any], guest_docs: List[Any]) -> None:
+    """Fold guest documents into a snapshot, replacing earlier submissions by the same guest."""
+    aggregate = snapshot['aggregate']
+    for doc in guest_docs:
+        snapshot['guest_ids'].add(doc.id)
+        preferences = doc.to_dict().get('preferences', {})
+        if preferences:
+            aggregate.add_guest(doc.id, preferences)
+        else:
+            aggregate.remove_guest(doc.id)
+
+
+def _remove_deleted_guests(snapshot: Dict[str, Any], guests_ref) -> int:
+    """Retract guests whose documents are gone; returns how many were removed."""
+    live_ids = {doc.id for doc in guests_ref.select([]).stream()}
+    deleted = snapshot['guest_ids'] - live_ids
+    for doc_id in deleted:
+        snapshot['aggregate'].remove_guest(doc_id)
+    snapshot['guest_ids'] -= deleted
+    return len(deleted)
+
+
+def _get_guest_preference_snapshot(party_code: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the party's guest preference aggregate, reading only guests that changed.
+
+    Args:
+        party_code (str): The party code to fetch preferences for
+
+    Returns:
+        Dict with the GuestPreferenceAggregate and the guest ids it covers, or None if the party has no guests
+    """
+    guests_ref = get_firestore_client().collection('parties').document(party_code).collection('guests')
+
+    # Read the watermark before the guests: a guest submitting in between is
+    # simply read again next time, and re-applying a guest is idempotent.
+    latest_upload = _latest_guest_upload(guests_ref)
+    guest_count = _guest_count(guests_ref)
+    cached = _guest_snapshots.get_entry(party_code)
+    if cached and latest_upload is not None:
+        snapshot = cached[1]
+        if snapshot['latest_upload'] == latest_upload and len(snapshot['guest_ids']) == guest_count:
+            logger.info(f"✅ Reusing aggregated guest preferences for party {party_code}")
+            return snapshot
+
+        if snapshot['latest_upload'] != latest_upload:
+            new_docs = list(guests_ref.where(
+                filter=admin_firestore.FieldFilter('uploaded_at', '>', snapshot['latest_upload'])
+            ).stream())
+            _apply_guest_docs(snapshot, new_docs)
+            snapshot['latest_upload'] = latest_upload
+            logger.info(f"✅ Folded {len(new_docs)} new guest submissions into party {party_code}")
+        if len(snapshot['guest_ids']) > guest_count:
+            removed = _remove_deleted_guests(snapshot, guests_ref)
+            logger.info(f"✅ Removed {removed} deleted guests from party {party_code}")
+        if len(snapshot['guest_ids']) == guest_count:
+            return snapshot
+        # A guest appeared without a newer upload time; rebuild from scratch
+
+    guest_docs = list(guests_ref.stream())
+    if not guest_docs:
+        _guest_snapshots.delete(party_code)
+        return None
+
+    snapshot = {
+        'latest_upload': latest_upload,
+        'aggregate': GuestPreferenceAggregate(),
+        'guest_ids': set()
+    }
+    _apply_guest_docs(snapshot, guest_docs)
+    if latest_upload is not None:
+        _guest_snapshots.set(party_code, snapshot, time.time() + _SNAPSHOT_TTL_S)
+    return snapshot
 
-db = admin_firestore.client()
 
 def fetch_and_integrate_preferences(party_code: str, host_preferences: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -29,31 +119,20 @@ def fetch_and_integrate_preferences(party_code: str, host_preferences: Optional[
         Dict with combined preferences in standard format
     """
     try:
-        # Step 1: Fetch guest preferences from Firestore
-        guests_ref = db.collection('parties').document(party_code).collection('guests')
-        guest_docs = list(guests_ref.stream())
+        # Step 1: Fetch aggregated guest preferences (cached until a guest submits)
+        snapshot = _get_guest_preference_snapshot(party_code)
         
-        if not guest_docs:
+        if snapshot is None:
             return {
                 "success": False,
                 "message": f"No guest preferences found for party {party_code}",
                 "guest_count": 0
             }
         
-        # Collect all guest preferences
-        all_guest_preferences = []
-        for doc in guest_docs:
-            guest_data = doc.to_dict()
-            preferences = guest_data.get('preferences', {})
-            if preferences:
-                all_guest_preferences.append({
-                    'user_id': doc.id,
-                    'preferences': preferences,
-                    'uploaded_at': guest_data.get('uploaded_at')
-                })
+        guest_count = snapshot['aggregate'].guest_count
         
-        # Step 2: Aggregate guest preferences
-        aggregated_guest_prefs = _aggregate_guest_preferences(all_guest_preferences)
+        # Step 2: Render the aggregated guest preferences
+        aggregated_guest_prefs = snapshot['aggregate'].to_preferences()
         
         # Step 3: Integrate host preferences if provided
         if host_preferences:
@@ -61,19 +140,19 @@ def fetch_and_integrate_preferences(party_code: str, host_preferences: Optional[
                 host_prefs_data = json.loads(host_preferences)
                 host_prefs_section = host_prefs_data.get('preferences', {})
                 final_prefs = _integrate_host_with_guest_preferences(aggregated_guest_prefs, host_prefs_section)
-                integration_message = f"Integrated host preferences with {len(all_guest_preferences)} guest preferences"
+                integration_message = f"Integrated host preferences with {guest_count} guest preferences"
             except (json.JSONDecodeError, KeyError) as e:
                 logger.warning(f"Invalid host preferences format: {e}")
                 final_prefs = aggregated_guest_prefs
                 integration_message = f"Used guest preferences only (host preferences invalid)"
         else:
             final_prefs = aggregated_guest_prefs
-            integration_message = f"Aggregated {len(all_guest_preferences)} guest preferences"
+            integration_message = f"Aggregated {guest_count} guest preferences"
         
         # Step 4: Format in standard query_details structure
         combined_query_details = {
             "status": "PREFERENCES_AGGREGATED",
-            "last_user_utterance": f"Combined preferences from {len(all_guest_preferences)} guests" + (" + host input" if host_preferences else ""),
+            "last_user_utterance": f"Combined preferences from {guest_count} guests" + (" + host input" if host_preferences else ""),
             "preferences": final_prefs,
             "meta_preferences_for_results": {
                 "sorting_preference": "relevance",
@@ -93,7 +172,7 @@ def fetch_and_integrate_preferences(party_code: str, host_preferences: Optional[
                 "ready_for_search_by_upa": True,
                 "aggregated_from_guests": True,
                 "host_input_integrated": bool(host_preferences),
-                "guest_count": len(all_guest_preferences),
+                "guest_count": guest_count,
                 "error_message": None
             }
         }
@@ -104,7 +183,7 @@ def fetch_and_integrate_preferences(party_code: str, host_preferences: Optional[
             "success": True,
             "message": integration_message,
             "party_code": party_code,
-            "guest_count": len(all_guest_preferences),
+            "guest_count": guest_count,
             "host_input_provided": bool(host_preferences),
             "combined_preferences": json.dumps(combined_query_details)
         }
@@ -267,160 +346,7 @@ def _aggregate_guest_preferences(guest_preferences: List[Dict]) -> Dict[str, Any
     Returns:
         Aggregated preferences in standard format
     """
-    if not guest_preferences:
-        return {}
-    
-    # Initialize aggregated structure with safe defaults
-    aggregated = {
-        "context_preferences": {
-            "group_size": 0,
-            "occasion": None,
-            "date_time": {
-                "date_preference": None,
-                "time_preference": None
-            }
-        },
-        "location_preferences": {
-            "text_input_primary": None,
-            "text_input_secondary": None,
-            "coordinates_primary": {
-                "latitude": None,
-                "longitude": None
-            },
-            "search_radius_km": None,
-            "max_travel_time_minutes": None,
-            "avoid_areas": []
-        },
-        "cuisine_type_preferences": {
-            "desired": [],
-            "open_to_suggestions": True,
-            "avoid": []
-        },
-        "dietary_preferences": {
-            "needs": [],
-            "general_notes": None
-        },
-        "restaurant_specific_preferences": {
-            "price_levels": [],
-            "min_rating": None,
-            "attribute_preferences": [],
-            "exclude_chains": False,
-            "specific_restaurants_mentioned": []
-        },
-        "ambiance_and_amenities": {
-            "ambiances": [],
-            "amenities": []
-        },
-        "willing_to_compromise_on": [],
-        "deal_breakers": []
-    }
-    
-    # Collect all values for aggregation
-    all_cuisines = []
-    all_avoid_cuisines = []
-    all_price_levels = []
-    all_dietary_needs = []
-    all_locations = []
-    all_ambiances = []
-    all_amenities = []
-    all_deal_breakers = []
-    all_group_sizes = []
-    all_occasions = []
-    all_times = []
-    all_dates = []
-    min_ratings = []
-    exclude_chains_votes = []
-    
-    # Extract data from all guests
-    for guest in guest_preferences:
-        prefs = guest['preferences']
-        
-        # Context preferences
-        context = prefs.get('context_preferences', {})
-        if context.get('group_size') is not None:
-            all_group_sizes.append(context['group_size'])
-        if context.get('occasion'):
-            all_occasions.append(context['occasion'])
-        
-        date_time = context.get('date_time', {})
-        if date_time.get('time_preference'):
-            all_times.append(date_time['time_preference'])
-        if date_time.get('date_preference'):
-            all_dates.append(date_time['date_preference'])
-        
-        # Location preferences
-        location = prefs.get('location_preferences', {})
-        if location.get('text_input_primary'):
-            all_locations.append(location['text_input_primary'])
-        
-        # Cuisine preferences
-        cuisine = prefs.get('cuisine_type_preferences', {})
-        all_cuisines.extend(cuisine.get('desired', []))
-        all_avoid_cuisines.extend(cuisine.get('avoid', []))
-        
-        # Dietary preferences
-        dietary = prefs.get('dietary_preferences', {})
-        all_dietary_needs.extend(dietary.get('needs', []))
-        
-        # Restaurant preferences
-        restaurant = prefs.get('restaurant_specific_preferences', {})
-        all_price_levels.extend(restaurant.get('price_levels', []))
-        if restaurant.get('min_rating') is not None:
-            min_ratings.append(restaurant['min_rating'])
-        if 'exclude_chains' in restaurant:
-            exclude_chains_votes.append(restaurant['exclude_chains'])
-        
-        # Ambiance and amenities
-        ambiance = prefs.get('ambiance_and_amenities', {})
-        all_ambiances.extend(ambiance.get('ambiances', []))
-        all_amenities.extend(ambiance.get('amenities', []))
-        
-        # Deal breakers
-        all_deal_breakers.extend(prefs.get('deal_breakers', []))
-    
-    # Aggregate the data using most common/consensus logic
-    
-    # Context - sum group sizes, most common occasion/time
-    aggregated['context_preferences']['group_size'] = sum(all_group_sizes) if all_group_sizes else 0
-    aggregated['context_preferences']['occasion'] = Counter(all_occasions).most_common(1)[0][0] if all_occasions else None
-    aggregated['context_preferences']['date_time']['time_preference'] = Counter(all_times).most_common(1)[0][0] if all_times else None
-    aggregated['context_preferences']['date_time']['date_preference'] = Counter(all_dates).most_common(1)[0][0] if all_dates else None
-    
-    # Location - most common location
-    aggregated['location_preferences']['text_input_primary'] = Counter(all_locations).most_common(1)[0][0] if all_locations else None
-    
-    # Cuisines - keep popular ones, combine all avoids
-    cuisine_counts = Counter(all_cuisines)
-    aggregated['cuisine_type_preferences']['desired'] = [cuisine for cuisine, count in cuisine_counts.most_common(5)]
-    aggregated['cuisine_type_preferences']['avoid'] = list(set(all_avoid_cuisines))
-    
-    # Dietary - union of all needs (everyone must be accommodated)
-    aggregated['dietary_preferences']['needs'] = list(set(all_dietary_needs))
-    
-    # Restaurant - consensus on price range and rating
-    if all_price_levels:
-        price_counter = Counter(all_price_levels)
-        # Include price levels that appear more than once OR if only a few unique levels
-        popular_prices = [price for price, count in price_counter.items() if count > 1 or len(price_counter) <= 3]
-        aggregated['restaurant_specific_preferences']['price_levels'] = sorted(list(set(popular_prices))) if popular_prices else sorted(list(set(all_price_levels)))
-    
-    if min_ratings:
-        # Use the highest minimum rating to satisfy everyone - ensure no None values
-        valid_ratings = [r for r in min_ratings if r is not None]
-        aggregated['restaurant_specific_preferences']['min_rating'] = max(valid_ratings) if valid_ratings else None
-    
-    # Exclude chains if majority wants it
-    if exclude_chains_votes:
-        aggregated['restaurant_specific_preferences']['exclude_chains'] = sum(exclude_chains_votes) > len(exclude_chains_votes) / 2
-    
-    # Ambiance - popular choices
-    ambiance_counts = Counter(all_ambiances)
-    aggregated['ambiance_and_amenities']['ambiances'] = [amb for amb, count in ambiance_counts.most_common(3)]
-    
-    amenity_counts = Counter(all_amenities)
-    aggregated['ambiance_and_amenities']['amenities'] = [amt for amt, count in amenity_counts.most_common(3)]
-    
-    # Deal breakers - union (respect everyone's deal breakers)
-    aggregated['deal_breakers'] = list(set(all_deal_breakers))
-    
-    return aggregated
\ No newline at end of file
+    aggregate = GuestPreferenceAggregate()
+    for index, guest in enumerate(guest_preferences):
+        aggregate.add_guest(guest.get('id', str(index)), guest['preferences'])
+    return aggregate.to_preferences()
@@ -0,0 +1,130 @@
+# tools/openapi_artifacts.py
+"""
+Precompiled OpenAPI toolset artifacts.
+
+Building an OpenAPIToolset resolves every $ref in the spec and validates each
+operation into pydantic models, on every process start; each tool then
+converts its JSON schema into a Gemini function declaration again on every
+model request. The build step (run by the Dockerfile)
+
+    python -m conversational_agent.tools.openapi_artifacts [--check]
+
+does both once per spec in COMPILED_SPECS and pickles the parsed operations
+and declarations next to the spec module, as `<spec module>.compiled.pkl`.
+PooledOpenAPIToolset, given the artifact's path, builds its tools from the
+artifact instead, and serves the stored declarations.
+
+An artifact records the hash of the spec it was compiled from and the ADK
+and pydantic versions that compiled it. If any of them differs from the
+running process, the artifact is ignored with a warning and the spec is
+parsed as before, so an edited spec never runs with stale tools. Without
+an artifact (e.g. a local checkout) the spec is simply parsed.
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import pydantic
+from google.adk import __version__ as ADK_VERSION
+from google.adk.tools.openapi_tool.openapi_spec_parser.openapi_spec_parser import OpenApiSpecParser, ParsedOperation
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import RestApiTool
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".compiled.pkl"
+
+# Spec module -> spec variable, for every spec an OpenAPIToolset is built from
+COMPILED_SPECS = {
+    "conversational_agent.adk_agents.busyness_forecast_agent.besttime_openapi_spec": "BESTTIME_OPENAPI_SPEC",
+}
+
+
+class CompiledSpec(NamedTuple):
+    operations: List[ParsedOperation]
+    declarations: Dict[str, types.FunctionDeclaration]
+
+
+def spec_hash(spec: Dict[str, Any]) -> str:
+    """SHA-256 of the spec's canonical JSON."""
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def artifact_path(spec_module_file: str) -> str:
+    """Where the artifact for the spec module at `spec_module_file` lives."""
+    return str(Path(spec_module_file).with_suffix(ARTIFACT_SUFFIX))
+
+
+def _fingerprint(spec: Dict[str, Any]) -> Dict[str, str]:
+    return {"spec_hash": spec_hash(spec), "adk_version": ADK_VERSION, "pydantic_version": pydantic.VERSION}
+
+
+def compile_spec(spec: Dict[str, Any]) -> bytes:
+    """Parse a spec and generate its tools' declarations; returns the pickled artifact."""
+    operations = OpenApiSpecParser().parse(spec)
+    declarations = {}
+    for operation in operations:
+        tool = RestApiTool.from_parsed_operation(operation)
+        declarations[tool.name] = tool._get_declaration()
+    artifact = {**_fingerprint(spec), "operations": operations, "declarations": declarations}
+    return pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_compiled_spec(spec: Dict[str, Any], path: str) -> Optional[CompiledSpec]:
+    """The artifact at `path` if it was compiled from `spec` by these library versions, else None."""
+    try:
+        with open(path, "rb") as f:
+            artifact = pickle.load(f)
+    except FileNotFoundError:
+        logger.info(f"No compiled OpenAPI artifact at {path}; parsing the spec")
+        return None
+    except Exception as e:
+        logger.warning(f"⚠️ Unreadable OpenAPI artifact {path}: {e}; parsing the spec")
+        return None
+
+    if not isinstance(artifact, dict) or any(artifact.get(k) != v for k, v in _fingerprint(spec).items()):
+        logger.warning(f"⚠️ Stale OpenAPI artifact {path}; parsing the spec (rebuild with `python -m {__name__}`)")
+        return None
+    return CompiledSpec(operations=artifact["operations"], declarations=artifact["declarations"])
+
+
+# ===================================================================
+# BUILD STEP
+# ===================================================================
+
+def build_artifacts(check: bool = False) -> List[str]:
+    """Write (or with `check`, verify) the artifact of every spec in COMPILED_SPECS; returns the stale ones."""
+    stale = []
+    for module_name, spec_name in COMPILED_SPECS.items():
+        module = importlib.import_module(module_name)
+        path = artifact_path(module.__file__)
+        spec = getattr(module, spec_name)
+        up_to_date = load_compiled_spec(spec, path) is not None
+
+        if up_to_date:
+            print(f"✅ {path} is up to date")
+            continue
+        stale.append(path)
+        if check:
+            print(f"❌ {path} is missing or stale")
+        else:
+            with open(path, "wb") as f:
+                f.write(compile_spec(spec))
+            print(f"✅ Wrote {path}")
+    return stale
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompile the OpenAPI toolset artifacts.")
+    parser.add_argument("--check", action="store_true", help="fail if an artifact is missing or stale instead of writing it")
+    args = parser.parse_args()
+    if build_artifacts(check=args.check) and args.check:
+        sys.exit(1)
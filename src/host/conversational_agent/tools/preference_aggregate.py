@@ -0,0 +1,236 @@
+# tools/preference_aggregate.py
+"""
+Incrementally maintained aggregate of a party's guest preferences.
+
+Keeps one tally per aggregated field instead of re-collecting every guest's
+lists on each call. Guests can be added, removed by id (e.g. when they
+resubmit or are deleted) and whole aggregates merged, each in time
+proportional to the preferences involved; `to_preferences()` renders the
+same structure `_aggregate_guest_preferences` always produced.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _Tally:
+    """
+    Counts per value, plus every (guest sequence, list position) the value
+    was added at, so ties rank by first appearance among the guests still
+    present, like Counter.most_common over their concatenated lists.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.positions: Dict[Any, Counter] = {}
+
+    def apply(self, values: Iterable, sequence: int, sign: int) -> None:
+        """Add (sign=1) or retract (sign=-1) one guest's values, dropping tallies that reach zero."""
+        for position, value in enumerate(values):
+            self.counts[value] += sign
+            positions = self.positions.setdefault(value, Counter())
+            positions[(sequence, position)] += sign
+            if positions[(sequence, position)] <= 0:
+                del positions[(sequence, position)]
+            if self.counts[value] <= 0:
+                del self.counts[value]
+                del self.positions[value]
+
+    def merge(self, other: '_Tally', sequence_offset: int) -> None:
+        for value, count in other.counts.items():
+            self.counts[value] += count
+            positions = self.positions.setdefault(value, Counter())
+            for (sequence, position), n in other.positions[value].items():
+                positions[(sequence + sequence_offset, position)] += n
+
+    def most_common(self, n: int) -> List[Any]:
+        return sorted(self.counts, key=lambda value: (-self.counts[value], min(self.positions[value])))[:n]
+
+    def first(self) -> Optional[Any]:
+        top = self.most_common(1)
+        return top[0] if top else None
+
+    def values(self) -> List[Any]:
+        return list(self.counts)
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+
+# Tallies rendered as most-common picks or unions
+_TALLIES = (
+    'occasions', 'times', 'dates', 'locations', 'cuisines', 'price_levels', 'ambiances',
+    'amenities', 'avoid_cuisines', 'dietary_needs', 'deal_breakers', 'min_ratings',
+)
+
+
+class GuestPreferenceAggregate:
+    """
+    Mergeable tallies over guest preference documents.
+
+    Guests are added and removed by id. Ties between equally popular values
+    resolve in the order the values first appear among the guests present,
+    in the order they were added (merged guests count as added after this
+    aggregate's own), matching a from-scratch aggregation over those guests.
+    """
+
+    def __init__(self):
+        self.guest_count = 0
+        self.group_size_total = 0
+        # Most-common picks
+        self.occasions = _Tally()
+        self.times = _Tally()
+        self.dates = _Tally()
+        self.locations = _Tally()
+        self.cuisines = _Tally()
+        self.price_levels = _Tally()
+        self.ambiances = _Tally()
+        self.amenities = _Tally()
+        # Unions (counted so a guest can be removed again)
+        self.avoid_cuisines = _Tally()
+        self.dietary_needs = _Tally()
+        self.deal_breakers = _Tally()
+        # Highest minimum rating wins
+        self.min_ratings = _Tally()
+        # Majority vote
+        self.exclude_chains_yes = 0
+        self.exclude_chains_votes = 0
+        # guest id -> (sequence, preferences)
+        self._guests: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._next_sequence = 0
+
+    def _apply(self, preferences: Dict[str, Any], sequence: int, sign: int) -> None:
+        context = preferences.get('context_preferences') or {}
+        if context.get('group_size') is not None:
+            self.group_size_total += sign * context['group_size']
+        if context.get('occasion'):
+            self.occasions.apply([context['occasion']], sequence, sign)
+
+        date_time = context.get('date_time') or {}
+        if date_time.get('time_preference'):
+            self.times.apply([date_time['time_preference']], sequence, sign)
+        if date_time.get('date_preference'):
+            self.dates.apply([date_time['date_preference']], sequence, sign)
+
+        location = preferences.get('location_preferences') or {}
+        if location.get('text_input_primary'):
+            self.locations.apply([location['text_input_primary']], sequence, sign)
+
+        cuisine = preferences.get('cuisine_type_preferences') or {}
+        self.cuisines.apply(cuisine.get('desired') or [], sequence, sign)
+        self.avoid_cuisines.apply(cuisine.get('avoid') or [], sequence, sign)
+
+        dietary = preferences.get('dietary_preferences') or {}
+        self.dietary_needs.apply(dietary.get('needs') or [], sequence, sign)
+
+        restaurant = preferences.get('restaurant_specific_preferences') or {}
+        self.price_levels.apply(restaurant.get('price_levels') or [], sequence, sign)
+        if restaurant.get('min_rating') is not None:
+            self.min_ratings.apply([restaurant['min_rating']], sequence, sign)
+        if 'exclude_chains' in restaurant:
+            self.exclude_chains_yes += sign * bool(restaurant['exclude_chains'])
+            self.exclude_chains_votes += sign
+
+        ambiance = preferences.get('ambiance_and_amenities') or {}
+        self.ambiances.apply(ambiance.get('ambiances') or [], sequence, sign)
+        self.amenities.apply(ambiance.get('amenities') or [], sequence, sign)
+
+        self.deal_breakers.apply(preferences.get('deal_breakers') or [], sequence, sign)
+        self.guest_count += sign
+
+    def has_guest(self, guest_id: str) -> bool:
+        return guest_id in self._guests
+
+    def add_guest(self, guest_id: str, preferences: Dict[str, Any]) -> None:
+        """Fold one guest's `preferences` section into the aggregate, replacing an earlier one with the same id."""
+        self.remove_guest(guest_id)
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._guests[guest_id] = (sequence, preferences)
+        self._apply(preferences, sequence, 1)
+
+    def remove_guest(self, guest_id: str) -> bool:
+        """Retract a guest; returns False if the guest was not in the aggregate."""
+        entry = self._guests.pop(guest_id, None)
+        if entry is None:
+            return False
+        self._apply(entry[1], entry[0], -1)
+        return True
+
+    def merge(self, other: 'GuestPreferenceAggregate') -> 'GuestPreferenceAggregate':
+        """Fold another aggregate (e.g. another shard of guests, with distinct ids) into this one."""
+        shared = self._guests.keys() & other._guests.keys()
+        if shared:
+            raise ValueError(f"Guests in both aggregates: {sorted(shared)}")
+        offset = self._next_sequence
+        self.guest_count += other.guest_count
+        self.group_size_total += other.group_size_total
+        for name in _TALLIES:
+            getattr(self, name).merge(getattr(other, name), offset)
+        self.exclude_chains_yes += other.exclude_chains_yes
+        self.exclude_chains_votes += other.exclude_chains_votes
+        for guest_id, (sequence, preferences) in other._guests.items():
+            self._guests[guest_id] = (sequence + offset, preferences)
+        self._next_sequence += other._next_sequence
+        return self
+
+    def to_preferences(self) -> Dict[str, Any]:
+        """
+        Render the aggregate in the standard preferences format.
+
+        Returns:
+            Aggregated preferences, or {} if no guests have been added
+        """
+        if self.guest_count <= 0:
+            return {}
+
+        price_levels = []
+        if self.price_levels:
+            # Include price levels that appear more than once OR if only a few unique levels
+            price_counts = self.price_levels.counts
+            popular_prices = [price for price, count in price_counts.items() if count > 1 or len(price_counts) <= 3]
+            price_levels = sorted(set(popular_prices or price_counts))
+
+        return {
+            "context_preferences": {
+                "group_size": self.group_size_total,
+                "occasion": self.occasions.first(),
+                "date_time": {
+                    "date_preference": self.dates.first(),
+                    "time_preference": self.times.first()
+                }
+            },
+            "location_preferences": {
+                "text_input_primary": self.locations.first(),
+                "text_input_secondary": None,
+                "coordinates_primary": {
+                    "latitude": None,
+                    "longitude": None
+                },
+                "search_radius_km": None,
+                "max_travel_time_minutes": None,
+                "avoid_areas": []
+            },
+            "cuisine_type_preferences": {
+                "desired": self.cuisines.most_common(5),
+                "open_to_suggestions": True,
+                "avoid": self.avoid_cuisines.values()
+            },
+            "dietary_preferences": {
+                "needs": self.dietary_needs.values(),
+                "general_notes": None
+            },
+            "restaurant_specific_preferences": {
+                "price_levels": price_levels,
+                "min_rating": max(self.min_ratings.values()) if self.min_ratings else None,
+                "attribute_preferences": [],
+                "exclude_chains": self.exclude_chains_yes > self.exclude_chains_votes / 2 if self.exclude_chains_votes else False,
+                "specific_restaurants_mentioned": []
+            },
+            "ambiance_and_amenities": {
+                "ambiances": self.ambiances.most_common(3),
+                "amenities": self.amenities.most_common(3)
+            },
+            "willing_to_compromise_on": [],
+            "deal_breakers": self.deal_breakers.values()
+        }
@@ -0,0 +1,227 @@
+# tools/session_store.py
+"""
+Session store for the ADK server: a DatabaseSessionService tuned for SQLite.
+
+With SQLite's defaults (rollback journal, synchronous=FULL) every session
+write locks the whole file and waits for an fsync, so concurrent users queue
+behind each other, and a writer makes readers wait too. SqliteSessionService
+opens every connection with:
+
+- journal_mode=WAL: readers never wait for the writer, and commits append to
+  the log instead of rewriting pages;
+- synchronous=NORMAL: no fsync per commit (still safe with WAL, a power cut
+  can only lose the last commits);
+- mmap_size: reads served from a memory map instead of read() calls;
+- busy_timeout: a writer waits for the lock instead of failing with
+  "database is locked";
+
+and uses a sized connection pool (SESSION_DB_POOL_SIZE + SESSION_DB_MAX_OVERFLOW).
+
+Sessions and their events are otherwise kept forever. run_session_pruning()
+deletes sessions with no activity (state change or event) for SESSION_TTL_S,
+in small batches so it never holds the write lock for long, then checkpoints
+the WAL; freed pages are reused by later sessions, so the file stops growing.
+
+When a turn starts a new search, the events compacted by
+tools/event_compaction.py (tool payloads and state deltas from earlier turns)
+are rewritten in place, so the event log stays small too.
+
+firestore://<root collection> URLs get the FirestoreSessionService from
+tools/firestore_session_service.py, for instances without a persistent disk.
+
+build_fast_api_app() builds ADK's FastAPI app around one of these services.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.database_session_service import DatabaseSessionService, StorageEvent, StorageSession
+from sqlalchemy import delete, event, exists, func, make_url, select, text, tuple_
+
+from conversational_agent.config.settings import (
+    SESSION_DB_BUSY_TIMEOUT_S,
+    SESSION_DB_MAX_OVERFLOW,
+    SESSION_DB_MMAP_SIZE_MB,
+    SESSION_DB_POOL_SIZE,
+    SESSION_PRUNE_BATCH_SIZE,
+    SESSION_PRUNE_INTERVAL_S,
+    SESSION_TTL_S,
+)
+from conversational_agent.tools.event_compaction import compact_session_events, starts_search_cycle
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteSessionService(DatabaseSessionService):
+    """DatabaseSessionService with WAL, relaxed fsync, mmap reads and a sized pool (see module docstring)."""
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_size: int = SESSION_DB_POOL_SIZE,
+        max_overflow: int = SESSION_DB_MAX_OVERFLOW,
+        mmap_size_mb: int = SESSION_DB_MMAP_SIZE_MB,
+        busy_timeout_s: float = SESSION_DB_BUSY_TIMEOUT_S,
+        **kwargs: Any,
+    ):
+        super().__init__(
+            db_url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            connect_args={"timeout": busy_timeout_s, "check_same_thread": False},
+            **kwargs,
+        )
+        pragmas = (
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA mmap_size={mmap_size_mb * 1024 * 1024}",
+            f"PRAGMA busy_timeout={int(busy_timeout_s * 1000)}",
+        )
+
+        def _configure_connection(dbapi_connection, _connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        event.listen(self.db_engine, "connect", _configure_connection)
+        # The parent created the tables over connections opened before the listener; reopen them tuned
+        self.db_engine.dispose()
+        logger.info(f"✅ SQLite session store {self.db_engine.url.database}: WAL, pool {pool_size}+{max_overflow}")
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        await super().append_event(session=session, event=event)
+        if not event.partial and starts_search_cycle(event):
+            self._rewrite_events(session, compact_session_events(session))
+        return event
+
+    def _rewrite_events(self, session: Session, events: List[Event]) -> None:
+        """Store the compacted `events` over their originals; on failure they are compacted again next search."""
+        if not events:
+            return
+        try:
+            with self.database_session_factory() as db:
+                for compacted in events:
+                    stored = db.get(StorageEvent, (compacted.id, session.app_name, session.user_id, session.id))
+                    if stored is None:
+                        continue
+                    stored.content = compacted.content.model_dump(exclude_none=True, mode="json") if compacted.content else None
+                    stored.actions = compacted.actions
+                db.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Rewriting {len(events)} compacted events of session {session.id} failed: {e}")
+
+    def _expired_sessions(self, ttl_s: float, limit: int) -> List[Tuple[str, str, str]]:
+        # update_time only moves when session state changes, so recent events count as activity too.
+        # ADK writes update_time as UTC (CURRENT_TIMESTAMP) but event timestamps in local time.
+        event_cutoff = datetime.fromtimestamp(time.time() - ttl_s)
+        recent_event = exists().where(
+            StorageEvent.app_name == StorageSession.app_name,
+            StorageEvent.user_id == StorageSession.user_id,
+            StorageEvent.session_id == StorageSession.id,
+            StorageEvent.timestamp >= event_cutoff,
+        )
+        query = (
+            select(StorageSession.app_name, StorageSession.user_id, StorageSession.id)
+            .where(StorageSession.update_time < func.datetime("now", f"-{int(ttl_s)} seconds"))
+            .where(~recent_event)
+            .limit(limit)
+        )
+        with self.database_session_factory() as db:
+            return [tuple(row) for row in db.execute(query)]
+
+    def prune_expired_sessions(self, ttl_s: float = SESSION_TTL_S, batch_size: int = SESSION_PRUNE_BATCH_SIZE) -> int:
+        """Delete sessions (and their events) idle for more than `ttl_s`. Returns the number of sessions removed."""
+        removed = 0
+        while True:
+            keys = self._expired_sessions(ttl_s, batch_size)
+            if not keys:
+                break
+            with self.database_session_factory() as db:
+                db.execute(delete(StorageEvent).where(
+                    tuple_(StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id).in_(keys)
+                ))
+                db.execute(delete(StorageSession).where(
+                    tuple_(StorageSession.app_name, StorageSession.user_id, StorageSession.id).in_(keys)
+                ))
+                db.commit()
+            removed += len(keys)
+            if len(keys) < batch_size:
+                break
+
+        if removed:
+            with self.db_engine.connect() as connection:
+                connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        return removed
+
+
+FIRESTORE_URL_PREFIX = "firestore://"
+
+
+def create_session_service(db_url: str) -> BaseSessionService:
+    """The session service for a database URL; SQLite files get the tuned SqliteSessionService."""
+    if db_url.startswith(FIRESTORE_URL_PREFIX):
+        # Imported here, so SQLite deployments never load the Firestore client
+        from conversational_agent.tools.firestore_session_service import FirestoreSessionService
+        return FirestoreSessionService(root_collection=db_url[len(FIRESTORE_URL_PREFIX):].strip("/") or "adk_sessions")
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        return SqliteSessionService(db_url)
+    return DatabaseSessionService(db_url)
+
+
+async def run_session_pruning(
+    session_service: BaseSessionService,
+    ttl_s: float = SESSION_TTL_S,
+    interval_s: float = SESSION_PRUNE_INTERVAL_S,
+) -> None:
+    """Background task: prune expired sessions every `interval_s`; returns at once if pruning is disabled."""
+    if not isinstance(session_service, SqliteSessionService) or ttl_s <= 0 or interval_s <= 0:
+        return
+    while True:
+        try:
+            removed = await asyncio.to_thread(session_service.prune_expired_sessions, ttl_s)
+            if removed:
+                logger.info(f"✅ Pruned {removed} sessions idle for more than {ttl_s:.0f}s")
+        except Exception as e:
+            logger.warning(f"⚠️ Session pruning failed: {e}")
+        await asyncio.sleep(interval_s)
+
+
+async def close_session_service(session_service: BaseSessionService) -> None:
+    """Commit the writes a session service still buffers (FirestoreSessionService) before shutdown."""
+    close = getattr(session_service, "close", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        logger.warning(f"⚠️ Closing the session store failed: {e}")
+
+
+# ===================================================================
+# FASTAPI APP
+# ===================================================================
+
+def build_fast_api_app(session_service: BaseSessionService, **kwargs: Any):
+    """
+    ADK's get_fast_api_app, serving sessions from `session_service`.
+
+    get_fast_api_app (google-adk ~=1.4.1, pinned in requirements.txt) only
+    takes a session_service_uri and builds a DatabaseSessionService from it,
+    so that module attribute is pointed at this service for the duration of
+    the call. Recheck this when upgrading ADK.
+    """
+    from google.adk.cli import fast_api as adk_fast_api
+
+    database_session_service = adk_fast_api.DatabaseSessionService
+    adk_fast_api.DatabaseSessionService = lambda db_url: session_service
+    try:
+        return adk_fast_api.get_fast_api_app(**kwargs)
+    finally:
+        adk_fast_api.DatabaseSessionService = database_session_service
@@ -0,0 +1,182 @@
+# test_deadline_parallel_agent.py
+"""
+Tests for DeadlineParallelAgent run the way the app runs it: inside an
+AgentTool called by a root agent, with one branch slower than its deadline.
+The slow branch gets a placeholder; with attach_late_results its real output
+reaches the root session on the next turn, unless a newer search started.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_deadline_parallel_agent.py
+"""
+
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import ToolContext
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from conversational_agent.adk_agents.deadline_parallel_agent import DeadlineParallelAgent, merge_late_results
+from conversational_agent.tools.enrichment_utils import dump_state_json
+
+APP_NAME = "forkcast_test"
+SLOW_BRANCH_S = 0.3
+# What the placeholder factory below leaves in state (outputs are stored as JSON)
+PLACEHOLDER = dump_state_json({"slow": None})
+
+
+class _StubBranch(BaseAgent):
+    """Writes `output` to its output_key after `delay_s`."""
+
+    output_key: str
+    output: str
+    delay_s: float = 0.0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay_s)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=self.output)]),
+            actions=EventActions(state_delta={self.output_key: self.output}),
+        )
+
+
+class _StubToolUsingBranch(BaseAgent):
+    """Calls a tool, then writes its output only if the call is in its session, as an LlmAgent needs it to be."""
+
+    output_key: str
+    delay_s: float = 0.0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay_s)
+        call = types.FunctionCall(id="call-1", name="lookup", args={})
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+        )
+        seen = any(call.id in [c.id for c in e.get_function_calls()] for e in ctx.session.events)
+        output = "slow" if seen else "call missing from session"
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=output)]),
+            actions=EventActions(state_delta={self.output_key: output}),
+        )
+
+
+class _StubRoot(BaseAgent):
+    """Calls the search AgentTool on turns whose message is "search", as the root LlmAgent does."""
+
+    search_tool: AgentTool
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if ctx.user_content.parts[0].text != "search":
+            return
+        tool_context = ToolContext(ctx)
+        await self.search_tool.run_async(args={"request": "search"}, tool_context=tool_context)
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, actions=tool_context.actions)
+
+
+def _runner(attach_late_results: bool, slow_branch: BaseAgent = None) -> Runner:
+    search_agent = DeadlineParallelAgent(
+        name="Enrichment",
+        sub_agents=[
+            _StubBranch(name="Fast", output_key="fast_data", output="fast"),
+            slow_branch or _StubBranch(name="Slow", output_key="slow_data", output="slow", delay_s=SLOW_BRANCH_S),
+        ],
+        branch_timeout_s=0.05,
+        deadline_s=0,
+        placeholders={"slow_data": lambda search_results: {"slow": None}},
+        attach_late_results=attach_late_results,
+    )
+    root = _StubRoot(name="Root", search_tool=AgentTool(agent=search_agent), before_agent_callback=merge_late_results)
+    return Runner(app_name=APP_NAME, agent=root, session_service=InMemorySessionService())
+
+
+async def _turn(runner: Runner, session_id: str, text: str) -> dict:
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    async for _ in runner.run_async(user_id="user", session_id=session_id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(app_name=APP_NAME, user_id="user", session_id=session_id)
+    return session.state
+
+
+async def _new_session(runner: Runner) -> str:
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id="user")
+    return session.id
+
+
+def test_slow_branch_gets_placeholder():
+    async def scenario():
+        runner = _runner(attach_late_results=False)
+        session_id = await _new_session(runner)
+        state = await _turn(runner, session_id, "search")
+        assert state["fast_data"] == "fast"
+        assert state["slow_data"] == PLACEHOLDER
+
+        await asyncio.sleep(SLOW_BRANCH_S * 2)
+        state = await _turn(runner, session_id, "thanks")
+        assert state["slow_data"] == PLACEHOLDER
+
+    asyncio.run(scenario())
+
+
+def test_late_result_is_merged_into_the_root_session_next_turn():
+    async def scenario():
+        runner = _runner(attach_late_results=True)
+        session_id = await _new_session(runner)
+        state = await _turn(runner, session_id, "search")
+        assert state["slow_data"] == PLACEHOLDER
+
+        await asyncio.sleep(SLOW_BRANCH_S * 2)
+        state = await _turn(runner, session_id, "thanks")
+        assert state["fast_data"] == "fast"
+        assert state["slow_data"] == "slow"
+
+    asyncio.run(scenario())
+
+
+def test_late_multi_step_branch_sees_its_own_calls():
+    async def scenario():
+        slow_branch = _StubToolUsingBranch(name="Slow", output_key="slow_data", delay_s=SLOW_BRANCH_S)
+        runner = _runner(attach_late_results=True, slow_branch=slow_branch)
+        session_id = await _new_session(runner)
+        state = await _turn(runner, session_id, "search")
+        assert state["slow_data"] == PLACEHOLDER
+
+        await asyncio.sleep(SLOW_BRANCH_S * 2)
+        state = await _turn(runner, session_id, "thanks")
+        assert state["slow_data"] == "slow"
+
+    asyncio.run(scenario())
+
+
+def test_late_result_of_a_superseded_search_is_dropped():
+    async def scenario():
+        runner = _runner(attach_late_results=True)
+        session_id = await _new_session(runner)
+        await _turn(runner, session_id, "search")
+        # A new search starts before the first one's slow branch lands
+        state = await _turn(runner, session_id, "search")
+        assert state["slow_data"] == PLACEHOLDER
+
+        # Only the second search's late result is merged, once
+        await asyncio.sleep(SLOW_BRANCH_S * 2)
+        state = await _turn(runner, session_id, "thanks")
+        assert state["slow_data"] == "slow"
+        session = await runner.session_service.get_session(app_name=APP_NAME, user_id="user", session_id=session_id)
+        merges = [e for e in session.events if (e.actions.state_delta or {}).get("slow_data") == "slow"]
+        assert len(merges) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,102 @@
+# test_event_compaction.py
+"""
+Tests for compact_session_events: when a new search starts, the payloads of
+earlier turns are compacted while the current turn and the conversation
+itself are kept.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_event_compaction.py
+"""
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from conversational_agent.tools.event_compaction import compact_session_events
+
+SEARCH_TOOL = "SequentialSearchAgent"
+PAYLOAD = {"search_results": [{"name": f"Place {i}", "reviews": ["great"] * 20} for i in range(10)]}
+
+
+def _turn(invocation_id: str, user_text: str) -> list:
+    """One search turn: user message, search call, its response (with state delta), answer."""
+    return [
+        Event(invocation_id=invocation_id, author="user",
+              content=types.Content(role="user", parts=[types.Part(text=user_text)])),
+        Event(invocation_id=invocation_id, author="ConversationalAgent",
+              content=types.Content(role="model", parts=[
+                  types.Part(function_call=types.FunctionCall(name=SEARCH_TOOL, args={"request": user_text}))
+              ])),
+        Event(invocation_id=invocation_id, author="ConversationalAgent",
+              content=types.Content(role="user", parts=[
+                  types.Part(function_response=types.FunctionResponse(name=SEARCH_TOOL, response=PAYLOAD))
+              ]),
+              actions=EventActions(state_delta={"search_results": PAYLOAD})),
+        Event(invocation_id=invocation_id, author="ConversationalAgent",
+              content=types.Content(role="model", parts=[types.Part(text=f"Results for {user_text}")])),
+    ]
+
+
+def _session(*turns) -> Session:
+    return Session(id="session", app_name="forkcast_test", user_id="user", events=[e for turn in turns for e in turn])
+
+
+def _response(event: Event):
+    return event.content.parts[0].function_response.response
+
+
+def test_nothing_to_compact_without_an_earlier_search():
+    session = _session(_turn("t1", "ramen"))
+    assert compact_session_events(session, enabled=True) == []
+    assert _response(session.events[2]) == PAYLOAD
+
+
+def test_disabled():
+    session = _session(_turn("t1", "ramen"), _turn("t2", "tacos"))
+    assert compact_session_events(session, enabled=False) == []
+    assert _response(session.events[2]) == PAYLOAD
+
+
+def test_compacts_earlier_turns_and_keeps_the_current_one():
+    first, current = _turn("t1", "ramen"), _turn("t2", "tacos")
+    session = _session(first, current)
+    compacted = compact_session_events(session, enabled=True)
+
+    # Only the earlier turn's function response carries a payload or delta
+    assert [e.id for e in compacted] == [first[2].id]
+    response = _response(session.events[2])
+    assert response["compacted"] is True
+    assert response["chars"] > len(response["summary"])
+    assert session.events[2].actions.state_delta == {}
+
+    # The current turn is untouched, and so is the conversation
+    assert session.events[4:] == current
+    assert session.events[0].content.parts[0].text == "ramen"
+    assert session.events[1].get_function_calls()[0].name == SEARCH_TOOL
+    assert session.events[3].content.parts[0].text == "Results for ramen"
+
+
+def test_compacted_events_are_copies():
+    first = _turn("t1", "ramen")
+    session = _session(first, _turn("t2", "tacos"))
+    compact_session_events(session, enabled=True)
+    assert _response(first[2]) == PAYLOAD
+    assert first[2].actions.state_delta == {"search_results": PAYLOAD}
+
+
+def test_idempotent():
+    session = _session(_turn("t1", "ramen"), _turn("t2", "tacos"))
+    compact_session_events(session, enabled=True)
+    events = [e.model_copy(deep=True) for e in session.events]
+
+    assert compact_session_events(session, enabled=True) == []
+    assert session.events == events
+
+
+def test_a_later_search_compacts_only_what_is_new():
+    session = _session(_turn("t1", "ramen"), _turn("t2", "tacos"))
+    compact_session_events(session, enabled=True)
+    session.events.extend(_turn("t3", "pho"))
+
+    compacted = compact_session_events(session, enabled=True)
+    assert [e.id for e in compacted] == [session.events[6].id]
+    assert _response(session.events[10]) == PAYLOAD
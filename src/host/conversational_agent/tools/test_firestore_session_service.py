@@ -0,0 +1,225 @@
+# test_firestore_session_service.py
+"""
+Tests for FirestoreSessionService.
+
+Write coalescing against the Firestore emulator (skipped unless
+FIRESTORE_EMULATOR_HOST is set, e.g. after `gcloud emulators firestore start`):
+a turn's events stay buffered until its final response and go out in one
+commit with the merged state. Retry and bookkeeping behaviour runs without
+Firestore, with the commit stubbed out.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_firestore_session_service.py
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from conversational_agent.tools.firestore_session_service import FirestoreSessionService
+
+APP_NAME = "forkcast_test"
+
+requires_emulator = pytest.mark.skipif(
+    not os.environ.get("FIRESTORE_EMULATOR_HOST"), reason="needs the Firestore emulator (FIRESTORE_EMULATOR_HOST)"
+)
+
+
+def _user_message(text: str) -> Event:
+    return Event(invocation_id="turn", author="user", content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+def _tool_call(state_delta: dict) -> Event:
+    call = types.Part(function_call=types.FunctionCall(name="SequentialSearchAgent", args={"request": "search"}))
+    return Event(
+        invocation_id="turn",
+        author="ConversationalAgent",
+        content=types.Content(role="model", parts=[call]),
+        actions=EventActions(state_delta=state_delta),
+    )
+
+
+def _answer(text: str, state_delta: dict = None) -> Event:
+    return Event(
+        invocation_id="turn",
+        author="ConversationalAgent",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+# ===================================================================
+# AGAINST THE EMULATOR
+# ===================================================================
+
+def _emulator_client():
+    from google.cloud import firestore
+    return firestore.AsyncClient(project="forkcast-test")
+
+
+def _emulator_service(**kwargs) -> FirestoreSessionService:
+    # A long flush delay, so only the final response (or a read) commits
+    kwargs.setdefault("flush_delay_s", 60)
+    return FirestoreSessionService(root_collection=f"test_{uuid.uuid4().hex}", client=_emulator_client(), **kwargs)
+
+
+async def _stored_event_count(service: FirestoreSessionService, session: Session) -> int:
+    events = service._session_ref(session.app_name, session.user_id, session.id).collection("events")
+    return len(await events.get())
+
+
+@requires_emulator
+def test_turn_is_buffered_until_its_final_response():
+    async def scenario():
+        service = _emulator_service()
+        session = await service.create_session(app_name=APP_NAME, user_id="user")
+
+        await service.append_event(session, _user_message("find me ramen"))
+        await service.append_event(session, _tool_call({"search_results": "[]"}))
+        assert await _stored_event_count(service, session) == 0
+
+        await service.append_event(session, _answer("Here are three ramen places."))
+        assert await _stored_event_count(service, session) == 3
+        assert not service._pending
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+@requires_emulator
+def test_turn_state_is_merged():
+    async def scenario():
+        service = _emulator_service()
+        session = await service.create_session(
+            app_name=APP_NAME, user_id="user", state={"query": "ramen", "user:home": "SoMa", "app:version": 1}
+        )
+        await service.append_event(session, _user_message("cheaper please"))
+        await service.append_event(session, _tool_call({"query": "cheap ramen", "search_results": "[1]"}))
+        await service.append_event(session, _answer("Done.", {"search_results": "[2]", "user:budget": 1}))
+
+        # A fresh service reads only what was committed
+        stored = await FirestoreSessionService(root_collection=service.root_collection, client=service.client).get_session(
+            app_name=APP_NAME, user_id="user", session_id=session.id
+        )
+        assert stored.state == {
+            "query": "cheap ramen",
+            "search_results": "[2]",
+            "user:home": "SoMa",
+            "user:budget": 1,
+            "app:version": 1,
+        }
+        assert [e.id for e in stored.events] == [e.id for e in session.events]
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+@requires_emulator
+def test_reading_a_session_commits_its_buffer():
+    async def scenario():
+        service = _emulator_service()
+        session = await service.create_session(app_name=APP_NAME, user_id="user")
+        await service.append_event(session, _user_message("hello"))
+
+        stored = await service.get_session(app_name=APP_NAME, user_id="user", session_id=session.id)
+        assert len(stored.events) == 1
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+@requires_emulator
+def test_create_session_does_not_overwrite_an_existing_one():
+    async def scenario():
+        service = _emulator_service()
+        session = await service.create_session(app_name=APP_NAME, user_id="user", state={"query": "ramen"})
+        with pytest.raises(ValueError):
+            await service.create_session(app_name=APP_NAME, user_id="user", session_id=session.id)
+
+        stored = await service.get_session(app_name=APP_NAME, user_id="user", session_id=session.id)
+        assert stored.state == {"query": "ramen"}
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+# ===================================================================
+# WITHOUT FIRESTORE
+# ===================================================================
+
+class _StubCommitService(FirestoreSessionService):
+    """Records commits instead of writing them; fails the first `failures` of them."""
+
+    def __init__(self, failures: int = 0, **kwargs):
+        super().__init__(flush_delay_s=0.01, **kwargs)
+        self.failures = failures
+        self.committed = []
+
+    async def _commit(self, key, pending) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Firestore unavailable")
+        self.committed.append((key, [event.id for event in pending.events], dict(pending.session_state)))
+
+
+def _session() -> Session:
+    return Session(id="session", app_name=APP_NAME, user_id="user")
+
+
+def test_commit_lock_is_dropped_after_a_successful_flush():
+    async def scenario():
+        service = _StubCommitService()
+        session = _session()
+        await service.append_event(session, _user_message("hi"))
+        await service.append_event(session, _answer("Hello!", {"greeted": True}))
+
+        assert len(service.committed) == 1
+        assert service.committed[0][2] == {"greeted": True}
+        assert not service._pending
+        assert not service._commit_locks
+
+    asyncio.run(scenario())
+
+
+def test_failed_commit_is_retried():
+    async def scenario():
+        service = _StubCommitService(failures=2, max_commit_attempts=5)
+        session = _session()
+        await service.append_event(session, _user_message("hi"))
+        await service.append_event(session, _answer("Hello!"))
+        assert not service.committed
+        assert service._commit_locks
+
+        await asyncio.sleep(0.2)
+        assert len(service.committed) == 1
+        assert len(service.committed[0][1]) == 2
+        assert not service._pending
+        assert not service._commit_locks
+
+    asyncio.run(scenario())
+
+
+def test_writes_are_dropped_after_max_commit_attempts():
+    async def scenario():
+        service = _StubCommitService(failures=100, max_commit_attempts=3)
+        session = _session()
+        await service.append_event(session, _user_message("hi"))
+        await service.append_event(session, _answer("Hello!"))
+
+        await asyncio.sleep(0.2)
+        assert service.failures == 100 - 3
+        assert not service._pending
+        assert not service._commit_locks
+
+        # Later turns are committed again once Firestore is back
+        service.failures = 0
+        await service.append_event(session, _user_message("still there?"))
+        await service.append_event(session, _answer("Yes."))
+        assert len(service.committed) == 1
+        assert len(service.committed[0][1]) == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,128 @@
+# test_preference_aggregate.py
+"""
+Tests for GuestPreferenceAggregate: a from-scratch aggregation matches what
+_aggregate_guest_preferences always produced, and removing or merging guests
+gives the same result as aggregating the resulting guests from scratch.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_preference_aggregate.py
+"""
+
+import pytest
+
+from conversational_agent.tools.preference_aggregate import GuestPreferenceAggregate
+
+
+def _guest(group_size, occasion, time, location, desired, avoid, needs, prices, min_rating, exclude_chains, ambiances, deal_breakers):
+    return {
+        "context_preferences": {
+            "group_size": group_size,
+            "occasion": occasion,
+            "date_time": {"time_preference": time},
+        },
+        "location_preferences": {"text_input_primary": location},
+        "cuisine_type_preferences": {"desired": desired, "avoid": avoid},
+        "dietary_preferences": {"needs": needs},
+        "restaurant_specific_preferences": {
+            "price_levels": prices,
+            "min_rating": min_rating,
+            "exclude_chains": exclude_chains,
+        },
+        "ambiance_and_amenities": {"ambiances": ambiances, "amenities": []},
+        "deal_breakers": deal_breakers,
+    }
+
+
+GUESTS = {
+    "ana": _guest(2, "birthday", "7pm", "Mission", ["Thai", "Pizza"], ["Sushi"], ["vegan"], [1, 2], 4.0, True, ["cozy"], ["loud"]),
+    "ben": _guest(3, "casual", "8pm", "SoMa", ["Pizza", "Tacos"], [], [], [2, 3], 3.5, False, ["lively"], []),
+    "cy": _guest(1, "birthday", "8pm", "SoMa", ["Sushi", "Thai"], ["Tacos"], ["gluten-free"], [2], 4.5, True, ["lively", "cozy"], ["far"]),
+}
+
+
+def _aggregate(guest_ids):
+    aggregate = GuestPreferenceAggregate()
+    for guest_id in guest_ids:
+        aggregate.add_guest(guest_id, GUESTS[guest_id])
+    return aggregate
+
+
+def _normalized(preferences):
+    """Unions come from sets, so their order is not part of the result."""
+    preferences["cuisine_type_preferences"]["avoid"].sort()
+    preferences["dietary_preferences"]["needs"].sort()
+    preferences["deal_breakers"].sort()
+    return preferences
+
+
+def test_empty_aggregate_has_no_preferences():
+    assert GuestPreferenceAggregate().to_preferences() == {}
+
+
+def test_aggregate_matches_baseline_aggregation():
+    preferences = _normalized(_aggregate(["ana", "ben", "cy"]).to_preferences())
+
+    assert preferences["context_preferences"] == {
+        "group_size": 6,
+        "occasion": "birthday",
+        "date_time": {"date_preference": None, "time_preference": "8pm"},
+    }
+    assert preferences["location_preferences"]["text_input_primary"] == "SoMa"
+    # Ties (Thai / Pizza, both twice) keep the order they first appeared in
+    assert preferences["cuisine_type_preferences"]["desired"] == ["Thai", "Pizza", "Tacos", "Sushi"]
+    assert preferences["cuisine_type_preferences"]["avoid"] == ["Sushi", "Tacos"]
+    assert preferences["dietary_preferences"]["needs"] == ["gluten-free", "vegan"]
+    assert preferences["restaurant_specific_preferences"]["price_levels"] == [1, 2, 3]
+    assert preferences["restaurant_specific_preferences"]["min_rating"] == 4.5
+    assert preferences["restaurant_specific_preferences"]["exclude_chains"] is True
+    assert preferences["ambiance_and_amenities"]["ambiances"] == ["cozy", "lively"]
+    assert preferences["deal_breakers"] == ["far", "loud"]
+
+
+@pytest.mark.parametrize("removed", ["ana", "ben", "cy"])
+def test_remove_matches_aggregating_the_remaining_guests(removed):
+    aggregate = _aggregate(["ana", "ben", "cy"])
+    assert aggregate.remove_guest(removed)
+    assert not aggregate.has_guest(removed)
+
+    remaining = [guest_id for guest_id in ["ana", "ben", "cy"] if guest_id != removed]
+    assert _normalized(aggregate.to_preferences()) == _normalized(_aggregate(remaining).to_preferences())
+
+
+def test_remove_unknown_guest_is_a_no_op():
+    aggregate = _aggregate(["ana"])
+    assert not aggregate.remove_guest("nobody")
+    assert aggregate.to_preferences() == _aggregate(["ana"]).to_preferences()
+
+
+def test_removing_every_guest_empties_the_aggregate():
+    aggregate = _aggregate(["ana", "ben"])
+    aggregate.remove_guest("ana")
+    aggregate.remove_guest("ben")
+    assert aggregate.to_preferences() == {}
+
+
+def test_resubmission_replaces_the_earlier_preferences():
+    aggregate = _aggregate(["ana", "ben"])
+    aggregate.add_guest("ana", GUESTS["cy"])
+    assert aggregate.guest_count == 2
+
+    expected = GuestPreferenceAggregate()
+    expected.add_guest("ben", GUESTS["ben"])
+    expected.add_guest("ana", GUESTS["cy"])
+    assert _normalized(aggregate.to_preferences()) == _normalized(expected.to_preferences())
+
+
+@pytest.mark.parametrize("split", [1, 2])
+def test_merge_matches_aggregating_all_guests(split):
+    guest_ids = ["ana", "ben", "cy"]
+    merged = _aggregate(guest_ids[:split]).merge(_aggregate(guest_ids[split:]))
+    assert _normalized(merged.to_preferences()) == _normalized(_aggregate(guest_ids).to_preferences())
+
+    # Merged guests can be removed again
+    merged.remove_guest("ana")
+    assert _normalized(merged.to_preferences()) == _normalized(_aggregate(["ben", "cy"]).to_preferences())
+
+
+def test_merge_rejects_shared_guests():
+    with pytest.raises(ValueError):
+        _aggregate(["ana", "ben"]).merge(_aggregate(["ben"]))
@@ -0,0 +1,35 @@
+# test_rate_limiter.py
+"""
+Tests for the daily quota counters: stores opened on the same SQLite file
+(e.g. by several workers) share one budget per provider and day.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_rate_limiter.py
+"""
+
+from conversational_agent.tools.rate_limiter import DailyQuotaStore
+
+
+def test_stores_on_the_same_file_share_a_count(tmp_path):
+    path = str(tmp_path / "quota.db")
+    first, second = DailyQuotaStore(path), DailyQuotaStore(path)
+
+    assert first.try_consume("yelp", 3)
+    assert second.try_consume("yelp", 3)
+    assert first.used("yelp") == second.used("yelp") == 2
+
+    assert first.try_consume("yelp", 3)
+    # The budget is spent for both workers
+    assert not second.try_consume("yelp", 3)
+    assert second.used("yelp") == 3
+
+    second.refund("yelp")
+    assert first.used("yelp") == 2
+    assert first.used("fsq") == 0
+
+
+def test_count_survives_reopening(tmp_path):
+    path = str(tmp_path / "quota.db")
+    store = DailyQuotaStore(path)
+    store.try_consume("besttime", 10)
+
+    assert DailyQuotaStore(path).used("besttime") == 1
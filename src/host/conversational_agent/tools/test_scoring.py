@@ -0,0 +1,90 @@
+# test_scoring.py
+"""
+Tests for the final review's deterministic ranking (score_candidates):
+requirement violations rank last, the sorting preference orders the rest,
+and candidates that tie keep their input order.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_scoring.py
+"""
+
+from conversational_agent.adk_agents.final_review_agent.scoring import score_candidates
+
+ORIGIN = {"latitude": 37.7749, "longitude": -122.4194}
+
+
+def _candidate(place_id, rating=4.5, price_level=2, primary_type="italian_restaurant", lat_offset=0.0, features=""):
+    return {
+        "place_id": place_id,
+        "name": place_id,
+        "primary_type": primary_type,
+        "rating": rating,
+        "price_level": price_level,
+        "latitude": ORIGIN["latitude"] + lat_offset,
+        "longitude": ORIGIN["longitude"],
+        "feature_text": features,
+    }
+
+
+def _query(sorting=None, **restaurant):
+    return {
+        "preferences": {
+            "location_preferences": {"coordinates_primary": ORIGIN, "search_radius_km": 5},
+            "cuisine_type_preferences": {"desired": ["Italian"], "avoid": ["Mexican"]},
+            "restaurant_specific_preferences": {"price_levels": [2], **restaurant},
+        },
+        "meta_preferences_for_results": {"sorting_preference": sorting},
+    }
+
+
+def _ranked_ids(results):
+    assert [r["rank"] for r in results] == list(range(1, len(results) + 1))
+    return [r["place_id"] for r in results]
+
+
+def test_no_candidates():
+    assert score_candidates(_query(), []) == []
+
+
+def test_better_matches_rank_first():
+    candidates = [
+        _candidate("pricey", price_level=4),
+        _candidate("match"),
+        _candidate("other_cuisine", primary_type="thai_restaurant"),
+    ]
+    results = score_candidates(_query(), candidates)
+
+    assert _ranked_ids(results) == ["match", "pricey", "other_cuisine"]
+    assert results[0]["preference_alignment"]["cuisine_match"] == "Perfect"
+    assert results[0]["match_score"] > results[1]["match_score"] > results[2]["match_score"]
+    assert results[1]["potential_concerns"] == ["Outside your preferred price range"]
+
+
+def test_requirement_violations_rank_last():
+    candidates = [
+        _candidate("avoided", primary_type="mexican_restaurant"),
+        _candidate("low_rated", rating=3.0),
+        # ~11 km north, outside the 5 km radius
+        _candidate("far", lat_offset=0.1),
+        _candidate("fine", rating=4.0),
+    ]
+    results = score_candidates(_query(min_rating=4.0), candidates)
+
+    assert _ranked_ids(results)[0] == "fine"
+    assert all(r["potential_concerns"] for r in results[1:])
+
+
+def test_sorting_preference():
+    candidates = [
+        _candidate("near_ok", rating=4.0, lat_offset=0.001),
+        _candidate("far_great", rating=4.9, lat_offset=0.03),
+    ]
+    assert _ranked_ids(score_candidates(_query(sorting="distance"), candidates)) == ["near_ok", "far_great"]
+    assert _ranked_ids(score_candidates(_query(sorting="rating"), candidates)) == ["far_great", "near_ok"]
+
+
+def test_ties_keep_input_order():
+    candidates = [_candidate(place_id) for place_id in ("c", "a", "b")]
+    for sorting in (None, "rating", "distance"):
+        results = score_candidates(_query(sorting=sorting), candidates)
+        assert _ranked_ids(results) == ["c", "a", "b"]
+        assert len({r["match_score"] for r in results}) == 1
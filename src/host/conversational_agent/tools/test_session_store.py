@@ -0,0 +1,94 @@
+# test_session_store.py
+"""
+Tests for the SQLite session store: pruning of idle sessions, and the
+FastAPI app serving sessions from the configured service.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_session_store.py
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.database_session_service import DatabaseSessionService, StorageEvent, StorageSession
+from google.genai import types
+from sqlalchemy import func, select, update
+
+from conversational_agent.tools.session_store import SqliteSessionService, build_fast_api_app
+
+APP_NAME = "forkcast_test"
+TTL_S = 3600
+
+
+def _age(service: SqliteSessionService, session_id: str, session_age_s: float = 0, event_age_s: float = 0) -> None:
+    """Backdate a session's update_time (stored as UTC) and its events' timestamps (local time)."""
+    with service.database_session_factory() as db:
+        if session_age_s:
+            db.execute(update(StorageSession).where(StorageSession.id == session_id).values(
+                update_time=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=session_age_s)
+            ))
+        if event_age_s:
+            db.execute(update(StorageEvent).where(StorageEvent.session_id == session_id).values(
+                timestamp=datetime.fromtimestamp(time.time() - event_age_s)
+            ))
+        db.commit()
+
+
+async def _session_with_event(service: SqliteSessionService) -> str:
+    session = await service.create_session(app_name=APP_NAME, user_id="user")
+    event = Event(
+        invocation_id="inv",
+        author="user",
+        content=types.Content(role="user", parts=[types.Part(text="hi")]),
+    )
+    await service.append_event(session=session, event=event)
+    return session.id
+
+
+def _remaining(service: SqliteSessionService, model) -> int:
+    with service.database_session_factory() as db:
+        return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_prune_expired_sessions(tmp_path):
+    service = SqliteSessionService(f"sqlite:///{tmp_path / 'sessions.db'}")
+
+    async def scenario():
+        idle = [await _session_with_event(service) for _ in range(3)]
+        active = await _session_with_event(service)
+        recent_event = await _session_with_event(service)
+        for session_id in idle:
+            _age(service, session_id, session_age_s=2 * TTL_S, event_age_s=2 * TTL_S)
+        # update_time only moves on state changes, so a recent event alone keeps a session alive
+        _age(service, recent_event, session_age_s=2 * TTL_S)
+
+        # Small batches, so pruning takes several rounds
+        assert service.prune_expired_sessions(ttl_s=TTL_S, batch_size=2) == 3
+        assert service.prune_expired_sessions(ttl_s=TTL_S, batch_size=2) == 0
+
+        for session_id in idle:
+            assert await service.get_session(app_name=APP_NAME, user_id="user", session_id=session_id) is None
+        for session_id in (active, recent_event):
+            assert await service.get_session(app_name=APP_NAME, user_id="user", session_id=session_id) is not None
+        assert _remaining(service, StorageSession) == 2
+        assert _remaining(service, StorageEvent) == 2
+
+    asyncio.run(scenario())
+
+
+def test_fast_api_app_uses_the_configured_service(tmp_path):
+    from google.adk.cli import fast_api as adk_fast_api
+
+    session_service = InMemorySessionService()
+    app = build_fast_api_app(session_service, agents_dir=str(tmp_path), session_service_uri="sqlite:///unused.db", web=False)
+
+    # The app's session routes answer from the service
+    session = asyncio.run(session_service.create_session(app_name=APP_NAME, user_id="user"))
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/apps/{app_name}/users/{user_id}/sessions/{session_id}"
+                 and "GET" in r.methods)
+    assert asyncio.run(route.endpoint(app_name=APP_NAME, user_id="user", session_id=session.id)).id == session.id
+    # ADK's module is left as it was
+    assert adk_fast_api.DatabaseSessionService is DatabaseSessionService
+
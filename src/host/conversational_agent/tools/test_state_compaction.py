@@ -0,0 +1,101 @@
+# test_state_compaction.py
+"""
+Tests for the compact form of search and enrichment blobs in session state
+(compact_value / compact_state_json), and for clearing a previous search.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_state_compaction.py
+"""
+
+import asyncio
+import json
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.utils.instructions_utils import inject_session_state
+
+from conversational_agent.tools.state_compaction import (
+    SEARCH_STATE_KEYS,
+    clear_previous_search,
+    compact_state_json,
+    compact_value,
+)
+
+
+def test_drops_null_and_empty_fields_recursively():
+    value = {
+        "name": "Nopa",
+        "price": None,
+        "website": "",
+        "tags": [],
+        "hours": {},
+        "location": {"address": "560 Divisadero St", "cross_street": None, "extra": {"note": ""}},
+    }
+    assert compact_value(value) == {"name": "Nopa", "location": {"address": "560 Divisadero St"}}
+
+
+def test_keeps_falsy_values_that_carry_information():
+    value = {"rating": 0, "open_now": False, "distance_km": 0.0}
+    assert compact_value(value) == value
+
+
+def test_list_entries_are_compacted_but_kept():
+    value = {"places": [{"name": "A", "phone": None}, {"name": "B"}], "scores": [0, None, 1]}
+    assert compact_value(value) == {"places": [{"name": "A"}, {"name": "B"}], "scores": [0, None, 1]}
+
+
+def test_caps_review_texts_only():
+    long_text = "great pasta " * 10
+    value = {
+        "description": long_text,
+        "reviews": [{"author": "Sam", "text": long_text}],
+        "place": {"all_reviews": [{"text": long_text, "rating": 5}]},
+    }
+    compacted = compact_value(value, max_review_chars=20)
+
+    assert compacted["description"] == long_text
+    assert compacted["reviews"][0] == {"author": "Sam", "text": "great pasta great pa…"}
+    assert compacted["place"]["all_reviews"][0]["text"] == "great pasta great pa…"
+    # Short texts are left as they are
+    assert compact_value({"reviews": [{"text": "ok"}]}, max_review_chars=20) == {"reviews": [{"text": "ok"}]}
+
+
+def test_does_not_modify_its_input():
+    value = {"a": None, "reviews": [{"text": "x" * 50}]}
+    compact_value(value, max_review_chars=10)
+    assert value == {"a": None, "reviews": [{"text": "x" * 50}]}
+
+
+def test_compact_state_json_is_minified():
+    text = compact_state_json({"b": [1, 2], "a": {"c": None}, "name": "Café"})
+    assert " " not in text.replace("Café", "")
+    assert json.loads(text) == {"b": [1, 2], "name": "Café"}
+
+
+def _invocation_context(state: dict) -> InvocationContext:
+    return InvocationContext(
+        session_service=InMemorySessionService(),
+        invocation_id="inv",
+        agent=LlmAgent(name="SearchPipeline"),
+        session=Session(id="session", app_name="forkcast_test", user_id="user", state=state),
+    )
+
+
+def test_cleared_search_renders_empty_in_optional_placeholders():
+    ctx = _invocation_context({"search_results": "[{\"name\": \"Nopa\"}]", "final_results": "{}"})
+    callback_context = CallbackContext(ctx)
+    clear_previous_search(callback_context)
+    assert callback_context.state.to_dict() == {"search_results": "", "final_results": ""}
+    assert callback_context._event_actions.state_delta == {"search_results": "", "final_results": ""}
+
+    template = "Places: {search_results?} Final: {final_results?}"
+    assert asyncio.run(inject_session_state(template, ReadonlyContext(ctx))) == "Places:  Final: "
+
+
+def test_cleared_keys_are_not_cleared_again():
+    ctx = _invocation_context({key: "" for key in SEARCH_STATE_KEYS})
+    callback_context = CallbackContext(ctx)
+    clear_previous_search(callback_context)
+    assert callback_context._event_actions.state_delta == {}
@@ -0,0 +1,80 @@
+# test_telemetry.py
+"""
+Tests for the in-flight bookkeeping of the metrics callbacks: steps whose
+after-callback never runs (the call raised, or its branch was cancelled)
+are ended and evicted instead of piling up.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_telemetry.py
+"""
+
+import pytest
+
+from conversational_agent.tools import telemetry
+
+
+class _StubSpan:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = None
+        self.ended = False
+
+    def set_status(self, status) -> None:
+        self.status = status
+
+    def set_attribute(self, key, value) -> None:
+        pass
+
+    def end(self) -> None:
+        self.ended = True
+
+
+class _StubTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None):
+        self.spans.append(_StubSpan(name))
+        return self.spans[-1]
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    stub = _StubTracer()
+    monkeypatch.setattr(telemetry, "tracer", stub)
+    monkeypatch.setattr(telemetry, "_in_flight", telemetry.OrderedDict())
+    return stub
+
+
+def test_finished_steps_leave_nothing_behind(tracer):
+    telemetry._start(("tool", "call-1"), "forkcast.tool search", {})
+    telemetry._finish(("tool", "call-1"))
+    assert not telemetry._in_flight
+
+
+def test_stale_steps_are_ended_and_evicted(tracer, monkeypatch):
+    monkeypatch.setattr(telemetry, "IN_FLIGHT_MAX_AGE_S", 0.0)
+    telemetry._start(("model", "inv", "Writer"), "forkcast.model Writer", {})
+    telemetry._start(("tool", "call-1"), "forkcast.tool search", {})
+
+    leaked = tracer.spans[0]
+    assert leaked.ended and leaked.status.description == "never finished"
+    assert ("model", "inv", "Writer") not in telemetry._in_flight
+
+
+def test_in_flight_steps_are_bounded(tracer, monkeypatch):
+    monkeypatch.setattr(telemetry, "IN_FLIGHT_MAX_ENTRIES", 3)
+    for i in range(5):
+        telemetry._start(("agent", f"inv-{i}", "Branch"), "forkcast.agent Branch", {})
+
+    assert list(telemetry._in_flight) == [("agent", f"inv-{i}", "Branch") for i in (2, 3, 4)]
+    assert [span.ended for span in tracer.spans] == [True, True, False, False, False]
+
+
+def test_restarted_step_ends_the_one_that_raised(tracer):
+    key = ("model", "inv", "Writer")
+    telemetry._start(key, "forkcast.model Writer", {})
+    # The first call raised, so the agent's next model call reuses the key
+    telemetry._start(key, "forkcast.model Writer", {})
+
+    assert tracer.spans[0].ended
+    assert telemetry._in_flight[key][1] is tracer.spans[1]
@@ -0,0 +1,44 @@
+# test_ttl_cache.py
+"""
+Tests for the SQLite tier of the response cache: expired rows are deleted
+from the file, both by prune() and by the writer thread on its own.
+
+Run from src/host: python -m pytest conversational_agent/tools/test_ttl_cache.py
+"""
+
+import time
+
+from conversational_agent.tools.ttl_cache import SQLiteTTLStore
+
+
+def _row_count(store: SQLiteTTLStore) -> int:
+    store.flush()
+    with store._lock:
+        return store._conn.execute("SELECT COUNT(*) FROM ttl_cache").fetchone()[0]
+
+
+def test_prune_removes_expired_rows(tmp_path):
+    store = SQLiteTTLStore(str(tmp_path / "cache.db"), prune_interval_s=0)
+    store.set("yelp", "expired", {"businesses": []}, time.time() - 1)
+    store.set("yelp", "live", {"businesses": []}, time.time() + 3600)
+    assert _row_count(store) == 2
+
+    assert store.prune() == 1
+    assert _row_count(store) == 1
+    assert store.get_entry("yelp", "live") is not None
+    store.close()
+
+
+def test_writer_thread_prunes_periodically(tmp_path):
+    store = SQLiteTTLStore(str(tmp_path / "cache.db"), prune_interval_s=0.05)
+    store.set("fsq", "soon_expired", {"results": []}, time.time() + 0.05)
+    store.set("fsq", "live", {"results": []}, time.time() + 3600)
+    assert _row_count(store) == 2
+
+    # No further writes: the writer thread wakes up for the prune by itself
+    deadline = time.time() + 2
+    while _row_count(store) > 1 and time.time() < deadline:
+        time.sleep(0.02)
+    assert _row_count(store) == 1
+    assert store.get_entry("fsq", "live") is not None
+    store.close()
@@ -3,27 +3,15 @@ import json
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
-import firebase_admin
-from firebase_admin import credentials, firestore as admin_firestore
+from firebase_admin import firestore as admin_firestore
+from google.api_core.exceptions import NotFound
+
+from conversational_agent.tools.firebase_client import get_firestore_client
 
 # from google.adk.tools import Tool
 
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin (do this only once)
-try:
-    # Check if already initialized
-    firebase_admin.get_app()
-    print("✅ Firebase Admin already initialized")
-except ValueError:
-    # Initialize if not already done
-    cred = credentials.Certificate("conversational_agent/config/forkcast-0248-firebase-adminsdk-fbsvc-c8f0336fb6.json")
-    firebase_admin.initialize_app(cred)
-    print("✅ Firebase Admin initialized")
-
-# Get Firestore client from Firebase Admin
-db = admin_firestore.client()
-
 
 def upload_final_results(final_results_json: str, party_code: str) -> Dict[str, Any]:
     """
@@ -47,15 +35,8 @@ def upload_final_results(final_results_json: str, party_code: str) -> Dict[str,
         
         final_results = results_data.get('final_results', {})
         
-        # CHECK: Verify party exists first
+        db = get_firestore_client()
         party_ref = db.collection('parties').document(party_code)
-        party_doc = party_ref.get()
-        
-        if not party_doc.exists:
-            return {
-                "success": False,
-                "message": f"Party {party_code} not found. Please check the party code."
-            }
         
         # Prepare results document
         results_document = {
@@ -67,17 +48,20 @@ def upload_final_results(final_results_json: str, party_code: str) -> Dict[str,
             'confidence_level': final_results.get('summary', {}).get('confidence_level', 'Unknown')
         }
         
+        # All writes go out in one atomic commit. The party update doubles as the
+        # existence check: it fails with NotFound for an unknown party code, and
+        # then none of the results documents are written either.
+        batch = db.batch()
+        
         # Upload final results to party's results subcollection as 'latest'
-        results_ref = party_ref.collection('results').document('latest')
-        results_ref.set(results_document)
+        batch.set(party_ref.collection('results').document('latest'), results_document)
         
         # Also store a timestamped version for history
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        timestamped_ref = party_ref.collection('results').document(session_doc_id)
-        timestamped_ref.set(results_document)
+        batch.set(party_ref.collection('results').document(timestamp), results_document)
         
-        # Update party status (safe because we verified it exists)
-        party_ref.update({
+        # Update party status
+        batch.update(party_ref, {
             'status': 'results_ready',
             'results_available': True,
             'last_updated': admin_firestore.SERVER_TIMESTAMP,
@@ -85,6 +69,14 @@ def upload_final_results(final_results_json: str, party_code: str) -> Dict[str,
             'confidence_level': final_results.get('summary', {}).get('confidence_level', 'Unknown')
         })
         
+        try:
+            batch.commit()
+        except NotFound:
+            return {
+                "success": False,
+                "message": f"Party {party_code} not found. Please check the party code."
+            }
+        
         total_recs = final_results.get('summary', {}).get('total_recommendations', 0)
         logger.info(f"✅ Final results uploaded for party {party_code} with {total_recs} recommendations")
         
@@ -1,13 +1,35 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
-from google.adk.cli.fast_api import get_fast_api_app
+from fastapi.responses import PlainTextResponse
+
+from conversational_agent import warm_up_agent_tree
+from conversational_agent.tools.maps_mcp_pool import maps_mcp_pool
+from conversational_agent.tools.http_client import close_http_client
+from conversational_agent.tools.session_store import (
+    build_fast_api_app,
+    close_session_service,
+    create_session_service,
+    run_session_pruning,
+)
+from conversational_agent.tools.telemetry import render_metrics
+from conversational_agent.config.settings import TRACE_TO_CLOUD
 
 # Get the directory where main.py is located
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Session DB URL - using SQLite for simplicity (you can switch to Firestore)
+# Session DB URL - SQLite by default; on Cloud Run, where the instance disk does not survive
+# scaling, use firestore://<root collection> (see tools/firestore_session_service.py)
 SESSION_DB_URL = os.environ.get("SESSION_DB_URL", "sqlite:///./sessions.db")
 
+# SQLite gets WAL, a sized connection pool and pruning of idle sessions (see tools/session_store.py);
+# Firestore gets one batched commit per agent turn.
+# ADK's get_fast_api_app builds a plain DatabaseSessionService from the URL; build_fast_api_app
+# has it use this one instead.
+session_service = create_session_service(SESSION_DB_URL)
+
 # CORS configuration for web interface
 ALLOWED_ORIGINS = [
     "http://localhost",
@@ -32,13 +54,36 @@ missing_vars = [var for var in required_env_vars if not os.environ.get(var)]
 if missing_vars:
     print(f"Warning: Missing environment variables: {missing_vars}")
 
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Build the agent tree and warm the shared Google Maps MCP servers in the
+    background, so the server binds (and /health answers) right away, and
+    prune idle sessions periodically; on shutdown, commit buffered session
+    writes and release shared clients.
+    """
+    background_tasks = [
+        asyncio.create_task(warm_up_agent_tree()),
+        asyncio.create_task(maps_mcp_pool.warm_up()),
+        asyncio.create_task(run_session_pruning(session_service)),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await close_session_service(session_service)
+    await maps_mcp_pool.close()
+    await close_http_client()
+
 # Call the function to get the FastAPI app instance
 # Ensure the agent directory name matches your agent folder structure
-app = get_fast_api_app(
+app = build_fast_api_app(
+    session_service,
     agents_dir=AGENT_DIR,
     session_service_uri=SESSION_DB_URL,
     allow_origins=ALLOWED_ORIGINS,
     web=SERVE_WEB_INTERFACE,
+    trace_to_cloud=TRACE_TO_CLOUD,
+    lifespan=lifespan,
 )
 
 # Add health check endpoint for Cloud Run
@@ -51,6 +96,12 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# Prometheus scrape endpoint: per-agent, per-model and per-tool latency, tokens, errors and cache hits
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Add environment info endpoint (useful for debugging)
 @app.get("/info")
 async def service_info():
@@ -1 +1,36 @@
-from . import agent
\ No newline at end of file
+# conversational_agent/__init__.py
+"""
+Forkcast conversational agent.
+
+Importing the package does not build the agent tree: agent.py (every
+sub-agent, the OpenAPI and MCP toolsets, Firebase) is imported on first
+access to `root_agent`, which ADK does when it loads the app for its first
+request, or earlier by warm_up_agent_tree() once the server is listening.
+This keeps the tree out of the container's cold start, so /health answers
+as soon as FastAPI is up.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def __getattr__(name: str):
+    if name in ("agent", "root_agent"):
+        agent = importlib.import_module(f"{__name__}.agent")
+        return agent if name == "agent" else agent.root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def warm_up_agent_tree() -> None:
+    """Build the agent tree in a worker thread, so the first request finds it ready."""
+    started = time.monotonic()
+    try:
+        await asyncio.to_thread(importlib.import_module, f"{__name__}.agent")
+        logger.info(f"✅ Agent tree built in {time.monotonic() - started:.2f}s")
+    except Exception as e:
+        # The first request builds it again and surfaces the error
+        logger.error(f"❌ Agent tree warm-up failed: {e}")
@@ -1,11 +1,21 @@
+from typing import Any, Dict, List
+
 from google.adk.agents import LlmAgent
-from google.adk.tools.openapi_tool.openapi_spec_parser.openapi_toolset import OpenAPIToolset
 from fastapi.openapi.models import HTTPBearer
 from google.adk.auth.auth_credential import AuthCredential, AuthCredentialTypes, HttpAuth, HttpCredentials
 
-from conversational_agent.config.settings import GEMINI_MODEL, BESTTIME_API_KEY
+from conversational_agent.config.settings import GEMINI_MODEL, BESTTIME_API_KEY, BESTTIME_CACHE_MAX_ENTRIES
 from conversational_agent.adk_agents.busyness_forecast_agent.prompt import BUSYNESS_FORECAST_AGENT_INSTRUCTIONS
+from conversational_agent.adk_agents.busyness_forecast_agent import besttime_openapi_spec
 from conversational_agent.adk_agents.busyness_forecast_agent.besttime_openapi_spec import BESTTIME_OPENAPI_SPEC
+from conversational_agent.adk_agents.busyness_forecast_agent.forecast_cache import (
+    after_besttime_tool_callback,
+    before_besttime_tool_callback,
+)
+from conversational_agent.tools.caching_openapi_toolset import CachingOpenAPIToolset
+from conversational_agent.tools.openapi_artifacts import artifact_path
+from conversational_agent.tools.rate_limiter import get_rate_limiter
+from conversational_agent.tools.state_compaction import compact_json_output
 
 # 1. Define the AuthScheme object by instantiating HTTPBearer
 # The 'type' will be 'http' and 'scheme' will be 'bearer' by default for HTTPBearer.
@@ -22,8 +32,15 @@ besttime_auth_credential = AuthCredential(
 )
 
 try:
-    besttime_toolset = OpenAPIToolset(
+    # Responses are cached per operation with the TTLs declared in the spec
+    besttime_toolset = CachingOpenAPIToolset(
         spec_dict=BESTTIME_OPENAPI_SPEC,
+        # Parsed operations and declarations precompiled at build time (see tools/openapi_artifacts.py)
+        compiled_path=artifact_path(besttime_openapi_spec.__file__),
+        namespace="besttime",
+        max_entries=BESTTIME_CACHE_MAX_ENTRIES,
+        # BestTime calls spend credits; cache hits do not count against the daily quota
+        rate_limiter=get_rate_limiter("besttime"),
         auth_scheme=besttime_auth_scheme_definition, # Pass the HTTPBearer instance
         auth_credential=besttime_auth_credential
     )
@@ -43,6 +60,36 @@ busyness_forecast_agent = LlmAgent(
         "It uses the BestTime API to gather data and provide insights on live and expected busyness levels."
     ),
     tools=[besttime_toolset],
+    # Also serve cached responses for the same venue under another id or spelling (see forecast_cache.py)
+    before_tool_callback=before_besttime_tool_callback,
+    after_tool_callback=after_besttime_tool_callback,
+    after_model_callback=compact_json_output,  # Stored minified, without null fields
     output_key='busyness_data'
 )
 
+
+def busyness_placeholder(places: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """`busyness_data` marking every restaurant as failed, for when the agent runs out of time."""
+    return {
+        "busyness_data": [
+            {
+                "place_id": place.get("place_id"),
+                "name": place.get("name"),
+                "status": "failed",
+                "venue_id": None,
+                "peak_times": None,
+                "quiet_times": None,
+                "busiest_day": None,
+                "quietest_day": None,
+                "live_data": {
+                    "current_busyness": None,
+                    "forecasted_busyness": None,
+                    "live_vs_forecast": None,
+                    "live_data_available": False,
+                },
+                "peak_intensity": None,
+                "timezone": None,
+            }
+            for place in places
+        ]
+    }
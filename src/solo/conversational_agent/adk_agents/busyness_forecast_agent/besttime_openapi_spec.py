@@ -1,3 +1,10 @@
+from conversational_agent.config.settings import (
+    BESTTIME_API_BASE_URL,
+    BESTTIME_FORECAST_CACHE_TTL_S,
+    BESTTIME_LIVE_CACHE_TTL_S,
+)
+
+# "x-cache-ttl" (seconds) is read by CachingOpenAPIToolset; see tools/caching_openapi_toolset.py
 BESTTIME_OPENAPI_SPEC = {
     "openapi": "3.0.0",
     "info": {
@@ -7,7 +14,7 @@ BESTTIME_OPENAPI_SPEC = {
     },
     "servers": [
         {
-            "url": "https://besttime.app"
+            "url": BESTTIME_API_BASE_URL
         }
     ],
     "components": {
@@ -30,6 +37,8 @@ BESTTIME_OPENAPI_SPEC = {
             "post": {
                 "summary": "Create new foot-traffic forecast",
                 "operationId": "createFootTrafficForecast",
+                # Weekly forecasts change slowly
+                "x-cache-ttl": BESTTIME_FORECAST_CACHE_TTL_S,
                 "description": "Returns foot-traffic forecast for a venue based on name and address. Creates a forecast using the most recent available data.",
                 "parameters": [
                     {
@@ -158,6 +167,7 @@ BESTTIME_OPENAPI_SPEC = {
             "post": {
                 "summary": "Get live foot-traffic data",
                 "operationId": "getLiveFootTrafficData",
+                "x-cache-ttl": BESTTIME_LIVE_CACHE_TTL_S,
                 "description": "Returns live foot-traffic data for a venue based on venue name and address or venue_id. Provides current busyness compared to forecasted levels.",
                 "parameters": [
                     {
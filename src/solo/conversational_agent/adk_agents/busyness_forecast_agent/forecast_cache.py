@@ -0,0 +1,122 @@
+# adk_agents/busyness_forecast_agent/forecast_cache.py
+"""
+BestTime-specific cache keys for forecast and live-busyness tool calls.
+
+The BestTime tools come from a CachingOpenAPIToolset, which caches each
+operation by its canonical arguments with the TTLs declared in
+besttime_openapi_spec.py (forecasts for days, live data for minutes). These
+before/after tool callbacks add aliases on top of that cache: a response is
+also filed under BestTime's venue_id and under the normalized venue name and
+address, so a later call that spells the venue differently, or passes only
+the venue_id, still hits and skips the HTTP call.
+
+The callbacks also keep the entity index's place_id -> venue_id links: once a
+restaurant's venue_id is known, calls for it are looked up (and, for live
+data, issued) by venue_id even when the agent only passes name and address.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from google.adk.tools import BaseTool, ToolContext
+
+from conversational_agent.tools.caching_openapi_toolset import is_cacheable_response
+from conversational_agent.tools.entity_index import get_entity_index
+from conversational_agent.tools.enrichment_utils import get_search_results, names_match, normalize_address, normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Tool names generated by OpenAPIToolset from the spec's operationIds
+FORECAST_TOOL_NAME = "create_foot_traffic_forecast"
+LIVE_TOOL_NAME = "get_live_foot_traffic_data"
+BESTTIME_TOOL_NAMES = (FORECAST_TOOL_NAME, LIVE_TOOL_NAME)
+
+# Marks a function call answered from cache, so the after-callback doesn't re-store
+# (and thereby extend the TTL of) a cached response. Temp state is never persisted,
+# so a call cancelled between the two callbacks leaves nothing behind.
+SERVED_FROM_CACHE_KEY = "temp:besttime_served_from_cache:{function_call_id}"
+
+
+def venue_id_key(venue_id: Optional[str]) -> Optional[str]:
+    return f"id:{venue_id}" if venue_id else None
+
+
+def venue_name_key(venue_name: Optional[str], venue_address: Optional[str]) -> Optional[str]:
+    name, address = normalize_name(venue_name), normalize_address(venue_address)
+    if not name or not address:
+        return None
+    return f"na:{name}|{address}"
+
+
+def besttime_cache_key(args: Dict[str, Any]) -> Optional[str]:
+    """Cache key for a BestTime tool call: the venue_id if given, else name + address."""
+    return venue_id_key(args.get("venue_id")) or venue_name_key(args.get("venue_name"), args.get("venue_address"))
+
+
+def _searched_place(args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+    """The search_results entry a BestTime call is about, matched on venue name."""
+    venue_name = args.get("venue_name")
+    if not venue_name:
+        return None
+    return next((p for p in get_search_results(tool_context.state) if names_match(p.get("name"), venue_name)), None)
+
+
+def _cached_operation(tool: BaseTool):
+    """The tool's CachedOperation, or None for tools that are not cached BestTime operations."""
+    if tool.name not in BESTTIME_TOOL_NAMES:
+        return None
+    return getattr(tool, "cached_operation", None)
+
+
+async def before_besttime_tool_callback(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
+    """Answer a BestTime call from an alias key when possible; returning None lets the call proceed."""
+    cached_operation = _cached_operation(tool)
+    if cached_operation is None:
+        return None
+
+    keys = []
+    if not args.get("venue_id"):
+        place = _searched_place(args, tool_context)
+        venue_id = get_entity_index().lookup("besttime", place) if place else None
+        if venue_id and tool.name == LIVE_TOOL_NAME:
+            # Live lookups by venue_id are faster and more reliable than by name + address
+            args["venue_id"] = venue_id
+        keys.append(venue_id_key(venue_id))
+    keys.append(besttime_cache_key(args))
+
+    for key in filter(None, dict.fromkeys(keys)):
+        cached = await cached_operation.cache.aget(key)
+        if cached is not None:
+            logger.info(f"✅ BestTime cache hit for {tool.name} ({key})")
+            if tool_context.function_call_id:
+                tool_context.state[SERVED_FROM_CACHE_KEY.format(function_call_id=tool_context.function_call_id)] = True
+            return cached
+    return None
+
+
+def after_besttime_tool_callback(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict
+) -> Optional[Dict]:
+    """File successful BestTime responses under their alias keys; never alters the response."""
+    if tool_context.function_call_id and tool_context.state.get(
+        SERVED_FROM_CACHE_KEY.format(function_call_id=tool_context.function_call_id)
+    ):
+        return None
+
+    cached_operation = _cached_operation(tool)
+    if cached_operation is None or not is_cacheable_response(tool_response):
+        return None
+
+    venue_info = tool_response.get("venue_info") or {}
+    place = _searched_place(args, tool_context)
+    if place:
+        get_entity_index().link("besttime", place, venue_info.get("venue_id") or args.get("venue_id"))
+    keys = {
+        besttime_cache_key(args),
+        # Also file it under BestTime's own id, so later calls by venue_id hit
+        venue_id_key(venue_info.get("venue_id")),
+        venue_name_key(venue_info.get("venue_name"), venue_info.get("venue_address")),
+    }
+    for key in filter(None, keys):
+        cached_operation.cache.set(key, tool_response, cached_operation.ttl_s)
+    return None
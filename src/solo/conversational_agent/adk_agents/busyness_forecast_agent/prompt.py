@@ -113,6 +113,7 @@ From **getLiveFootTrafficData** response:
 
 ## Error Handling
 - If API fails → set status: "failed", all data fields to null
+- If a response has `"quota_exhausted": true` → do NOT retry; set status: "failed", all data fields to null
 - If venue name doesn't match → set status: "failed"
 - If no data available → set status: "success" but data fields to null
 - Always continue to next restaurant
@@ -1,18 +1,27 @@
 from google.adk.agents import LlmAgent
 
 from conversational_agent.config.settings import NEW_GEMINI_MODEL # Make sure GEMINI_MODEL is correctly imported from your settings
-from conversational_agent.adk_agents.final_review_agent.prompt import FINAL_REVIEW_AGENT_INSTRUCTIONS
-from conversational_agent.adk_agents.final_review_agent.schema import FinalReviewOutput
+from conversational_agent.adk_agents.final_review_agent.prompt import RECOMMENDATION_WRITER_INSTRUCTIONS
+from conversational_agent.adk_agents.final_review_agent.recommendation_builder import FinalReviewAgent
+from conversational_agent.adk_agents.final_review_agent.schema import RecommendationProseOutput
 
-final_review_agent = LlmAgent(
+# Scoring, ranking and every factual field are computed in code; the LLM only writes the prose
+recommendation_writer_agent = LlmAgent(
     model=NEW_GEMINI_MODEL,
+    name='RecommendationWriterAgent',
+    instruction=RECOMMENDATION_WRITER_INSTRUCTIONS,
+    description="Writes the personalized why_recommended and review_summary text for the scored recommendations.",
+    include_contents='none',  # Everything it needs is in scored_recommendations / query_details
+    output_schema=RecommendationProseOutput,
+    output_key='recommendation_prose',
+)
+
+final_review_agent = FinalReviewAgent(
     name='FinalReviewAgent',
-    instruction=FINAL_REVIEW_AGENT_INSTRUCTIONS,
+    writer_agent=recommendation_writer_agent,
     description=(
         "This agent reviews the search and various place enrichment results to ensure they are aligned with the user's preferences."
         "It compiles these results in a final_results object in a uniform format."
         "It transfers back the control to the ConversationalAgent if user has wants to update preferences or needs further assistance."
     ),
-    output_schema=FinalReviewOutput,
-    output_key='final_results',  # The output will be a JSON string of the updated final_results object
-)
\ No newline at end of file
+)
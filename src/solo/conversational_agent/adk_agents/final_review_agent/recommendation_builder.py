@@ -0,0 +1,428 @@
+# adk_agents/final_review_agent/recommendation_builder.py
+"""
+Assembles final_results from the search and enrichment outputs.
+
+The enrichment data is merged per place_id, scored and ranked by
+`scoring.score_candidates`, and mapped onto the Recommendation schema in
+code. FinalReviewAgent then asks a small LLM writer for the only free-text
+fields (why_recommended and review_summary) and fills them in, falling back
+to templated text if the writer fails.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import ValidationError
+
+from conversational_agent.adk_agents.final_review_agent.schema import FinalReviewOutput
+from conversational_agent.adk_agents.final_review_agent.scoring import (
+    DEFAULT_SEARCH_RADIUS_KM,
+    desired_features,
+    get_preferences,
+    mentions,
+    normalize_text,
+    preferred_price_levels,
+    score_candidates,
+)
+from conversational_agent.tools.enrichment_utils import dump_state_json, get_search_results, load_state_json
+
+logger = logging.getLogger(__name__)
+
+# Session state keys written by the earlier stages
+ENRICHMENT_KEYS = {
+    "yelp": "yelp_reviews_data",
+    "fsq": "fsq_data",
+    "reviews": "google_reviews_data",
+    "busyness": "busyness_data",
+}
+# Field that is only set when a source matched the restaurant, for the coverage note
+_MATCHED_FIELDS = {"yelp": "title", "fsq": "fsq_id", "reviews": "all_reviews", "busyness": "venue_id"}
+PRICE_SYMBOLS = {1: "$", 2: "$$", 3: "$$$", 4: "$$$$"}
+_GOOGLE_PRICE_LEVELS = {
+    "PRICE_LEVEL_INEXPENSIVE": 1,
+    "PRICE_LEVEL_MODERATE": 2,
+    "PRICE_LEVEL_EXPENSIVE": 3,
+    "PRICE_LEVEL_VERY_EXPENSIVE": 4,
+}
+# Price level assumed when no source reports one (Pricing.price_level is required)
+UNKNOWN_PRICE_LEVEL = 2
+MAX_REVIEW_EXCERPTS = 3
+REVIEW_EXCERPT_CHARS = 240
+
+
+# ===================================================================
+# MERGING
+# ===================================================================
+
+def _entries_by_place_id(state: Dict[str, Any], key: str) -> Dict[str, Dict[str, Any]]:
+    """Index one enrichment output by place_id, tolerating {"<key>": [...]} wrappers."""
+    data = load_state_json(state.get(key))
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), [])
+    if not isinstance(data, list):
+        return {}
+    return {entry["place_id"]: entry for entry in data if isinstance(entry, dict) and entry.get("place_id")}
+
+
+def _enabled_names(flags: Any) -> List[str]:
+    """Names of the truthy flags in a (possibly nested) Foursquare feature dict."""
+    if not isinstance(flags, dict):
+        return []
+    names = []
+    for name, value in flags.items():
+        if isinstance(value, dict):
+            names.extend(_enabled_names(value))
+        elif value is True:
+            names.append(name.replace("_", " "))
+    return names
+
+
+def parse_price_level(value: Any) -> Optional[int]:
+    """Price level 1-4 from an int, a "$$" string or a Google PRICE_LEVEL_* enum."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value and set(value) == {"$"}:
+            value = len(value)
+        else:
+            value = _GOOGLE_PRICE_LEVELS.get(value.upper(), value)
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return None
+    return level if 1 <= level <= 4 else None
+
+
+def merge_candidates(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Join search_results with every enrichment output on place_id.
+
+    Returns:
+        One record per restaurant with the Google Places fields, the raw
+        enrichment entries under `yelp`, `fsq`, `reviews` and `busyness`, and
+        the derived fields scoring.score_candidates expects.
+    """
+    enrichments = {name: _entries_by_place_id(state, key) for name, key in ENRICHMENT_KEYS.items()}
+    candidates = []
+    for place in get_search_results(state):
+        candidate = dict(place)
+        for name, entries in enrichments.items():
+            candidate[name] = entries.get(place.get("place_id")) or {}
+
+        yelp, fsq, reviews = candidate["yelp"], candidate["fsq"], candidate["reviews"]
+        features = fsq.get("features") or {}
+        candidate["fsq_categories"] = [c.get("name") for c in fsq.get("categories") or [] if c and c.get("name")]
+        candidate["amenities"] = _enabled_names(features.get("amenities"))
+        candidate["services"] = _enabled_names(features.get("services"))
+        candidate["price_level"] = next(filter(None, map(parse_price_level, (
+            place.get("price_level"), yelp.get("price"), fsq.get("price"),
+        ))), None)
+        review_texts = [r.get("text") for r in reviews.get("all_reviews") or [] if isinstance(r, dict)]
+        candidate["feature_text"] = normalize_text([
+            place.get("types"), place.get("primary_type"), candidate["fsq_categories"], candidate["amenities"],
+            candidate["services"], _enabled_names(features.get("food_and_drink")),
+            _enabled_names(fsq.get("attributes")), fsq.get("description"), reviews.get("reviews_summary"),
+            review_texts,
+        ])
+        candidates.append(candidate)
+    return candidates
+
+
+# ===================================================================
+# RECOMMENDATION FIELDS
+# ===================================================================
+
+def _primary_cuisine(candidate: Dict[str, Any]) -> str:
+    if candidate["fsq_categories"]:
+        return candidate["fsq_categories"][0]
+    primary_type = (candidate.get("primary_type") or "restaurant").replace("_restaurant", "")
+    return primary_type.replace("_", " ").title()
+
+
+def _timing(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    fsq_hours = candidate["fsq"].get("hours") or {}
+    busyness = candidate["busyness"]
+    today = datetime.now().strftime("%A").lower()
+    open_now = (candidate.get("opening_hours") or {}).get("open_now")
+    if open_now is None:
+        open_now = fsq_hours.get("open_now")
+
+    live = busyness.get("live_data") or {}
+    current_busyness = None
+    if live.get("current_busyness") is not None:
+        current_busyness = f"{live['current_busyness']}% busy"
+    elif live.get("busyness_trend"):
+        current_busyness = live["busyness_trend"].replace("_", " ")
+
+    busiest_day = (busyness.get("weekly_patterns") or {}).get("busiest_day")
+    return {
+        "currently_open": bool(open_now),
+        "hours_today": fsq_hours.get("display") or "Hours unavailable",
+        "best_times_to_visit": list((busyness.get("quiet_times") or {}).get(today) or []),
+        "current_busyness": current_busyness,
+        "peak_days": [busiest_day.title()] if busiest_day else [],
+    }
+
+
+def _review_sentiment(candidate: Dict[str, Any]) -> Optional[str]:
+    ratings = [r.get("rating") for r in candidate["reviews"].get("all_reviews") or [] if isinstance(r, dict)]
+    ratings = [r for r in ratings if isinstance(r, (int, float))]
+    if not ratings:
+        return None
+    average = sum(ratings) / len(ratings)
+    return "Positive" if average >= 4.0 else "Mixed" if average >= 3.0 else "Negative"
+
+
+def _special_items(candidate: Dict[str, Any]) -> List[str]:
+    items = candidate["reviews"].get("special_items") or []
+    return [item.get("item_name") for item in items if isinstance(item, dict) and item.get("item_name")]
+
+
+def build_recommendation(candidate: Dict[str, Any], scored: Dict[str, Any], preferences: Dict[str, Any]) -> Dict[str, Any]:
+    """Map one merged candidate and its score onto the Recommendation schema (prose left templated)."""
+    yelp, fsq = candidate["yelp"], candidate["fsq"]
+    levels = preferred_price_levels(preferences)
+    concerns = list(scored["potential_concerns"])
+
+    price_level = candidate["price_level"]
+    if price_level is None:
+        price_level = UNKNOWN_PRICE_LEVEL
+        concerns.append("Price level not reported; shown as moderate")
+
+    dietary_needs = (preferences.get("dietary_preferences") or {}).get("needs") or []
+    features = candidate["amenities"] + candidate["services"]
+    standout = [f for f in desired_features(preferences) if mentions(candidate["feature_text"], f)]
+    name = candidate.get("name")
+    location = candidate.get("vicinity") or candidate.get("formatted_address")
+
+    return {
+        "rank": scored["rank"],
+        "place_id": candidate.get("place_id"),
+        "name": name,
+        "formatted_address": candidate.get("formatted_address") or location or "",
+        "coordinates": {"latitude": candidate.get("latitude"), "longitude": candidate.get("longitude")},
+        "contact": {"phone": fsq.get("tel"), "website": fsq.get("website") or candidate.get("website")},
+        "ratings": {
+            "google_rating": float(candidate.get("rating") or 0.0),
+            "google_review_count": int(candidate.get("user_ratings_total") or 0),
+            "yelp_rating": yelp.get("rating"),
+            "yelp_review_count": yelp.get("review_count"),
+        },
+        "pricing": {
+            "price_level": price_level,
+            "price_symbol": PRICE_SYMBOLS[price_level],
+            "fits_budget": not levels or price_level in levels,
+        },
+        "cuisine_and_features": {
+            "primary_cuisine": _primary_cuisine(candidate),
+            "secondary_cuisines": candidate["fsq_categories"][1:],
+            "dietary_options": [need for need in dietary_needs if mentions(candidate["feature_text"], need)],
+            "key_amenities": candidate["amenities"],
+            "service_options": candidate["services"],
+        },
+        "timing": _timing(candidate),
+        "highlights": {
+            "why_recommended": templated_why_recommended(scored),
+            "special_items": _special_items(candidate),
+            "standout_features": standout or features[:3],
+            "review_sentiment": _review_sentiment(candidate),
+            "review_summary": candidate["reviews"].get("reviews_summary"),
+        },
+        "media": {
+            "primary_image": yelp.get("image_url"),
+            "image_alt_text": f"{name} in {location}" if location else f"{name}",
+        },
+        "match_score": scored["match_score"],
+        "preference_alignment": scored["preference_alignment"],
+        "potential_concerns": concerns,
+    }
+
+
+def templated_why_recommended(scored: Dict[str, Any]) -> str:
+    """Fallback explanation built from the score breakdown."""
+    alignment = scored["preference_alignment"]
+    text = (
+        f"Ranked #{scored['rank']} with a {scored['match_score']}/100 match: "
+        f"{alignment['cuisine_match'].lower()} cuisine match, {alignment['price_match'].lower()} price fit "
+        f"and {alignment['location_convenience'].lower()} location"
+    )
+    if scored.get("distance_km") is not None:
+        text += f" ({scored['distance_km']:.1f} km away)"
+    return text + "."
+
+
+# ===================================================================
+# FINAL RESULTS
+# ===================================================================
+
+def _key_preferences(preferences: Dict[str, Any]) -> List[str]:
+    cuisine = preferences.get("cuisine_type_preferences") or {}
+    dietary = preferences.get("dietary_preferences") or {}
+    key_preferences = list(cuisine.get("desired") or [])
+    key_preferences += [PRICE_SYMBOLS[level] for level in preferred_price_levels(preferences) if level in PRICE_SYMBOLS]
+    key_preferences += list(dietary.get("needs") or [])
+    key_preferences += desired_features(preferences)
+    return [str(p) for p in key_preferences]
+
+
+def _summary(recommendations: List[Dict[str, Any]], candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total = len(candidates)
+    coverage = {source: sum(1 for c in candidates if c[source].get(field)) for source, field in _MATCHED_FIELDS.items()}
+    top_score = recommendations[0]["match_score"] if recommendations else 0
+    data_coverage = sum(coverage.values()) / (len(coverage) * total) if total else 0.0
+    if top_score >= 75 and data_coverage >= 0.5:
+        confidence = "High"
+    elif top_score >= 50:
+        confidence = "Medium"
+    else:
+        confidence = "Low"
+
+    notes = "Enrichment coverage: " + ", ".join(f"{source} {count}/{total}" for source, count in coverage.items()) + "."
+    alternatives = None
+    if recommendations and all(r["potential_concerns"] for r in recommendations):
+        alternatives = "Every option misses at least one preference; consider widening the search radius or relaxing a requirement."
+    return {
+        "total_recommendations": len(recommendations),
+        "confidence_level": confidence,
+        "search_quality_notes": notes,
+        "alternative_suggestions": alternatives,
+    }
+
+
+def build_final_results(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score, rank and assemble final_results from session state.
+
+    Returns:
+        {"final_results": {...}} in the FinalReviewOutput format, with
+        templated why_recommended text.
+    """
+    query_details = load_state_json(state.get("query_details"))
+    preferences = get_preferences(query_details)
+    location = preferences.get("location_preferences") or {}
+    candidates = merge_candidates(state)
+    by_place_id = {c.get("place_id"): c for c in candidates}
+
+    recommendations = [
+        build_recommendation(by_place_id[scored["place_id"]], scored, preferences)
+        for scored in score_candidates(query_details, candidates)
+    ]
+    return {
+        "final_results": {
+            "search_metadata": {
+                "total_restaurants_analyzed": len(candidates),
+                "user_location": location.get("text_input_primary") or "",
+                "search_radius_km": location.get("search_radius_km") or DEFAULT_SEARCH_RADIUS_KM,
+                "key_preferences": _key_preferences(preferences),
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+            },
+            "recommendations": recommendations,
+            "summary": _summary(recommendations, candidates),
+        }
+    }
+
+
+def writer_input(final_results: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compact per-restaurant facts for the prose writer."""
+    reviews = _entries_by_place_id(state, ENRICHMENT_KEYS["reviews"])
+    rows = []
+    for rec in final_results["final_results"]["recommendations"]:
+        all_reviews = (reviews.get(rec["place_id"]) or {}).get("all_reviews") or []
+        rows.append({
+            "place_id": rec["place_id"],
+            "name": rec["name"],
+            "rank": rec["rank"],
+            "match_score": rec["match_score"],
+            "preference_alignment": rec["preference_alignment"],
+            "potential_concerns": rec["potential_concerns"],
+            "cuisine": rec["cuisine_and_features"]["primary_cuisine"],
+            "price": rec["pricing"]["price_symbol"],
+            "standout_features": rec["highlights"]["standout_features"],
+            "special_items": rec["highlights"]["special_items"],
+            "reviews_summary": rec["highlights"]["review_summary"],
+            "review_excerpts": [
+                str(r.get("text"))[:REVIEW_EXCERPT_CHARS]
+                for r in all_reviews[:MAX_REVIEW_EXCERPTS] if isinstance(r, dict) and r.get("text")
+            ],
+        })
+    return rows
+
+
+def apply_prose(final_results: Dict[str, Any], prose: Any) -> int:
+    """Fill in the writer's why_recommended / review_summary. Returns the number of places updated."""
+    prose = load_state_json(prose)
+    if isinstance(prose, dict):
+        prose = prose.get("recommendations")
+    if not isinstance(prose, list):
+        return 0
+
+    by_place_id = {p.get("place_id"): p for p in prose if isinstance(p, dict)}
+    updated = 0
+    for rec in final_results["final_results"]["recommendations"]:
+        text = by_place_id.get(rec["place_id"]) or {}
+        if text.get("why_recommended"):
+            rec["highlights"]["why_recommended"] = text["why_recommended"]
+            updated += 1
+        if text.get("review_summary"):
+            rec["highlights"]["review_summary"] = text["review_summary"]
+    return updated
+
+
+# ===================================================================
+# AGENT
+# ===================================================================
+
+class FinalReviewAgent(BaseAgent):
+    """
+    Deterministically scores and assembles final_results, delegating only the
+    recommendation prose to `writer_agent`.
+    """
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    writer_agent: LlmAgent
+    """LLM writing why_recommended / review_summary from `scored_recommendations`."""
+
+    output_key: str = "final_results"
+
+    def __init__(self, name: str, writer_agent: LlmAgent, **kwargs):
+        super().__init__(name=name, writer_agent=writer_agent, sub_agents=[writer_agent], **kwargs)
+
+    def _event(self, ctx: InvocationContext, text: str, state_delta: Dict[str, Any]) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        final_results = build_final_results(state)
+        recommendations = final_results["final_results"]["recommendations"]
+        logger.info(f"✅ {self.name} scored and ranked {len(recommendations)} restaurants")
+
+        if recommendations:
+            scored = dump_state_json(writer_input(final_results, state))
+            yield self._event(ctx, scored, {"scored_recommendations": scored})
+            try:
+                async for event in self.writer_agent.run_async(ctx):
+                    yield event
+            except Exception as e:
+                logger.warning(f"⚠️ {self.name} prose writer failed, using templated text: {e}")
+            updated = apply_prose(final_results, ctx.session.state.get(self.writer_agent.output_key))
+            if updated < len(recommendations):
+                logger.warning(f"⚠️ {self.name} writer covered {updated}/{len(recommendations)} restaurants")
+
+        try:
+            output = FinalReviewOutput.model_validate(final_results).model_dump(mode="json")
+        except ValidationError as e:
+            logger.error(f"❌ {self.name} produced results that do not match FinalReviewOutput: {e}")
+            output = final_results
+        text = dump_state_json(output)
+        yield self._event(ctx, text, {self.output_key: text})
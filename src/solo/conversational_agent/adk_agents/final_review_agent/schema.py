@@ -90,4 +90,19 @@ class FinalResults(BaseModel):
     summary: Summary
 
 class FinalReviewOutput(BaseModel):
-    final_results: FinalResults = Field(description="Complete final results with restaurant recommendations")
\ No newline at end of file
+    final_results: FinalResults = Field(description="Complete final results with restaurant recommendations")
+
+# ===================================================================
+# RECOMMENDATION WRITER OUTPUT
+# ===================================================================
+# Scores, ranks and every factual field are computed in code
+# (see scoring.py / recommendation_builder.py); the writer LLM only
+# supplies the prose below.
+
+class RecommendationProse(BaseModel):
+    place_id: str = Field(description="place_id of the restaurant this prose belongs to")
+    why_recommended: str = Field(description="Personalized recommendation explanation (1-2 sentences)")
+    review_summary: Optional[str] = Field(default=None, description="Summary of key reviews (1-2 sentences)")
+
+class RecommendationProseOutput(BaseModel):
+    recommendations: List[RecommendationProse] = Field(description="Prose for each scored recommendation")
@@ -0,0 +1,249 @@
+# adk_agents/final_review_agent/scoring.py
+"""
+Deterministic preference scoring and ranking for the final review.
+
+Each candidate restaurant gets six component scores in [0, 1] (cuisine,
+price, rating, distance, dietary, amenities) computed from query_details and
+the merged enrichment data. Components the user expressed no preference on
+are NaN and drop out of the weighted mean, so the combination, ranking and
+alignment labels are all computed over NumPy arrays for every candidate at
+once. This replaces the match_score / preference_alignment / rank the LLM
+used to estimate.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from conversational_agent.tools.enrichment_utils import haversine_km, place_coordinates
+
+COMPONENTS = ("cuisine", "price", "rating", "distance", "dietary", "amenity")
+COMPONENT_WEIGHTS = np.array([0.30, 0.20, 0.20, 0.15, 0.10, 0.05])
+
+DEFAULT_SEARCH_RADIUS_KM = 5.0
+# A restaurant whose cuisine only shows up in its name or secondary tags is a partial match
+SECONDARY_CUISINE_SCORE = 0.6
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase text with punctuation and underscores collapsed to single spaces."""
+    if isinstance(value, (list, tuple, set)):
+        value = " ".join(str(v) for v in value if v)
+    return " ".join(_WORD_RE.findall(str(value or "").lower()))
+
+
+def mentions(text: str, phrase: Any) -> bool:
+    phrase = normalize_text(phrase)
+    return bool(phrase) and f" {phrase} " in f" {text} "
+
+
+# ===================================================================
+# PREFERENCES
+# ===================================================================
+
+def get_preferences(query_details: Any) -> Dict[str, Any]:
+    """Return the `preferences` section of query_details (or {} if missing)."""
+    if not isinstance(query_details, dict):
+        return {}
+    return query_details.get("preferences") or {}
+
+
+def preferred_price_levels(preferences: Dict[str, Any]) -> List[int]:
+    restaurant = preferences.get("restaurant_specific_preferences") or {}
+    levels = []
+    for level in restaurant.get("price_levels") or []:
+        if isinstance(level, str) and level and set(level) == {"$"}:
+            level = len(level)
+        try:
+            levels.append(int(level))
+        except (TypeError, ValueError):
+            continue
+    return sorted(set(levels))
+
+
+def desired_features(preferences: Dict[str, Any]) -> List[str]:
+    """Amenities, ambiances and attributes the user asked for."""
+    ambiance = preferences.get("ambiance_and_amenities") or {}
+    restaurant = preferences.get("restaurant_specific_preferences") or {}
+    features = (ambiance.get("amenities") or []) + (ambiance.get("ambiances") or []) + (restaurant.get("attribute_preferences") or [])
+    return [f for f in dict.fromkeys(features) if normalize_text(f)]
+
+
+# ===================================================================
+# COMPONENT SCORES
+# ===================================================================
+
+def _cuisine_text(candidate: Dict[str, Any]):
+    """(primary, secondary) cuisine descriptions of a candidate."""
+    categories = candidate.get("fsq_categories") or []
+    primary = normalize_text([candidate.get("primary_type"), categories[:1]])
+    secondary = normalize_text([candidate.get("types"), categories, candidate.get("name")])
+    return primary, secondary
+
+
+def _serves_avoided_cuisine(preferences: Dict[str, Any], candidate: Dict[str, Any]) -> bool:
+    avoided = (preferences.get("cuisine_type_preferences") or {}).get("avoid") or []
+    primary, secondary = _cuisine_text(candidate)
+    return any(mentions(primary, c) or mentions(secondary, c) for c in avoided)
+
+
+def _cuisine_score(preferences: Dict[str, Any], candidate: Dict[str, Any], avoided: bool) -> float:
+    desired = (preferences.get("cuisine_type_preferences") or {}).get("desired") or []
+    if avoided:
+        return 0.0
+    if not desired:
+        return np.nan
+    primary, secondary = _cuisine_text(candidate)
+    if any(mentions(primary, c) for c in desired):
+        return 1.0
+    if any(mentions(secondary, c) for c in desired):
+        return SECONDARY_CUISINE_SCORE
+    return 0.0
+
+
+def _price_score(levels: List[int], price_level: Optional[int]) -> float:
+    if not levels or price_level is None:
+        return np.nan
+    gap = min(abs(price_level - level) for level in levels)
+    return max(0.0, 1.0 - 0.5 * gap)
+
+
+def _rating_score(rating: Optional[float]) -> float:
+    if rating is None:
+        return np.nan
+    # 3.0 and below counts as poor, 5.0 as perfect
+    return float(np.clip((rating - 3.0) / 2.0, 0.0, 1.0))
+
+
+def _distance_km(preferences: Dict[str, Any], candidate: Dict[str, Any]) -> float:
+    location = preferences.get("location_preferences") or {}
+    origin = place_coordinates(location.get("coordinates_primary") or {})
+    destination = place_coordinates(candidate)
+    if not origin or not destination:
+        return np.nan
+    return haversine_km(*origin, *destination)
+
+
+def _fraction_met(wanted: List[str], text: str) -> float:
+    if not wanted:
+        return np.nan
+    return sum(mentions(text, item) for item in wanted) / len(wanted)
+
+
+# ===================================================================
+# VECTORIZED SCORING
+# ===================================================================
+
+def _label(values: np.ndarray, thresholds: List[float], labels: List[str], missing: str) -> List[str]:
+    """Map component scores to labels; thresholds are lower bounds for labels[:-1]."""
+    bins = np.digitize(np.nan_to_num(values, nan=-1.0), thresholds[::-1], right=False)
+    out = np.array(labels[::-1], dtype=object)[bins]
+    out[np.isnan(values)] = missing
+    return out.tolist()
+
+
+def score_candidates(query_details: Any, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score and rank candidate restaurants against the user's preferences.
+
+    Args:
+        query_details: Parsed query_details from session state.
+        candidates: Merged restaurant records (see recommendation_builder.merge_candidates).
+
+    Returns:
+        One entry per candidate, ordered by rank, with rank, match_score,
+        preference_alignment, component scores, distance_km and concerns.
+    """
+    if not candidates:
+        return []
+
+    preferences = get_preferences(query_details)
+    levels = preferred_price_levels(preferences)
+    features = desired_features(preferences)
+    dietary_needs = (preferences.get("dietary_preferences") or {}).get("needs") or []
+    restaurant_prefs = preferences.get("restaurant_specific_preferences") or {}
+    min_rating = restaurant_prefs.get("min_rating")
+    radius_km = float((preferences.get("location_preferences") or {}).get("search_radius_km") or DEFAULT_SEARCH_RADIUS_KM)
+    sorting = ((query_details or {}).get("meta_preferences_for_results") or {}).get("sorting_preference") if isinstance(query_details, dict) else None
+
+    ratings = np.array([c.get("rating") if c.get("rating") is not None else np.nan for c in candidates], dtype=float)
+    distances = np.array([_distance_km(preferences, c) for c in candidates], dtype=float)
+    price_levels = [c.get("price_level") for c in candidates]
+    avoided = np.array([_serves_avoided_cuisine(preferences, c) for c in candidates], dtype=bool)
+
+    scores = np.column_stack([
+        [_cuisine_score(preferences, c, a) for c, a in zip(candidates, avoided)],
+        [_price_score(levels, p) for p in price_levels],
+        [_rating_score(r) if not np.isnan(r) else np.nan for r in ratings],
+        np.clip(1.0 - 0.5 * distances / radius_km, 0.0, 1.0),
+        [_fraction_met(dietary_needs, c["feature_text"]) for c in candidates],
+        [_fraction_met(features, c["feature_text"]) for c in candidates],
+    ])
+
+    # Weighted mean over the components that apply to each candidate
+    applicable = ~np.isnan(scores)
+    weights = applicable * COMPONENT_WEIGHTS
+    weight_totals = weights.sum(axis=1)
+    combined = np.divide(
+        np.nansum(scores * COMPONENT_WEIGHTS, axis=1), weight_totals,
+        out=np.full(len(candidates), 0.5), where=weight_totals > 0,
+    )
+
+    # Hard requirements: avoided cuisine, rating floor, search radius
+    below_rating = (ratings < float(min_rating)) if min_rating is not None else np.zeros(len(candidates), dtype=bool)
+    outside_radius = distances > radius_km
+    violations = avoided.astype(int) + below_rating.astype(int) + outside_radius.astype(int)
+    match_scores = np.rint(np.clip(combined * 100 - 15 * violations, 0, 100)).astype(int)
+
+    # Rank: fewest violated requirements, then the user's sorting preference, then score
+    rating_key = np.nan_to_num(ratings, nan=0.0)
+    distance_key = np.nan_to_num(distances, nan=np.inf)
+    if sorting == "rating":
+        order = np.lexsort((-match_scores, -rating_key, violations))
+    elif sorting == "distance":
+        order = np.lexsort((-match_scores, distance_key, violations))
+    else:
+        order = np.lexsort((-rating_key, -match_scores, violations))
+
+    cuisine_labels = _label(scores[:, 0], [0.99, SECONDARY_CUISINE_SCORE, 1e-9], ["Perfect", "Good", "Partial", "None"], "Good")
+    price_labels = _label(scores[:, 1], [0.99, 0.5, 1e-9], ["Perfect", "Good", "Partial", "None"], "Good")
+    location_labels = _label(scores[:, 3], [0.75, 0.5, 0.25], ["Excellent", "Good", "Fair", "Poor"], "Good")
+    amenity_labels = _label(scores[:, 5], [0.67, 0.34], ["High", "Medium", "Low"], "Medium")
+
+    results = []
+    for rank, i in enumerate(order, start=1):
+        candidate = candidates[i]
+        concerns = []
+        if avoided[i]:
+            concerns.append("Serves a cuisine you wanted to avoid")
+        if below_rating[i]:
+            concerns.append(f"Rated {ratings[i]:.1f}, below your {float(min_rating):.1f} minimum")
+        if outside_radius[i]:
+            concerns.append(f"{distances[i]:.1f} km away, outside your {radius_km:g} km radius")
+        if levels and price_levels[i] is not None and price_levels[i] not in levels:
+            concerns.append("Outside your preferred price range")
+        if dietary_needs and scores[i, 4] < 1.0:
+            missing = [need for need in dietary_needs if not mentions(candidate["feature_text"], need)]
+            concerns.append(f"No confirmed options for: {', '.join(missing)}")
+
+        results.append({
+            "place_id": candidate.get("place_id"),
+            "rank": rank,
+            "match_score": int(match_scores[i]),
+            "preference_alignment": {
+                "cuisine_match": cuisine_labels[i],
+                "price_match": price_labels[i],
+                "location_convenience": location_labels[i],
+                "amenity_satisfaction": amenity_labels[i],
+            },
+            "components": {
+                name: (None if np.isnan(value) else round(float(value), 3))
+                for name, value in zip(COMPONENTS, scores[i])
+            },
+            "distance_km": None if np.isnan(distances[i]) else round(float(distances[i]), 2),
+            "potential_concerns": concerns,
+        })
+    return results
@@ -0,0 +1,305 @@
+# adk_agents/fsq_enrichment_agent/fsq_enrichment.py
+"""
+Concurrent Foursquare enrichment.
+
+Replaces the LLM loop that walked the restaurants one searchFoursquarePlaceDetails
+call at a time: lookups run concurrently (bounded by a semaphore to stay inside
+Foursquare's rate limits), candidates are scored by name similarity and
+coordinate distance, and the winner is reshaped into the `fsq_data` entry
+described in FOURSQUARE_ENRICHMENT_AGENT_INSTRUCTIONS. Restaurants already
+in the entity index are fetched by fsq_id instead of searched for. Uncached
+calls take a slot from the Foursquare rate limiter; once the daily quota is
+spent, restaurants get the null entry.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from conversational_agent.config.settings import FOURSQUARE_API_KEY, FSQ_MAX_CONCURRENCY
+from conversational_agent.adk_agents.code_enrichment_agent import CodeEnrichmentAgent
+from conversational_agent.adk_agents.fsq_enrichment_agent.foursquare_openapi_spec import FOURSQUARE_OPENAPI_SPEC
+from conversational_agent.tools.enrichment_utils import (
+    addresses_match,
+    haversine_km,
+    name_similarity,
+    place_coordinates,
+)
+from conversational_agent.tools.caching_openapi_toolset import CachedOperation
+from conversational_agent.tools.entity_index import get_entity_index
+from conversational_agent.tools.http_client import get_http_client
+from conversational_agent.tools.rate_limiter import QuotaExceededError, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+FSQ_API_BASE_URL = FOURSQUARE_OPENAPI_SPEC["servers"][0]["url"]
+FSQ_SEARCH_PATH = "/v3/places/search"
+FSQ_PLACE_PATH = "/v3/places/{fsq_id}"
+FSQ_SEARCH_FIELDS = (
+    "fsq_id,name,location,categories,features,attributes,menu,hours,"
+    "rating,price,description,website,tel,social_media,geocodes"
+)
+FSQ_SEARCH_LIMIT = 3  # Score a few candidates instead of trusting the first hit
+FSQ_MAX_RESTAURANTS = 8
+
+# Candidate scoring: names must be close and the venue within walking distance
+# of the Google result; among those, prefer the better name then the nearer venue.
+FSQ_MIN_NAME_SIMILARITY = 0.7
+FSQ_MATCH_MAX_DISTANCE_KM = 0.5
+FSQ_NAME_WEIGHT = 0.7
+FSQ_DISTANCE_WEIGHT = 0.3
+
+# Search and by-id responses are cached with the spec's x-cache-ttl policy
+_search_cache = CachedOperation.from_spec(
+    FOURSQUARE_OPENAPI_SPEC, "searchFoursquarePlaceDetails", "fsq:search_foursquare_place_details"
+)
+_place_cache = CachedOperation.from_spec(
+    FOURSQUARE_OPENAPI_SPEC, "getFoursquarePlaceDetails", "fsq:get_foursquare_place_details"
+)
+
+_FSQ_FIELDS = (
+    "fsq_id", "title", "location", "categories", "features", "attributes", "menu",
+    "hours", "rating", "price", "description", "website", "tel", "social_media",
+)
+
+
+# ===================================================================
+# MATCHING
+# ===================================================================
+
+def score_fsq_candidate(place: Dict[str, Any], candidate: Dict[str, Any]) -> Optional[float]:
+    """
+    Score how well a Foursquare result matches a Google Places restaurant.
+
+    Returns:
+        A score in [0, 1], or None if the name or location rules out the match.
+    """
+    name_score = name_similarity(place.get("name"), candidate.get("name"))
+    if name_score < FSQ_MIN_NAME_SIMILARITY:
+        return None
+
+    place_coords = place_coordinates(place)
+    candidate_coords = place_coordinates(((candidate.get("geocodes") or {}).get("main")) or {})
+    if place_coords and candidate_coords:
+        distance_km = haversine_km(*place_coords, *candidate_coords)
+        if distance_km > FSQ_MATCH_MAX_DISTANCE_KM:
+            return None
+        distance_score = 1.0 - distance_km / FSQ_MATCH_MAX_DISTANCE_KM
+    else:
+        # No coordinates to compare; fall back to the address
+        location = candidate.get("location") or {}
+        candidate_address = location.get("formatted_address") or location.get("address")
+        if not addresses_match(place.get("vicinity") or place.get("formatted_address"), candidate_address):
+            return None
+        distance_score = 0.0
+
+    return FSQ_NAME_WEIGHT * name_score + FSQ_DISTANCE_WEIGHT * distance_score
+
+
+def match_fsq_place(place: Dict[str, Any], candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the best-scoring candidate, or None if none is an acceptable match."""
+    best, best_score = None, None
+    for candidate in candidates:
+        score = score_fsq_candidate(place, candidate)
+        if score is not None and (best_score is None or score > best_score):
+            best, best_score = candidate, score
+    return best
+
+
+# ===================================================================
+# RESPONSE SHAPING
+# ===================================================================
+
+def _pick(source: Any, keys: tuple) -> Optional[Dict[str, Any]]:
+    """Copy `keys` out of a dict, or None if there is nothing to copy."""
+    if not isinstance(source, dict) or not source:
+        return None
+    return {key: source.get(key) for key in keys}
+
+
+def _shape_features(features: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(features, dict) or not features:
+        return None
+
+    food_and_drink = features.get("food_and_drink") or {}
+    amenities = features.get("amenities") or {}
+    payment = features.get("payment") or {}
+
+    shaped_amenities = _pick(amenities, (
+        "restroom", "wifi", "parking", "outdoor_seating", "wheelchair_accessible",
+        "tvs", "music", "live_music",
+    ))
+    if shaped_amenities is not None:
+        shaped_amenities["parking"] = _pick(amenities.get("parking"), ("parking", "street_parking", "valet_parking"))
+
+    return {
+        "food_and_drink": {
+            "alcohol": _pick(food_and_drink.get("alcohol"), ("beer", "wine", "cocktails")),
+            "meals": _pick(food_and_drink.get("meals"), ("breakfast", "brunch", "lunch", "dinner")),
+        } if food_and_drink else None,
+        "amenities": shaped_amenities,
+        "services": _pick(features.get("services"), ("delivery", "takeout", "drive_through", "dine_in")),
+        "payment": {
+            "credit_cards": _pick(payment.get("credit_cards"), ("accepts_credit_cards", "visa", "mastercard", "amex")),
+            "digital_wallet": _pick(payment.get("digital_wallet"), ("apple_pay", "google_pay")),
+        } if payment else None,
+    }
+
+
+def _shape_hours(hours: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(hours, dict) or not hours:
+        return None
+    regular = hours.get("regular")
+    return {
+        "display": hours.get("display"),
+        "open_now": hours.get("open_now"),
+        "regular": [_pick(slot, ("day", "open", "close")) for slot in regular if isinstance(slot, dict)]
+        if isinstance(regular, list) else None,
+    }
+
+
+def _null_entry(place: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {"place_id": place.get("place_id"), "original_name": place.get("name")}
+    entry.update(dict.fromkeys(_FSQ_FIELDS))
+    return entry
+
+
+def to_fsq_entry(place: Dict[str, Any], fsq_place: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build one `fsq_data` entry; unmatched restaurants get null fields."""
+    entry = _null_entry(place)
+    if not fsq_place:
+        return entry
+
+    categories = fsq_place.get("categories")
+    entry.update({
+        "fsq_id": fsq_place.get("fsq_id"),
+        "title": fsq_place.get("name"),
+        "location": _pick(fsq_place.get("location"), (
+            "address", "formatted_address", "locality", "region", "postcode", "country",
+        )),
+        "categories": [_pick(c, ("id", "name", "short_name")) for c in categories if isinstance(c, dict)]
+        if categories else None,
+        "features": _shape_features(fsq_place.get("features")),
+        "attributes": fsq_place.get("attributes") or None,
+        "menu": fsq_place.get("menu"),
+        "hours": _shape_hours(fsq_place.get("hours")),
+        "rating": fsq_place.get("rating"),
+        "price": fsq_place.get("price"),
+        "description": fsq_place.get("description"),
+        "website": fsq_place.get("website"),
+        "tel": fsq_place.get("tel"),
+        "social_media": _pick(fsq_place.get("social_media"), ("facebook_id", "instagram", "twitter")),
+    })
+    return entry
+
+
+# ===================================================================
+# FETCHING
+# ===================================================================
+
+async def search_fsq_places(client: httpx.AsyncClient, place: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run one searchFoursquarePlaceDetails call for a restaurant."""
+    params = {"query": place["name"], "limit": FSQ_SEARCH_LIMIT, "fields": FSQ_SEARCH_FIELDS}
+    coords = place_coordinates(place)
+    if coords:
+        params["ll"] = f"{coords[0]},{coords[1]}"
+    elif place.get("vicinity"):
+        # ll pins the search far tighter than a free-text address, so near is only the fallback
+        params["near"] = place["vicinity"]
+    else:
+        return []
+
+    cached = await _search_cache.aget(params) if _search_cache else None
+    if cached is not None:
+        return cached.get("results", [])
+
+    await get_rate_limiter("fsq").acquire()
+    response = await client.get(
+        f"{FSQ_API_BASE_URL}{FSQ_SEARCH_PATH}",
+        params=params,
+        headers={"Authorization": FOURSQUARE_API_KEY, "Accept": "application/json"},
+    )
+    response.raise_for_status()
+    data = response.json()
+    if _search_cache:
+        _search_cache.set(params, data)
+    return data.get("results", [])
+
+
+async def get_fsq_place(client: httpx.AsyncClient, fsq_id: str) -> Dict[str, Any]:
+    """Fetch one place by its fsq_id, with the same fields as a search."""
+    params = {"fsq_id": fsq_id, "fields": FSQ_SEARCH_FIELDS}
+    cached = await _place_cache.aget(params) if _place_cache else None
+    if cached is not None:
+        return cached
+
+    await get_rate_limiter("fsq").acquire()
+    response = await client.get(
+        f"{FSQ_API_BASE_URL}{FSQ_PLACE_PATH.format(fsq_id=fsq_id)}",
+        params={"fields": FSQ_SEARCH_FIELDS},
+        headers={"Authorization": FOURSQUARE_API_KEY, "Accept": "application/json"},
+    )
+    response.raise_for_status()
+    data = response.json()
+    if _place_cache:
+        _place_cache.set(params, data)
+    return data
+
+
+async def _lookup_fsq_place(client: httpx.AsyncClient, place: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Detail lookup by indexed fsq_id, falling back to a search and recording the match."""
+    index = get_entity_index()
+    fsq_id = index.lookup("fsq", place)
+    if fsq_id:
+        try:
+            return await get_fsq_place(client, fsq_id)
+        except (httpx.HTTPError, ValueError, QuotaExceededError) as e:
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
+                index.unlink("fsq", place.get("place_id"))
+            logger.warning(f"⚠️ Foursquare place {fsq_id} lookup failed for {place.get('name')}: {e}")
+
+    fsq_place = match_fsq_place(place, await search_fsq_places(client, place))
+    if fsq_place:
+        index.link("fsq", place, fsq_place.get("fsq_id"))
+    return fsq_place
+
+
+async def _enrich_place(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, place: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        async with semaphore:
+            fsq_place = await _lookup_fsq_place(client, place)
+    except (httpx.HTTPError, ValueError, QuotaExceededError) as e:
+        logger.warning(f"⚠️ Foursquare lookup failed for {place.get('name')}: {e}")
+        return _null_entry(place)
+    return to_fsq_entry(place, fsq_place)
+
+
+async def fetch_fsq_data(places: List[Dict[str, Any]], max_concurrency: int = FSQ_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Look up every restaurant on Foursquare, at most `max_concurrency` at a time.
+
+    Returns:
+        {"fsq_data": [...]} with one entry per restaurant, in input order.
+    """
+    client = get_http_client()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    places = places[:FSQ_MAX_RESTAURANTS]
+    entries = await asyncio.gather(*(_enrich_place(client, semaphore, place) for place in places))
+    return {"fsq_data": list(entries)}
+
+
+def fsq_placeholder(places: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """`fsq_data` with null fields for every restaurant, for when the lookups run out of time."""
+    return {"fsq_data": [_null_entry(place) for place in places[:FSQ_MAX_RESTAURANTS]]}
+
+
+class FoursquareEnrichmentAgent(CodeEnrichmentAgent):
+    """Writes `fsq_data` from concurrent Foursquare place searches."""
+
+    max_concurrency: int = FSQ_MAX_CONCURRENCY
+    """Upper bound on in-flight Foursquare requests."""
+
+    async def enrich(self, places: List[Dict[str, Any]], state: Dict[str, Any]) -> Any:
+        return await fetch_fsq_data(places, self.max_concurrency)
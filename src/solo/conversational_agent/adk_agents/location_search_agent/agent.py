@@ -1,9 +1,10 @@
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
 
+from conversational_agent.adk_agents.location_search_agent.geo_filter import GeoFilterAgent
 from conversational_agent.adk_agents.location_search_agent.prompt import LOCATION_SEARCH_AGENT_INSTRUCTIONS
-from conversational_agent.config.settings import GOOGLE_MAPS_API_KEY as google_maps_api_key
 from conversational_agent.config.settings import GEMINI_MODEL
+from conversational_agent.tools.maps_mcp_pool import MapsMCPToolset
+from conversational_agent.tools.state_compaction import compact_json_output
 
 
 # root_agent = LlmAgent(
@@ -15,19 +16,13 @@ location_search_agent = LlmAgent(
         "It can search for places, get place details, and stores results in a structured format. "
     ),
     instruction=LOCATION_SEARCH_AGENT_INSTRUCTIONS,
-        tools=[
-        MCPToolset(
-            connection_params=StdioServerParameters(
-                command="npx",
-                args=[
-                    "-y",
-                    "@modelcontextprotocol/server-google-maps",
-                ],
-                env={
-                    "GOOGLE_MAPS_API_KEY": google_maps_api_key
-                }
-            ),
-        )
-    ],
+    tools=[MapsMCPToolset()],  # Leases sessions from the shared Google Maps MCP server pool
     output_key='search_results',  # The output will be a JSON string of the search results
+    after_model_callback=compact_json_output,  # Stored minified, without null fields
+)
+
+# Drops results outside the radius / travel range or in avoided areas before enrichment
+geo_filter_agent = GeoFilterAgent(
+    name='GeoFilterAgent',
+    description="Removes search results that fall outside the user's search radius or inside areas they want to avoid.",
 )
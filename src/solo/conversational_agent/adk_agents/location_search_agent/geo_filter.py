@@ -0,0 +1,193 @@
+# adk_agents/location_search_agent/geo_filter.py
+"""
+Geospatial filter between location search and enrichment.
+
+LocationSearchAgent is only asked to respect `location_preferences` in its
+prompt, so restaurants outside the radius or inside an avoided neighborhood
+still reach the Yelp, Foursquare and BestTime lookups. This stage drops them
+in bulk first: candidate coordinates are projected onto a local kilometer
+plane and loaded into a shapely STRtree, which is queried once with the
+search circle (radius capped by max_travel_time_minutes) and once with the
+avoid_areas polygons resolved from a local neighborhood GeoJSON file.
+"""
+
+import json
+import logging
+import math
+import os
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Point, shape
+from shapely.strtree import STRtree
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from conversational_agent.config.settings import NEIGHBORHOOD_GEOJSON_PATH, TRAVEL_SPEED_KMH
+from conversational_agent.tools.enrichment_utils import (
+    get_search_results,
+    load_state_json,
+    normalize_name,
+    place_coordinates,
+)
+from conversational_agent.tools.state_compaction import compact_state_json
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LNG_EQUATOR = 111.320
+# Road distance is rarely a straight line; straight-line reach = travel distance / detour
+TRAVEL_DETOUR_FACTOR = 1.3
+# GeoJSON properties that may carry a neighborhood's name
+_AREA_NAME_PROPERTIES = ("name", "neighborhood", "neighbourhood", "nhood", "NAME")
+
+_areas_cache: Dict[str, Any] = {"key": None, "areas": {}}
+
+
+# ===================================================================
+# NEIGHBORHOOD POLYGONS
+# ===================================================================
+
+def load_neighborhood_areas(path: str = NEIGHBORHOOD_GEOJSON_PATH) -> Dict[str, Any]:
+    """
+    Load {normalized name: polygon (lng/lat)} from a GeoJSON FeatureCollection.
+
+    The file is re-read only when its modification time changes. A missing or
+    unreadable file yields {} so avoid_areas is simply not enforced.
+    """
+    if not path:
+        return {}
+    try:
+        key = (path, os.path.getmtime(path))
+    except OSError:
+        logger.warning(f"⚠️ Neighborhood GeoJSON {path} not found; avoid_areas will not be applied")
+        return {}
+    if _areas_cache["key"] == key:
+        return _areas_cache["areas"]
+
+    areas = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f).get("features") or []
+        for feature in features:
+            properties = feature.get("properties") or {}
+            name = next((properties[p] for p in _AREA_NAME_PROPERTIES if properties.get(p)), None)
+            if name and feature.get("geometry"):
+                areas[normalize_name(name)] = shape(feature["geometry"])
+    except (OSError, ValueError, AttributeError, shapely.errors.GEOSException) as e:
+        logger.warning(f"⚠️ Could not load neighborhood GeoJSON {path}: {e}")
+        return {}
+
+    _areas_cache.update(key=key, areas=areas)
+    logger.info(f"✅ Loaded {len(areas)} neighborhood polygons from {path}")
+    return areas
+
+
+def resolve_avoid_areas(avoid_areas: List[str], areas: Dict[str, Any]) -> List[Any]:
+    """Polygons for the avoid_areas names that exist in the neighborhood file."""
+    polygons = []
+    for name in avoid_areas or []:
+        polygon = areas.get(normalize_name(name))
+        if polygon is None:
+            logger.warning(f"⚠️ Unknown avoid area '{name}', skipping")
+        else:
+            polygons.append(polygon)
+    return polygons
+
+
+# ===================================================================
+# FILTERING
+# ===================================================================
+
+def _to_local_km(origin: Tuple[float, float]):
+    """Equirectangular projection of (lng, lat) arrays onto a km plane centred on origin."""
+    lat0, lng0 = origin
+    km_per_deg_lng = KM_PER_DEG_LNG_EQUATOR * math.cos(math.radians(lat0))
+
+    def project(coords: np.ndarray) -> np.ndarray:
+        return np.column_stack(((coords[:, 0] - lng0) * km_per_deg_lng, (coords[:, 1] - lat0) * KM_PER_DEG_LAT))
+
+    return project
+
+
+def effective_radius_km(location: Dict[str, Any]) -> Optional[float]:
+    """search_radius_km, capped by how far max_travel_time_minutes can reach."""
+    limits = []
+    if location.get("search_radius_km"):
+        limits.append(float(location["search_radius_km"]))
+    if location.get("max_travel_time_minutes"):
+        travel_km = float(location["max_travel_time_minutes"]) / 60.0 * TRAVEL_SPEED_KMH
+        limits.append(travel_km / TRAVEL_DETOUR_FACTOR)
+    return min(limits) if limits else None
+
+
+def filter_places(places: List[Dict[str, Any]], query_details: Any) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Drop places outside the search radius / travel range or inside an avoided area.
+
+    Places without coordinates are kept, since they cannot be judged.
+
+    Returns:
+        (kept places in input order, counts of places removed per reason)
+    """
+    preferences = query_details.get("preferences") or {} if isinstance(query_details, dict) else {}
+    location = preferences.get("location_preferences") or {}
+    removed = {"outside_radius": 0, "avoided_area": 0}
+
+    located = [(i, place_coordinates(p)) for i, p in enumerate(places)]
+    located = [(i, coords) for i, coords in located if coords]
+    if not located:
+        return places, removed
+
+    origin = place_coordinates(location.get("coordinates_primary") or {})
+    radius_km = effective_radius_km(location)
+    avoid_polygons = resolve_avoid_areas(location.get("avoid_areas"), load_neighborhood_areas())
+    if not avoid_polygons and not (origin and radius_km):
+        return places, removed
+
+    lng_lat = np.array([(lng, lat) for _, (lat, lng) in located], dtype=float)
+    rejected = set()
+
+    # Avoided areas are tested in lng/lat, the GeoJSON's own coordinate system
+    if avoid_polygons:
+        tree = STRtree(shapely.points(lng_lat))
+        hits = tree.query(avoid_polygons, predicate="contains")[1]
+        avoided = {located[j][0] for j in hits}
+        removed["avoided_area"] = len(avoided)
+        rejected |= avoided
+
+    if origin and radius_km:
+        tree = STRtree(shapely.points(_to_local_km(origin)(lng_lat)))
+        inside = {located[j][0] for j in tree.query(Point(0.0, 0.0).buffer(radius_km), predicate="intersects")}
+        outside = {located[j][0] for j in range(len(located))} - inside - rejected
+        removed["outside_radius"] = len(outside)
+        rejected |= outside
+
+    return [p for i, p in enumerate(places) if i not in rejected], removed
+
+
+class GeoFilterAgent(BaseAgent):
+    """Rewrites `search_results` without the places the location preferences rule out."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        places = get_search_results(state)
+        kept, removed = filter_places(places, load_state_json(state.get("query_details")))
+        if places and not kept:
+            # Better to show flagged results than none; FinalReviewAgent reports the misses
+            logger.warning(f"⚠️ {self.name} would remove all {len(places)} restaurants; keeping them")
+            kept = places
+        logger.info(f"✅ {self.name} kept {len(kept)}/{len(places)} restaurants (removed: {removed})")
+
+        state_delta = {"search_results": compact_state_json(kept)} if len(kept) < len(places) else {}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=f"Kept {len(kept)} of {len(places)} restaurants.")]),
+            actions=EventActions(state_delta=state_delta),
+        )
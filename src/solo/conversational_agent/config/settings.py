@@ -1,13 +1,15 @@
 # config/settings.py - Based on Google's Codelabs tutorial pattern
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables - using the same pattern as Google's tutorial
 try:
     from dotenv import load_dotenv
     load_dotenv()
-    print("✅ Environment variables loaded from .env")
 except ImportError:
-    print("ℹ️ Running in deployed environment")
+    pass  # Running in deployed environment
 
 # Core Google Cloud Configuration - exactly matching Codelabs tutorial names
 GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "forkcast-460406")
@@ -28,12 +30,125 @@ FOURSQUARE_API_KEY = os.getenv("FOURSQUARE_API_KEY", "") # For Foursquare API
 YELP_API_KEY = os.getenv("YELP_API_KEY", "") # For Yelp Fusion API
 BESTTIME_API_KEY = os.getenv("BESTTIME_API_KEY", "") # For BestTime API
 
+# API base URLs; override to point at local stand-ins (see benchmarks/bench_pipeline.py)
+YELP_API_BASE_URL = os.getenv("YELP_API_BASE_URL", "https://api.yelp.com")
+FOURSQUARE_API_BASE_URL = os.getenv("FOURSQUARE_API_BASE_URL", "https://api.foursquare.com")
+BESTTIME_API_BASE_URL = os.getenv("BESTTIME_API_BASE_URL", "https://besttime.app")
+
+# Shared Google Maps MCP server pool (see tools/maps_mcp_pool.py)
+MAPS_MCP_POOL_SIZE = int(os.getenv("MAPS_MCP_POOL_SIZE", "2"))
+MAPS_MCP_HEALTH_CHECK_INTERVAL_S = float(os.getenv("MAPS_MCP_HEALTH_CHECK_INTERVAL_S", "30"))
+MAPS_MCP_READ_TIMEOUT_S = float(os.getenv("MAPS_MCP_READ_TIMEOUT_S", "30"))
+# Longest wait for a server to start and answer `initialize` (npx may download the package)
+MAPS_MCP_START_TIMEOUT_S = float(os.getenv("MAPS_MCP_START_TIMEOUT_S", "120"))
+# Command line that starts a Maps MCP server instead of the installed one, e.g. a local stand-in
+MAPS_MCP_COMMAND = os.getenv("MAPS_MCP_COMMAND", "")
+
+# Shared outbound HTTP client for Yelp, Foursquare and BestTime (see tools/http_client.py)
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60"))
+HTTP_DNS_CACHE_TTL_S = float(os.getenv("HTTP_DNS_CACHE_TTL_S", "300"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# Concurrent Foursquare lookups per enrichment run (see adk_agents/fsq_enrichment_agent/fsq_enrichment.py)
+FSQ_MAX_CONCURRENCY = int(os.getenv("FSQ_MAX_CONCURRENCY", "4"))
+
+# API response caches (see tools/ttl_cache.py). Set CACHE_DB_PATH to a SQLite file
+# to share cached responses between workers; caches are in-process only otherwise.
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+# Expired rows are deleted from the cache database when it opens and every CACHE_PRUNE_INTERVAL_S; 0 disables it.
+CACHE_PRUNE_INTERVAL_S = float(os.getenv("CACHE_PRUNE_INTERVAL_S", "600"))
+BESTTIME_FORECAST_CACHE_TTL_S = float(os.getenv("BESTTIME_FORECAST_CACHE_TTL_S", str(3 * 24 * 3600)))
+BESTTIME_LIVE_CACHE_TTL_S = float(os.getenv("BESTTIME_LIVE_CACHE_TTL_S", "300"))
+BESTTIME_CACHE_MAX_ENTRIES = int(os.getenv("BESTTIME_CACHE_MAX_ENTRIES", "512"))
+MAPS_CACHE_MAX_ENTRIES = int(os.getenv("MAPS_CACHE_MAX_ENTRIES", "1024"))
+MAPS_DETAILS_CACHE_TTL_S = float(os.getenv("MAPS_DETAILS_CACHE_TTL_S", str(6 * 3600)))
+MAPS_SEARCH_CACHE_TTL_S = float(os.getenv("MAPS_SEARCH_CACHE_TTL_S", "600"))
+MAPS_OPEN_NOW_TTL_S = float(os.getenv("MAPS_OPEN_NOW_TTL_S", "600"))
+
+# place_id -> Yelp / Foursquare / BestTime id links (see tools/entity_index.py).
+# Defaults to the cache database, or ./forkcast_cache.db if that is unset, so
+# links survive restarts; set it to "" to keep them in memory only.
+ENTITY_INDEX_DB_PATH = os.getenv("ENTITY_INDEX_DB_PATH", CACHE_DB_PATH or "./forkcast_cache.db")
+
+# Per-provider rate limits (requests/second) and daily quotas (calls per UTC day)
+# for outbound API calls (see tools/rate_limiter.py); 0 disables a limit. Quota
+# counters live in QUOTA_DB_PATH, which defaults to the cache database, or
+# ./forkcast_cache.db if that is unset, so every worker and restart counts
+# against the same budget; set it to "" to count per process in memory.
+QUOTA_DB_PATH = os.getenv("QUOTA_DB_PATH", CACHE_DB_PATH or "./forkcast_cache.db")
+RATE_LIMIT_MAX_WAIT_S = float(os.getenv("RATE_LIMIT_MAX_WAIT_S", "5"))
+YELP_RATE_LIMIT_QPS = float(os.getenv("YELP_RATE_LIMIT_QPS", "5"))
+YELP_DAILY_QUOTA = int(os.getenv("YELP_DAILY_QUOTA", "5000"))
+FSQ_RATE_LIMIT_QPS = float(os.getenv("FSQ_RATE_LIMIT_QPS", "10"))
+FSQ_DAILY_QUOTA = int(os.getenv("FSQ_DAILY_QUOTA", "10000"))
+BESTTIME_RATE_LIMIT_QPS = float(os.getenv("BESTTIME_RATE_LIMIT_QPS", "2"))
+BESTTIME_DAILY_QUOTA = int(os.getenv("BESTTIME_DAILY_QUOTA", "500"))
+
+# Geospatial pre-filter (see adk_agents/location_search_agent/geo_filter.py).
+# NEIGHBORHOOD_GEOJSON_PATH is a FeatureCollection of named neighborhood polygons
+# used to resolve avoid_areas; TRAVEL_SPEED_KMH converts max_travel_time_minutes to a distance.
+NEIGHBORHOOD_GEOJSON_PATH = os.getenv("NEIGHBORHOOD_GEOJSON_PATH", "")
+TRAVEL_SPEED_KMH = float(os.getenv("TRAVEL_SPEED_KMH", "20"))
+
+# Deadlines for the ParallelEnrichmentAgent branches (see adk_agents/deadline_parallel_agent.py);
+# 0 disables a limit. A branch cut off at its deadline gets null placeholders. With
+# ENRICHMENT_ATTACH_LATE_RESULTS it keeps running and its result is merged into the root
+# session on the user's next turn.
+ENRICHMENT_BRANCH_TIMEOUT_S = float(os.getenv("ENRICHMENT_BRANCH_TIMEOUT_S", "20"))
+ENRICHMENT_DEADLINE_S = float(os.getenv("ENRICHMENT_DEADLINE_S", "30"))
+ENRICHMENT_ATTACH_LATE_RESULTS = os.getenv("ENRICHMENT_ATTACH_LATE_RESULTS", "false").lower() == "true"
+
+# Review texts kept in session state are cut to this many characters (see tools/state_compaction.py)
+STATE_REVIEW_MAX_CHARS = int(os.getenv("STATE_REVIEW_MAX_CHARS", "300"))
+
+# Stream a preliminary ranking, per-branch patches and the final results over /run_sse
+# as partial events while a search runs (see adk_agents/progressive_results_agent.py).
+PROGRESSIVE_RESULTS_ENABLED = os.getenv("PROGRESSIVE_RESULTS_ENABLED", "false").lower() == "true"
+
+# SQLite session store (see tools/session_store.py): connection pool, memory-mapped
+# reads, lock wait, and pruning of sessions idle for SESSION_TTL_S (0 keeps them forever).
+SESSION_DB_POOL_SIZE = int(os.getenv("SESSION_DB_POOL_SIZE", "5"))
+SESSION_DB_MAX_OVERFLOW = int(os.getenv("SESSION_DB_MAX_OVERFLOW", "10"))
+SESSION_DB_MMAP_SIZE_MB = int(os.getenv("SESSION_DB_MMAP_SIZE_MB", "64"))
+SESSION_DB_BUSY_TIMEOUT_S = float(os.getenv("SESSION_DB_BUSY_TIMEOUT_S", "5"))
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(7 * 24 * 3600)))
+SESSION_PRUNE_INTERVAL_S = float(os.getenv("SESSION_PRUNE_INTERVAL_S", "3600"))
+SESSION_PRUNE_BATCH_SIZE = int(os.getenv("SESSION_PRUNE_BATCH_SIZE", "200"))
+
+# Firestore session store, used when SESSION_DB_URL is firestore://<root collection>
+# (see tools/firestore_session_service.py). A turn's events and state changes are committed
+# together, at its final response or FIRESTORE_SESSION_FLUSH_DELAY_S after its first event.
+# A commit that keeps failing is retried every FIRESTORE_SESSION_FLUSH_DELAY_S and its writes
+# are dropped (with an error logged) after FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS attempts.
+FIRESTORE_PROJECT = os.getenv("FIRESTORE_PROJECT", GOOGLE_CLOUD_PROJECT)
+FIRESTORE_DATABASE = os.getenv("FIRESTORE_DATABASE", "(default)")
+FIRESTORE_SESSION_FLUSH_DELAY_S = float(os.getenv("FIRESTORE_SESSION_FLUSH_DELAY_S", "2"))
+FIRESTORE_SESSION_MAX_BATCH_EVENTS = int(os.getenv("FIRESTORE_SESSION_MAX_BATCH_EVENTS", "100"))
+FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS = int(os.getenv("FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS", "5"))
+
+# Event log compaction (see tools/event_compaction.py): when a new search starts, the tool
+# responses from earlier turns are cut to a summary of EVENT_COMPACTION_SUMMARY_CHARS and
+# their state deltas dropped. Session state itself is never touched.
+EVENT_COMPACTION_ENABLED = os.getenv("EVENT_COMPACTION_ENABLED", "true").lower() == "true"
+EVENT_COMPACTION_SUMMARY_CHARS = int(os.getenv("EVENT_COMPACTION_SUMMARY_CHARS", "200"))
+
+# Agent / model / tool metrics served at /metrics (see tools/telemetry.py).
+# TRACE_TO_CLOUD also exports the OpenTelemetry spans to Cloud Trace.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+TRACE_TO_CLOUD = os.getenv("TRACE_TO_CLOUD", "false").lower() == "true"
+
 
-if not GOOGLE_MAPS_API_KEY:
-   print("Warning: GOOGLE_MAPS_API_KEY is not set. Maps and Places features might fail.")
-if not FOURSQUARE_API_KEY:
-   print("Warning: FOURSQUARE_API_KEY is not set. Foursquare features might fail.")
-if not YELP_API_KEY:
-   print("Warning: YELP_API_KEY is not set. Yelp features might fail.")
-if not BESTTIME_API_KEY:
-   print("Warning: BESTTIME_API_KEY is not set. BestTime features might fail.")
\ No newline at end of file
+def warn_missing_api_keys() -> None:
+    """Log the external API keys that are not set; called when the agent tree is built."""
+    api_keys = {
+        "GOOGLE_MAPS_API_KEY": "Maps and Places",
+        "FOURSQUARE_API_KEY": "Foursquare",
+        "YELP_API_KEY": "Yelp",
+        "BESTTIME_API_KEY": "BestTime",
+    }
+    for name, features in api_keys.items():
+        if not globals()[name]:
+            logger.warning(f"⚠️ {name} is not set. {features} features might fail.")
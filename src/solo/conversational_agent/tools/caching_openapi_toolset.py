@@ -0,0 +1,193 @@
+# tools/caching_openapi_toolset.py
+"""
+OpenAPIToolset whose generated RestApiTools answer from a response cache.
+
+Caching is declared in the spec, next to each operation:
+
+    "post": {
+        "operationId": "createFootTrafficForecast",
+        "x-cache-ttl": 259200,              # seconds; operations without it are never cached
+        "x-cache-coordinate-decimals": 4,   # optional, default COORDINATE_DECIMALS
+        ...
+    }
+
+Requests are canonicalized before lookup (sorted parameters, lowercased
+parameter names and free-text values, rounded coordinates), so near-identical
+calls from the LLM share one entry. Entries live in a TieredTTLCache per
+operation, i.e. an LRU in front of the shared SQLite file when CACHE_DB_PATH
+is set.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import BaseTool, ToolContext
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import RestApiTool
+from google.genai import types
+
+from conversational_agent.config.settings import CACHE_DB_PATH
+from conversational_agent.tools.pooled_openapi_toolset import PooledOpenAPIToolset
+from conversational_agent.tools.ttl_cache import TieredTTLCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_EXTENSION = "x-cache-ttl"
+COORDINATE_DECIMALS_EXTENSION = "x-cache-coordinate-decimals"
+COORDINATE_DECIMALS = 4  # ~11 m
+DEFAULT_MAX_ENTRIES = 512
+_HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def spec_cache_policies(spec: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """{operationId: {"ttl_s", "coordinate_decimals"}} for every operation declaring x-cache-ttl."""
+    policies = {}
+    for path_item in (spec.get("paths") or {}).values():
+        for method in _HTTP_METHODS:
+            operation = (path_item or {}).get(method) or {}
+            ttl_s = operation.get(CACHE_TTL_EXTENSION)
+            if operation.get("operationId") and ttl_s:
+                policies[operation["operationId"]] = {
+                    "ttl_s": float(ttl_s),
+                    "coordinate_decimals": int(operation.get(COORDINATE_DECIMALS_EXTENSION, COORDINATE_DECIMALS)),
+                }
+    return policies
+
+
+def _is_identifier(name: str) -> bool:
+    return name == "id" or name.endswith("_id")
+
+
+def canonicalize_value(name: str, value: Any, coordinate_decimals: int = COORDINATE_DECIMALS) -> Any:
+    """Normalize one argument; identifiers keep their case, free text does not."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return round(value, coordinate_decimals)
+    if isinstance(value, str):
+        value = _WHITESPACE_RE.sub(" ", value.strip())
+        return value if _is_identifier(name) else value.lower()
+    if isinstance(value, dict):
+        return {k.lower(): canonicalize_value(k.lower(), v, coordinate_decimals) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize_value(name, v, coordinate_decimals) for v in value]
+    return value
+
+
+def canonical_request_key(args: Dict[str, Any], coordinate_decimals: int = COORDINATE_DECIMALS) -> str:
+    """Canonical JSON of a call's arguments; empty arguments are dropped."""
+    canonical = {
+        name.lower(): canonicalize_value(name.lower(), value, coordinate_decimals)
+        for name, value in (args or {}).items()
+        if value not in (None, "", [], {})
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def is_cacheable_response(response: Any) -> bool:
+    """Only successful JSON objects are cached (RestApiTool reports failures as {"error": ...})."""
+    if not isinstance(response, dict) or not response or "error" in response or "pending" in response:
+        return False
+    return str(response.get("status", "OK")).upper() == "OK"
+
+
+class CachedOperation:
+    """Response cache for one API operation, following its spec's cache policy."""
+
+    def __init__(self, namespace: str, ttl_s: float, coordinate_decimals: int = COORDINATE_DECIMALS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, db_path: Optional[str] = CACHE_DB_PATH):
+        self.cache = TieredTTLCache(namespace, max_entries, db_path)
+        self.ttl_s = ttl_s
+        self.coordinate_decimals = coordinate_decimals
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any], operation_id: str, namespace: str, **kwargs) -> Optional["CachedOperation"]:
+        """The cache for `operation_id`, or None if the spec does not declare x-cache-ttl for it."""
+        policy = spec_cache_policies(spec).get(operation_id)
+        if policy is None:
+            return None
+        return cls(namespace, policy["ttl_s"], policy["coordinate_decimals"], **kwargs)
+
+    def key(self, args: Dict[str, Any]) -> str:
+        return canonical_request_key(args, self.coordinate_decimals)
+
+    def get(self, args: Dict[str, Any]) -> Optional[Any]:
+        return self.cache.get(self.key(args))
+
+    async def aget(self, args: Dict[str, Any]) -> Optional[Any]:
+        return await self.cache.aget(self.key(args))
+
+    def set(self, args: Dict[str, Any], response: Any) -> None:
+        """Store a response if it is cacheable."""
+        if is_cacheable_response(response):
+            self.cache.set(self.key(args), response, self.ttl_s)
+
+
+class CachingRestApiTool(BaseTool):
+    """Wraps a RestApiTool, answering repeated calls from its CachedOperation."""
+
+    def __init__(self, tool: RestApiTool, cached_operation: CachedOperation):
+        super().__init__(name=tool.name, description=tool.description)
+        self.tool = tool
+        self.cached_operation = cached_operation
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        cached = await self.cached_operation.aget(args)
+        if cached is not None:
+            logger.info(f"✅ {self.name} cache hit")
+            return cached
+
+        # RestApiTool adds auth parameters to the args it is given; keep them out of ours
+        response = await self.tool.run_async(args=dict(args), tool_context=tool_context)
+        self.cached_operation.set(args, response)
+        return response
+
+
+class CachingOpenAPIToolset(PooledOpenAPIToolset):
+    """
+    OpenAPIToolset that caches the operations whose spec declares x-cache-ttl.
+
+    Cache misses go out through the shared pooled HTTP client (see
+    PooledOpenAPIToolset). Takes the same arguments as OpenAPIToolset plus
+    `namespace`, which keeps the cache entries of different APIs apart in the
+    shared SQLite file.
+    """
+
+    def __init__(
+        self,
+        *,
+        spec_dict: Dict[str, Any],
+        namespace: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        db_path: Optional[str] = CACHE_DB_PATH,
+        **kwargs,
+    ):
+        super().__init__(spec_dict=spec_dict, **kwargs)
+        self._caching_tools: Dict[str, BaseTool] = {}
+        for tool in self._tools:
+            cached_operation = CachedOperation.from_spec(
+                spec_dict, tool.operation.operationId, f"{namespace}:{tool.name}",
+                max_entries=max_entries, db_path=db_path,
+            )
+            self._caching_tools[tool.name] = CachingRestApiTool(tool, cached_operation) if cached_operation else tool
+        logger.info(f"✅ {namespace}: caching {sorted(n for n, t in self._caching_tools.items() if isinstance(t, CachingRestApiTool))}")
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        return [tool for tool in self._caching_tools.values() if self._is_tool_selected(tool, readonly_context)]
+
+    def get_tool(self, tool_name: str) -> Optional[BaseTool]:
+        return self._caching_tools.get(tool_name)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per cached operation."""
+        return {
+            name: tool.cached_operation.cache.stats()
+            for name, tool in self._caching_tools.items()
+            if isinstance(tool, CachingRestApiTool)
+        }
@@ -0,0 +1,166 @@
+# tools/enrichment_utils.py
+"""
+Shared helpers for the code-level enrichment stages.
+
+Covers reading LLM-written JSON out of session state and the fuzzy
+name/address/coordinate matching that the enrichment prompts used to
+describe in prose.
+"""
+
+import json
+import math
+import re
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+# ===================================================================
+# SESSION STATE PARSING
+# ===================================================================
+
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+def load_state_json(value: Any) -> Any:
+    """
+    Parse a JSON value written to session state by an agent.
+
+    LLM agents store their output as a string, sometimes wrapped in ```json
+    fences or followed by stray text, so fall back to the first JSON array or
+    object found in the string.
+
+    Returns:
+        The parsed value, or None if nothing parseable was found.
+    """
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    text = _CODE_FENCE_RE.sub("", str(value).strip())
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    decoder = json.JSONDecoder()
+    for i, char in enumerate(text):
+        if char in "[{":
+            try:
+                return decoder.raw_decode(text[i:])[0]
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def get_search_results(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the LocationSearchAgent's restaurant list from session state."""
+    results = load_state_json(state.get("search_results"))
+    if isinstance(results, dict):
+        # Tolerate {"search_results": [...]} / {"places": [...]} wrappers
+        results = next((v for v in results.values() if isinstance(v, list)), [])
+    if not isinstance(results, list):
+        return []
+    return [place for place in results if isinstance(place, dict) and place.get("name")]
+
+
+def dump_state_json(value: Any) -> str:
+    """Serialize a value as compact JSON, matching the prompts' no-whitespace rule."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+# ===================================================================
+# NAME AND ADDRESS MATCHING
+# ===================================================================
+
+_NAME_NOISE_WORDS = {
+    "the", "restaurant", "restaurants", "cafe", "café", "bar", "grill", "kitchen",
+    "and", "&", "co", "inc", "llc",
+}
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "boulevard": "blvd", "road": "rd", "drive": "dr",
+    "lane": "ln", "place": "pl", "court": "ct", "suite": "ste", "highway": "hwy",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase a business name and drop punctuation and generic words."""
+    if not name:
+        return ""
+    tokens = _TOKEN_RE.findall(name.lower().replace("'", ""))
+    meaningful = [t for t in tokens if t not in _NAME_NOISE_WORDS]
+    return " ".join(meaningful or tokens)
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Similarity of two business names in [0, 1]."""
+    norm_a, norm_b = normalize_name(a), normalize_name(b)
+    if not norm_a or not norm_b:
+        return 0.0
+    if norm_a == norm_b:
+        return 1.0
+    if norm_a in norm_b or norm_b in norm_a:
+        return 0.9
+    tokens_a, tokens_b = set(norm_a.split()), set(norm_b.split())
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    return max(jaccard, SequenceMatcher(None, norm_a, norm_b).ratio())
+
+
+def names_match(a: Optional[str], b: Optional[str], threshold: float = 0.8) -> bool:
+    """Whether two business names refer to the same restaurant."""
+    return name_similarity(a, b) >= threshold
+
+
+def _address_tokens(address: Optional[str]) -> List[str]:
+    if not address:
+        return []
+    tokens = _TOKEN_RE.findall(address.lower())
+    return [_ADDRESS_ABBREVIATIONS.get(t, t) for t in tokens]
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """Lowercase an address and abbreviate common street words."""
+    return " ".join(_address_tokens(address))
+
+
+def addresses_match(a: Optional[str], b: Optional[str], threshold: float = 0.5) -> bool:
+    """
+    Whether two addresses describe the same place.
+
+    Street numbers must agree when both sides have one; otherwise enough of the
+    shorter address's tokens must appear in the longer one.
+    """
+    tokens_a, tokens_b = _address_tokens(a), _address_tokens(b)
+    if not tokens_a or not tokens_b:
+        return False
+    if tokens_a[0].isdigit() and tokens_b[0].isdigit() and tokens_a[0] != tokens_b[0]:
+        return False
+    shorter, longer = sorted((set(tokens_a), set(tokens_b)), key=len)
+    return len(shorter & longer) / len(shorter) >= threshold
+
+
+# ===================================================================
+# COORDINATES
+# ===================================================================
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def place_coordinates(place: Dict[str, Any]) -> Optional[tuple]:
+    """Extract (lat, lon) from a search result, accepting the common field layouts."""
+    lat, lon = place.get("latitude"), place.get("longitude")
+    if lat is None or lon is None:
+        location = (place.get("geometry") or {}).get("location") or place.get("coordinates") or {}
+        lat = location.get("lat", location.get("latitude"))
+        lon = location.get("lng", location.get("longitude"))
+    try:
+        return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,409 @@
+# tools/firestore_session_service.py
+"""
+Session store on Firestore, for instances without a persistent disk.
+
+Cloud Run instances come and go with scaling, and a local sessions.db goes
+with them. FirestoreSessionService keeps sessions in Firestore instead:
+
+    <root>/{app_name}                                  app state (app: keys)
+    <root>/{app_name}/users/{user_id}                  user state (user: keys)
+    <root>/{app_name}/users/{user_id}/sessions/{id}    session state, update_time
+    .../sessions/{id}/events/{event_id}                one event, timestamp
+
+One agent turn appends several events (the user's message, tool calls, tool
+responses carrying the sub-agents' state deltas, the answer). Instead of a
+write per event, append_event applies the event to the in-memory session and
+buffers it; the turn's events and merged state deltas go out in one batched
+commit when the turn's final response is appended, or
+FIRESTORE_SESSION_FLUSH_DELAY_S after the first buffered event (late
+results, failed turns), or once FIRESTORE_SESSION_MAX_BATCH_EVENTS are
+buffered. Reading, listing or deleting a session commits its buffer first.
+A failed commit stays buffered and is retried after the same delay; after
+FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS failures its writes are dropped with an
+error logged, so a session whose commits can never succeed does not grow its
+buffer forever.
+State is merged key by key, so a commit only writes the keys that changed.
+When a turn starts a new search, the events compacted by
+tools/event_compaction.py are rewritten in the same commit.
+
+get_session reads the session, user and app documents in one batched read
+with a field mask on `state` and `update_time`, alongside the events query;
+list_sessions only reads `update_time`.
+
+State values and events are stored as JSON strings: Firestore rejects some
+values JSON allows (arrays of arrays), and events come back exactly as
+written.
+
+With SESSION_TTL_S set, session and event documents carry an `expire_at`
+timestamp. A TTL policy on `expire_at` for the `sessions` and `events`
+collection groups lets Firestore delete idle sessions:
+
+    gcloud firestore fields ttls update expire_at --collection-group=sessions --enable-ttl
+    gcloud firestore fields ttls update expire_at --collection-group=events --enable-ttl
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+from conversational_agent.config.settings import (
+    FIRESTORE_DATABASE,
+    FIRESTORE_PROJECT,
+    FIRESTORE_SESSION_FLUSH_DELAY_S,
+    FIRESTORE_SESSION_MAX_BATCH_EVENTS,
+    FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS,
+    SESSION_TTL_S,
+)
+from conversational_agent.tools.event_compaction import compact_session_events, starts_search_cycle
+
+logger = logging.getLogger(__name__)
+
+# Firestore commits at most 500 writes; larger commits and deletes go out in batches of this size
+_MAX_BATCH_WRITES = 400
+_STATE_FIELDS = ["state", "update_time"]
+
+SessionKey = Tuple[str, str, str]
+
+
+def _split_state(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """(app, user, session) state from a state dict or delta; app:/user: prefixes stripped, temp: keys dropped."""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+def _encode_state(state: Dict[str, Any]) -> Dict[str, str]:
+    return {key: json.dumps(value, separators=(",", ":"), default=str) for key, value in state.items()}
+
+
+def _decode_state(fields: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: json.loads(value) for key, value in (fields or {}).get("state", {}).items()}
+
+
+class _PendingWrites:
+    """A session's events and state changes not committed yet."""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self.app_state: Dict[str, Any] = {}
+        self.user_state: Dict[str, Any] = {}
+        self.session_state: Dict[str, Any] = {}
+        self.update_time = 0.0
+        self.failed_commits = 0
+        self.flush_task: Optional[asyncio.Task] = None
+
+    def add(self, event: Event) -> None:
+        self.events.append(event)
+        self.update_time = max(self.update_time, event.timestamp)
+        if event.actions and event.actions.state_delta:
+            app_state, user_state, session_state = _split_state(event.actions.state_delta)
+            self.app_state.update(app_state)
+            self.user_state.update(user_state)
+            self.session_state.update(session_state)
+
+    def merge_newer(self, newer: "_PendingWrites") -> None:
+        """Put `newer` (buffered while this one was being committed) after this one."""
+        self.events.extend(newer.events)
+        self.app_state.update(newer.app_state)
+        self.user_state.update(newer.user_state)
+        self.session_state.update(newer.session_state)
+        self.update_time = max(self.update_time, newer.update_time)
+        if newer.flush_task:
+            newer.flush_task.cancel()
+
+
+class _CommitLock:
+    """Serializes a session's commits; dropped once no flush holds or awaits it and nothing is buffered."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class FirestoreSessionService(BaseSessionService):
+    """BaseSessionService on Firestore with one batched commit per agent turn (see module docstring)."""
+
+    def __init__(
+        self,
+        root_collection: str = "adk_sessions",
+        client: Optional[firestore.AsyncClient] = None,
+        flush_delay_s: float = FIRESTORE_SESSION_FLUSH_DELAY_S,
+        max_batch_events: int = FIRESTORE_SESSION_MAX_BATCH_EVENTS,
+        max_commit_attempts: int = FIRESTORE_SESSION_MAX_COMMIT_ATTEMPTS,
+        ttl_s: float = SESSION_TTL_S,
+    ):
+        self.root_collection = root_collection
+        self._client = client
+        self._flush_delay_s = flush_delay_s
+        self._max_batch_events = max(1, max_batch_events)
+        self._max_commit_attempts = max(1, max_commit_attempts)
+        self._ttl_s = ttl_s
+        self._pending: Dict[SessionKey, _PendingWrites] = {}
+        self._commit_locks: Dict[SessionKey, _CommitLock] = {}
+
+    @property
+    def client(self) -> firestore.AsyncClient:
+        # Created on first use, inside the server's event loop
+        if self._client is None:
+            self._client = firestore.AsyncClient(project=FIRESTORE_PROJECT, database=FIRESTORE_DATABASE)
+            logger.info(f"✅ Firestore session store: {FIRESTORE_PROJECT}/{FIRESTORE_DATABASE}/{self.root_collection}")
+        return self._client
+
+    # ===================================================================
+    # DOCUMENT LAYOUT
+    # ===================================================================
+
+    def _app_ref(self, app_name: str):
+        return self.client.collection(self.root_collection).document(app_name)
+
+    def _user_ref(self, app_name: str, user_id: str):
+        return self._app_ref(app_name).collection("users").document(user_id)
+
+    def _session_ref(self, app_name: str, user_id: str, session_id: str):
+        return self._user_ref(app_name, user_id).collection("sessions").document(session_id)
+
+    def _expiry(self, now: float) -> Dict[str, Any]:
+        if self._ttl_s <= 0:
+            return {}
+        return {"expire_at": datetime.fromtimestamp(now + self._ttl_s, tz=timezone.utc)}
+
+    # ===================================================================
+    # WRITE COALESCING
+    # ===================================================================
+
+    async def _commit(self, key: SessionKey, pending: _PendingWrites) -> None:
+        app_name, user_id, session_id = key
+        session_ref = self._session_ref(app_name, user_id, session_id)
+        expiry = self._expiry(time.time())
+        writes = [
+            (session_ref.collection("events").document(event.id), {
+                "timestamp": event.timestamp,
+                "event": event.model_dump_json(exclude_none=True),
+                **expiry,
+            }, False)
+            for event in pending.events
+        ]
+        session_fields = {"update_time": pending.update_time, **expiry}
+        if pending.session_state:
+            session_fields["state"] = _encode_state(pending.session_state)
+        writes.append((session_ref, session_fields, True))
+        if pending.user_state:
+            writes.append((self._user_ref(app_name, user_id), {"state": _encode_state(pending.user_state)}, True))
+        if pending.app_state:
+            writes.append((self._app_ref(app_name), {"state": _encode_state(pending.app_state)}, True))
+
+        # One commit per turn; only a turn that also rewrites many compacted events needs more
+        for start in range(0, len(writes), _MAX_BATCH_WRITES):
+            batch = self.client.batch()
+            for ref, fields, merge in writes[start:start + _MAX_BATCH_WRITES]:
+                batch.set(ref, fields, merge=merge)
+            await batch.commit()
+
+    async def _flush(self, key: SessionKey) -> None:
+        """Commit the session's buffered writes, if any. A failed commit stays buffered for a retry."""
+        commit_lock = self._commit_locks.setdefault(key, _CommitLock())
+        commit_lock.users += 1
+        try:
+            async with commit_lock.lock:
+                await self._commit_pending(key)
+        finally:
+            commit_lock.users -= 1
+            if not commit_lock.users and key not in self._pending and self._commit_locks.get(key) is commit_lock:
+                del self._commit_locks[key]
+
+    async def _commit_pending(self, key: SessionKey) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending.flush_task and pending.flush_task is not asyncio.current_task():
+            pending.flush_task.cancel()
+        pending.flush_task = None
+        try:
+            await self._commit(key, pending)
+        except Exception as e:
+            pending.failed_commits += 1
+            if pending.failed_commits >= self._max_commit_attempts:
+                logger.error(
+                    f"❌ Dropping {len(pending.events)} events of session {key[2]} "
+                    f"after {pending.failed_commits} failed commits: {e}"
+                )
+                return
+            logger.warning(f"⚠️ Committing {len(pending.events)} events of session {key[2]} failed: {e}")
+            newer = self._pending.get(key)
+            if newer:
+                pending.merge_newer(newer)
+            self._pending[key] = pending
+            pending.flush_task = asyncio.create_task(self._flush_later(key))
+
+    async def _flush_later(self, key: SessionKey) -> None:
+        await asyncio.sleep(self._flush_delay_s)
+        await self._flush(key)
+
+    async def flush_all(self) -> None:
+        """Commit every buffered write; called on shutdown."""
+        await asyncio.gather(*(self._flush(key) for key in list(self._pending)))
+
+    async def close(self) -> None:
+        await self.flush_all()
+        if self._client is not None:
+            self._client.close()
+
+    # ===================================================================
+    # BaseSessionService
+    # ===================================================================
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_state, user_state, session_state = _split_state(state or {})
+        now = time.time()
+
+        # create() fails the whole batch if the session exists, rather than overwriting it
+        batch = self.client.batch()
+        batch.create(self._session_ref(app_name, user_id, session_id), {
+            "state": _encode_state(session_state),
+            "create_time": now,
+            "update_time": now,
+            **self._expiry(now),
+        })
+        if user_state:
+            batch.set(self._user_ref(app_name, user_id), {"state": _encode_state(user_state)}, merge=True)
+        if app_state:
+            batch.set(self._app_ref(app_name), {"state": _encode_state(app_state)}, merge=True)
+        try:
+            await batch.commit()
+        except AlreadyExists as e:
+            raise ValueError(f"Session {session_id} already exists for {app_name}/{user_id}") from e
+
+        # The returned state includes the app and user state already stored
+        return await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self._flush((app_name, user_id, session_id))
+        app_ref = self._app_ref(app_name)
+        user_ref = self._user_ref(app_name, user_id)
+        session_ref = self._session_ref(app_name, user_id, session_id)
+
+        query = session_ref.collection("events").select(["event"])
+        if config and config.after_timestamp:
+            query = query.where(filter=FieldFilter("timestamp", ">=", config.after_timestamp))
+        if config and config.num_recent_events:
+            query = query.order_by("timestamp", direction=firestore.Query.DESCENDING).limit(config.num_recent_events)
+        else:
+            query = query.order_by("timestamp")
+
+        async def _read_documents() -> Dict[str, Any]:
+            return {
+                snapshot.reference.path: snapshot
+                async for snapshot in self.client.get_all([app_ref, user_ref, session_ref], field_paths=_STATE_FIELDS)
+            }
+
+        documents, event_snapshots = await asyncio.gather(_read_documents(), query.get())
+        session_snapshot = documents.get(session_ref.path)
+        if session_snapshot is None or not session_snapshot.exists:
+            return None
+
+        events = [Event.model_validate_json(snapshot.get("event")) for snapshot in event_snapshots]
+        if config and config.num_recent_events:
+            events.reverse()
+
+        session_fields = session_snapshot.to_dict()
+        state = _decode_state(session_fields)
+        for prefix, ref in ((State.APP_PREFIX, app_ref), (State.USER_PREFIX, user_ref)):
+            snapshot = documents.get(ref.path)
+            if snapshot is not None and snapshot.exists:
+                state.update({prefix + key: value for key, value in _decode_state(snapshot.to_dict()).items()})
+
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            events=events,
+            last_update_time=session_fields.get("update_time", 0.0),
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        await asyncio.gather(*(self._flush(key) for key in list(self._pending) if key[:2] == (app_name, user_id)))
+        query = self._user_ref(app_name, user_id).collection("sessions").select(["update_time"])
+        sessions = [
+            Session(
+                id=snapshot.id,
+                app_name=app_name,
+                user_id=user_id,
+                state={},
+                last_update_time=snapshot.get("update_time") or 0.0,
+            )
+            async for snapshot in query.stream()
+        ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._commit_locks.pop(key, None)
+        pending = self._pending.pop(key, None)
+        if pending and pending.flush_task:
+            pending.flush_task.cancel()
+
+        session_ref = self._session_ref(app_name, user_id, session_id)
+        events = session_ref.collection("events").select([]).limit(_MAX_BATCH_WRITES)
+        while True:
+            snapshots = await events.get()
+            if not snapshots:
+                break
+            batch = self.client.batch()
+            for snapshot in snapshots:
+                batch.delete(snapshot.reference)
+            await batch.commit()
+        await session_ref.delete()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        pending = self._pending.setdefault(key, _PendingWrites())
+        pending.add(event)
+        if starts_search_cycle(event):
+            # Rewritten with the turn's commit; a later write of the same event replaces an earlier one
+            pending.events.extend(compact_session_events(session))
+
+        # The user's message opens the turn; an agent's final response closes it
+        turn_complete = event.author != "user" and event.is_final_response()
+        if turn_complete or len(pending.events) >= self._max_batch_events:
+            await self._flush(key)
+        elif pending.flush_task is None:
+            pending.flush_task = asyncio.create_task(self._flush_later(key))
+        return event
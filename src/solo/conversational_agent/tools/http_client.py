@@ -0,0 +1,205 @@
+# tools/http_client.py
+"""
+Process-wide pooled async HTTP client for outbound enrichment API calls.
+
+Every caller shares one httpx.AsyncClient so connections (and their TLS
+sessions) to Yelp, Foursquare and BestTime are kept alive and reused across
+agents and invocations. On top of httpx's pool the client:
+
+- speaks HTTP/2 when the `h2` package is installed, so concurrent requests to
+  one API are multiplexed over a single connection;
+- caps in-flight requests per host (HTTP_MAX_CONNECTIONS_PER_HOST), so one
+  slow API cannot take every connection in the pool;
+- caches DNS lookups for HTTP_DNS_CACHE_TTL_S instead of resolving the host
+  again for every new connection.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from conversational_agent.config.settings import (
+    HTTP2_ENABLED,
+    HTTP_DNS_CACHE_TTL_S,
+    HTTP_KEEPALIVE_EXPIRY_S,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_TIMEOUT_S,
+)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+# ===================================================================
+# DNS CACHE
+# ===================================================================
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that resolves each host once per `ttl_s`.
+
+    Connections are opened to the cached IP addresses; TLS still uses the
+    original host name for SNI and certificate checks. A host whose cached
+    addresses all fail to connect is resolved again on the next attempt.
+    """
+
+    def __init__(self, ttl_s: float = HTTP_DNS_CACHE_TTL_S):
+        self.ttl_s = ttl_s
+        self._backend = httpcore.AnyIOBackend()
+        self._addresses: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        cached = self._addresses.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {e}") from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._addresses[(host, port)] = (time.monotonic() + self.ttl_s, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        last_error = None
+        for address in await self._resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        self._addresses.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# ===================================================================
+# PER-HOST LIMITS
+# ===================================================================
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once the body is read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slot: asyncio.Semaphore):
+        self._stream = stream
+        self._slot = slot
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._slot.release()
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport with a DNS cache and a cap on concurrent requests per host."""
+
+    def __init__(self, *, limits: httpx.Limits, http2: bool, max_per_host: int, dns_ttl_s: float):
+        super().__init__(limits=limits, http2=http2)
+        # httpx does not expose the network backend, so rebuild the pool with ours
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=CachingDNSBackend(dns_ttl_s),
+        )
+        self.max_per_host = max_per_host
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._host_slots.get(request.url.host)
+        if slot is None:
+            slot = self._host_slots[request.url.host] = asyncio.Semaphore(self.max_per_host)
+        await slot.acquire()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slot)
+        return response
+
+
+# ===================================================================
+# SHARED CLIENT
+# ===================================================================
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = HTTP2_ENABLED and _HTTP2_AVAILABLE
+    if HTTP2_ENABLED and not _HTTP2_AVAILABLE:
+        logger.warning("⚠️ HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1")
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(HTTP_TIMEOUT_S),
+        transport=PooledTransport(
+            limits=limits,
+            http2=http2,
+            max_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            dns_ttl_s=HTTP_DNS_CACHE_TTL_S,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient, creating it on first use.
+
+    The client's connection pool is bound to the running event loop, so a new
+    client is built if called from a different loop (e.g. scripts that call
+    asyncio.run more than once).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client. Call on app shutdown."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -0,0 +1,115 @@
+# tools/maps_mcp_cache.py
+"""
+Response cache for the Google Maps MCP tools.
+
+Place details and reviews for a restaurant barely change within a few hours,
+yet GoogleReviewsAgent re-fetched them for every party. PooledMapsMCPTool
+consults this cache before leasing an MCP session: entries are keyed by tool
+name plus normalized arguments, kept in a TieredTTLCache per tool (LRU in
+front of the shared SQLite file) with per-tool TTLs, and `open_now` is only
+trusted for MAPS_OPEN_NOW_TTL_S even when the rest of an entry is older.
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+from mcp.types import CallToolResult
+
+from conversational_agent.config.settings import (
+    CACHE_DB_PATH,
+    MAPS_CACHE_MAX_ENTRIES,
+    MAPS_DETAILS_CACHE_TTL_S,
+    MAPS_OPEN_NOW_TTL_S,
+    MAPS_SEARCH_CACHE_TTL_S,
+)
+from conversational_agent.tools.ttl_cache import TieredTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds each Maps MCP tool's responses stay valid; tools not listed are never cached
+MAPS_TOOL_TTLS_S = {
+    "maps_place_details": MAPS_DETAILS_CACHE_TTL_S,
+    "maps_search_places": MAPS_SEARCH_CACHE_TTL_S,
+    "maps_geocode": 30 * 24 * 3600,
+    "maps_reverse_geocode": 30 * 24 * 3600,
+    "maps_elevation": 30 * 24 * 3600,
+    # Travel times depend on traffic
+    "maps_distance_matrix": 15 * 60,
+    "maps_directions": 15 * 60,
+}
+# Free-text arguments compared case-insensitively (ids such as place_id are case-sensitive)
+_CASE_INSENSITIVE_ARGS = {"query", "address", "origin", "origins", "destination", "destinations", "mode"}
+COORDINATE_DECIMALS = 5  # ~1 m
+
+_OPEN_NOW_RE = re.compile(r'"open_now"\s*:\s*(true|false)')
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_caches: Dict[str, TieredTTLCache] = {}
+
+
+def _cache_for(tool_name: str) -> TieredTTLCache:
+    cache = _caches.get(tool_name)
+    if cache is None:
+        cache = _caches[tool_name] = TieredTTLCache(f"maps_mcp:{tool_name}", MAPS_CACHE_MAX_ENTRIES, CACHE_DB_PATH)
+    return cache
+
+
+def _normalize_arg(name: str, value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, COORDINATE_DECIMALS)
+    if isinstance(value, str):
+        value = _WHITESPACE_RE.sub(" ", value.strip())
+        return value.lower() if name in _CASE_INSENSITIVE_ARGS else value
+    if isinstance(value, dict):
+        return {k: _normalize_arg(k, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize_arg(name, v) for v in value]
+    return value
+
+
+def maps_cache_key(args: Dict[str, Any]) -> str:
+    """Canonical JSON of the tool arguments, so trivially different calls share an entry."""
+    normalized = {name: _normalize_arg(name, value) for name, value in (args or {}).items() if value is not None}
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _strip_stale_open_now(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a cached result with open_now nulled out, once it is older than MAPS_OPEN_NOW_TTL_S."""
+    content = [
+        {**item, "text": _OPEN_NOW_RE.sub('"open_now": null', item["text"])}
+        if item.get("type") == "text" and item.get("text") else item
+        for item in payload.get("content") or []
+    ]
+    return {**payload, "content": content}
+
+
+async def get_cached_result(tool_name: str, args: Dict[str, Any]) -> Optional[CallToolResult]:
+    """Return a cached CallToolResult for this call, or None on a miss or uncached tool."""
+    if tool_name not in MAPS_TOOL_TTLS_S:
+        return None
+    entry = await _cache_for(tool_name).aget(maps_cache_key(args))
+    if entry is None:
+        return None
+
+    payload = entry["result"]
+    if time.time() - entry["fetched_at"] > MAPS_OPEN_NOW_TTL_S:
+        payload = _strip_stale_open_now(payload)
+    logger.info(f"✅ Maps MCP cache hit for {tool_name}")
+    return CallToolResult.model_validate(payload)
+
+
+def store_result(tool_name: str, args: Dict[str, Any], result: Any) -> None:
+    """Cache a successful CallToolResult under the tool's TTL."""
+    ttl_s = MAPS_TOOL_TTLS_S.get(tool_name)
+    if not ttl_s or not isinstance(result, CallToolResult) or result.isError:
+        return
+    entry = {"fetched_at": time.time(), "result": result.model_dump(mode="json", exclude_none=True)}
+    _cache_for(tool_name).set(maps_cache_key(args), entry, ttl_s)
+
+
+def maps_cache_stats() -> Dict[str, Any]:
+    """Per-tool hit/miss counters and hit ratios."""
+    return {tool_name: cache.stats() for tool_name, cache in _caches.items()}
@@ -0,0 +1,375 @@
+# tools/maps_mcp_pool.py
+"""
+Shared Google Maps MCP server pool.
+
+LocationSearchAgent and GoogleReviewsAgent used to each build their own
+MCPToolset, which spawned a fresh `npx -y @modelcontextprotocol/server-google-maps`
+process per agent. This module keeps a fixed number of long-lived Maps MCP
+servers per process and leases their sessions to whichever agent needs one.
+"""
+
+import asyncio
+import logging
+import os
+import shlex
+import shutil
+import sys
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+
+from conversational_agent.config.settings import (
+    GOOGLE_MAPS_API_KEY,
+    MAPS_MCP_COMMAND,
+    MAPS_MCP_POOL_SIZE,
+    MAPS_MCP_HEALTH_CHECK_INTERVAL_S,
+    MAPS_MCP_READ_TIMEOUT_S,
+    MAPS_MCP_START_TIMEOUT_S,
+)
+from conversational_agent.tools.maps_mcp_cache import get_cached_result, store_result
+
+logger = logging.getLogger(__name__)
+
+MAPS_MCP_PACKAGE = "@modelcontextprotocol/server-google-maps"
+MAPS_MCP_BINARY = "mcp-server-google-maps"
+
+# Errors of a session whose server is gone; the slot is restarted on its next lease
+_DISCONNECTED_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+def _maps_server_params() -> StdioServerParameters:
+    """
+    Build the stdio parameters for one Maps MCP server.
+
+    The Dockerfile installs the server globally, so prefer the installed binary
+    and only fall back to `npx` (which may resolve the package at runtime).
+    MAPS_MCP_COMMAND overrides both.
+    """
+    env = {"GOOGLE_MAPS_API_KEY": GOOGLE_MAPS_API_KEY}
+    if MAPS_MCP_COMMAND:
+        command, *args = shlex.split(MAPS_MCP_COMMAND)
+        return StdioServerParameters(command=command, args=args, env={**os.environ, **env})
+    binary = shutil.which(MAPS_MCP_BINARY)
+    if binary:
+        return StdioServerParameters(command=binary, args=[], env=env)
+    return StdioServerParameters(command="npx", args=["-y", MAPS_MCP_PACKAGE], env=env)
+
+
+class _PoolSlot:
+    """One Maps MCP server process and its client session."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stop_event: Optional[asyncio.Event] = None
+        self.in_flight = 0
+        self.restarts = 0
+        # Cleared when a ping or a call finds the server gone
+        self.healthy = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self.healthy and self.session is not None and self.task is not None and not self.task.done()
+
+
+class MapsMCPSessionPool:
+    """
+    Process-wide pool of long-lived Google Maps MCP sessions.
+
+    Servers are started once (at app start-up or on first lease), leased to
+    callers by lowest in-flight count, pinged in the background and restarted
+    when they crash or stop answering.
+    """
+
+    def __init__(
+        self,
+        size: int = MAPS_MCP_POOL_SIZE,
+        server_params: Optional[StdioServerParameters] = None,
+        health_check_interval_s: float = MAPS_MCP_HEALTH_CHECK_INTERVAL_S,
+        read_timeout_s: float = MAPS_MCP_READ_TIMEOUT_S,
+        start_timeout_s: float = MAPS_MCP_START_TIMEOUT_S,
+        errlog=sys.stderr,
+    ):
+        self._size = max(1, size)
+        self._server_params = server_params
+        self._health_check_interval_s = health_check_interval_s
+        self._read_timeout_s = read_timeout_s
+        self._start_timeout_s = start_timeout_s
+        self._errlog = errlog
+
+        self._slots: List[_PoolSlot] = [_PoolSlot(i) for i in range(self._size)]
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._tools_cache = None
+        self._closed = False
+
+    # ===================================================================
+    # SLOT LIFECYCLE
+    # ===================================================================
+
+    async def _serve_slot(self, slot: _PoolSlot, params: StdioServerParameters, ready: asyncio.Future) -> None:
+        """
+        Own one server for its whole life.
+
+        The stdio transport is built on anyio task groups, which must be exited
+        by the task that entered them, so each server lives in its own task and
+        is stopped by setting the slot's stop event.
+        """
+        try:
+            async with stdio_client(server=params, errlog=self._errlog) as (read, write):
+                async with ClientSession(
+                    read, write, read_timeout_seconds=timedelta(seconds=self._read_timeout_s)
+                ) as session:
+                    await session.initialize()
+                    slot.session = session
+                    slot.healthy = True
+                    ready.set_result(None)
+                    await slot.stop_event.wait()
+        except BaseException as e:
+            # Resolve `ready` even when cancelled, or _start_slot would wait forever
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else RuntimeError(
+                    f"Maps MCP server {slot.index} stopped before it was ready"
+                ))
+            elif isinstance(e, Exception):
+                logger.warning(f"⚠️ Maps MCP server {slot.index} exited: {e}")
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            slot.session = None
+            slot.healthy = False
+
+    async def _start_slot(self, slot: _PoolSlot) -> None:
+        """Spawn the MCP server for a slot and wait until its session is initialized."""
+        params = self._server_params or _maps_server_params()
+        ready = asyncio.get_running_loop().create_future()
+        slot.stop_event = asyncio.Event()
+        slot.task = asyncio.create_task(self._serve_slot(slot, params, ready))
+        try:
+            await asyncio.wait_for(ready, timeout=self._start_timeout_s)
+        except BaseException as e:
+            if isinstance(e, asyncio.TimeoutError):
+                logger.error(f"❌ Maps MCP server {slot.index} did not start within {self._start_timeout_s:.0f}s")
+            await self._stop_slot(slot)
+            raise
+        logger.info(f"✅ Maps MCP server {slot.index} started ({params.command})")
+
+    async def _stop_slot(self, slot: _PoolSlot) -> None:
+        """Tear down a slot's session and server process."""
+        task, slot.task = slot.task, None
+        if task is None:
+            return
+        slot.stop_event.set()
+        # asyncio.wait never raises the task's own error or cancellation
+        done, _ = await asyncio.wait({task}, timeout=self._read_timeout_s)
+        if not done:
+            logger.warning(f"⚠️ Maps MCP server {slot.index} did not stop in time; cancelling it")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _restart_slot(self, slot: _PoolSlot) -> None:
+        await self._stop_slot(slot)
+        slot.restarts += 1
+        logger.warning(f"⚠️ Restarting Maps MCP server {slot.index} (restart #{slot.restarts})")
+        await self._start_slot(slot)
+
+    async def start(self) -> None:
+        """Start every server in the pool and the background health checker."""
+        async with self._lock:
+            for slot in self._slots:
+                if not slot.is_connected:
+                    await self._start_slot(slot)
+        self._ensure_health_task()
+
+    async def warm_up(self) -> None:
+        """Start the pool without raising; meant to run as a background task."""
+        try:
+            await self.start()
+        except Exception as e:
+            logger.error(f"❌ Maps MCP pool warm-up failed, servers will start on first use: {e}")
+
+    def _ensure_health_task(self) -> None:
+        if self._health_check_interval_s <= 0:
+            return
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    # ===================================================================
+    # LEASING
+    # ===================================================================
+
+    def _pick_slot(self) -> _PoolSlot:
+        """
+        Prefer an idle running server; start (or restart) another one only when
+        every running server is busy, otherwise share the least loaded one.
+        """
+        running = [slot for slot in self._slots if slot.is_connected]
+        idle = [slot for slot in running if not slot.in_flight]
+        if idle:
+            return idle[0]
+        stopped = [slot for slot in self._slots if not slot.is_connected]
+        if stopped:
+            return stopped[0]
+        return min(running, key=lambda slot: slot.in_flight)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[ClientSession]:
+        """
+        Lease the least busy healthy session for the duration of the block.
+
+        Sessions are multiplexed (MCP requests carry ids), so a lease does not
+        grant exclusive use; it only feeds the load balancing.
+        """
+        if self._closed:
+            raise RuntimeError("Maps MCP pool is closed")
+
+        async with self._lock:
+            slot = self._pick_slot()
+            if not slot.is_connected:
+                if slot.task is not None:
+                    await self._restart_slot(slot)
+                else:
+                    await self._start_slot(slot)
+            slot.in_flight += 1
+        self._ensure_health_task()
+
+        try:
+            yield slot.session
+        except _DISCONNECTED_ERRORS:
+            slot.healthy = False
+            raise
+        finally:
+            slot.in_flight -= 1
+
+    async def list_tools(self):
+        """List the Maps MCP tools once; every server exposes the same set."""
+        if self._tools_cache is None:
+            async with self.lease() as session:
+                self._tools_cache = (await session.list_tools()).tools
+        return self._tools_cache
+
+    # ===================================================================
+    # HEALTH CHECKS
+    # ===================================================================
+
+    async def health_check(self) -> Dict[int, bool]:
+        """Ping every idle started server and restart the ones that fail."""
+        results = {}
+        for slot in self._slots:
+            async with self._lock:
+                task = slot.task
+                if task is None or slot.in_flight:
+                    results[slot.index] = task is not None
+                    continue
+                healthy = slot.is_connected
+
+            if healthy:
+                try:
+                    await asyncio.wait_for(slot.session.send_ping(), timeout=self._read_timeout_s)
+                except Exception as e:
+                    logger.warning(f"⚠️ Maps MCP server {slot.index} failed health check: {e}")
+                    slot.healthy = healthy = False
+
+            if not healthy:
+                async with self._lock:
+                    # Skip if a lease already replaced or picked up this server meanwhile
+                    if slot.task is task and not slot.in_flight:
+                        try:
+                            await self._restart_slot(slot)
+                        except Exception as e:
+                            logger.error(f"❌ Could not restart Maps MCP server {slot.index}: {e}")
+            results[slot.index] = healthy
+        return results
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self._health_check_interval_s)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.error(f"❌ Maps MCP health check failed: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        """Per-server connection, load and restart counters."""
+        return {
+            "size": self._size,
+            "servers": [
+                {
+                    "index": slot.index,
+                    "connected": slot.is_connected,
+                    "in_flight": slot.in_flight,
+                    "restarts": slot.restarts,
+                }
+                for slot in self._slots
+            ],
+        }
+
+    async def close(self) -> None:
+        """Stop the health checker and every server. Call on app shutdown."""
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for slot in self._slots:
+            await self._stop_slot(slot)
+
+
+class PooledMapsMCPTool(MCPTool):
+    """
+    MCPTool that runs each call on a session leased from the shared pool.
+
+    Calls are answered from the Maps response cache (tools/maps_mcp_cache.py)
+    when possible, so cache hits never lease a session.
+    """
+
+    def __init__(self, *, mcp_tool, pool: MapsMCPSessionPool):
+        super().__init__(mcp_tool=mcp_tool, mcp_session_manager=None)
+        self._pool = pool
+
+    async def _run_async_impl(self, *, args, tool_context, credential):
+        cached = await get_cached_result(self.name, args)
+        if cached is not None:
+            return cached
+        async with self._pool.lease() as session:
+            result = await session.call_tool(self.name, arguments=args)
+        store_result(self.name, args, result)
+        return result
+
+
+class MapsMCPToolset(BaseToolset):
+    """
+    Drop-in replacement for the per-agent Maps MCPToolset.
+
+    Tools are backed by the process-wide pool, so closing the toolset (the ADK
+    runner does this after each run) leaves the servers running.
+    """
+
+    def __init__(self, pool: Optional[MapsMCPSessionPool] = None, tool_filter=None):
+        super().__init__(tool_filter=tool_filter)
+        self._pool = pool or maps_mcp_pool
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        tools = []
+        for mcp_tool in await self._pool.list_tools():
+            tool = PooledMapsMCPTool(mcp_tool=mcp_tool, pool=self._pool)
+            if self._is_tool_selected(tool, readonly_context):
+                tools.append(tool)
+        return tools
+
+    async def close(self) -> None:
+        # The pool outlives individual runs; it is closed on app shutdown.
+        return None
+
+
+# Process-wide pool shared by every agent that needs Google Maps tools
+maps_mcp_pool = MapsMCPSessionPool()
@@ -0,0 +1,153 @@
+# tools/pooled_openapi_toolset.py
+"""
+OpenAPIToolset whose RestApiTools send requests through the shared HTTP client.
+
+ADK's RestApiTool calls the blocking `requests.request`, which opens a new
+connection (and TLS handshake) per call and blocks the event loop while it
+waits. PooledRestApiTool keeps RestApiTool's auth handling and request
+building but sends the request with the pooled httpx client from
+tools/http_client.py, and returns the same response shapes.
+
+A toolset can be given its provider's ProviderLimiter (tools/rate_limiter.py);
+a call that gets no slot is not sent, and the tool returns a `quota_exhausted`
+error telling the agent not to retry.
+
+Given `compiled_path`, a toolset builds its tools from the precompiled
+artifact (tools/openapi_artifacts.py) instead of parsing the spec, and its
+tools serve the artifact's function declarations.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+from google.adk.tools import ToolContext
+from google.adk.tools._gemini_schema_util import _to_snake_case
+from google.adk.tools.openapi_tool.openapi_spec_parser.openapi_spec_parser import OpenApiSpecParser, ParsedOperation
+from google.adk.tools.openapi_tool.openapi_spec_parser.openapi_toolset import OpenAPIToolset
+from google.adk.tools.openapi_tool.openapi_spec_parser.operation_parser import OperationParser
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import RestApiTool
+from google.adk.tools.openapi_tool.openapi_spec_parser.tool_auth_handler import ToolAuthHandler
+from google.genai import types
+
+from conversational_agent.tools.http_client import get_http_client
+from conversational_agent.tools.openapi_artifacts import load_compiled_spec
+from conversational_agent.tools.rate_limiter import ProviderLimiter, QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+
+def quota_exhausted_response(error: QuotaExceededError) -> Dict[str, Any]:
+    """Tool response for a call skipped by the rate limiter; never cached (status is not OK)."""
+    return {
+        "status": "Error",
+        "quota_exhausted": True,
+        "message": f"{error}. Do not retry this call; report its data fields as null.",
+    }
+
+
+def to_httpx_request(request_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate RestApiTool's `requests.request` kwargs into `httpx.AsyncClient.request` kwargs."""
+    params = dict(request_params)
+    headers = dict(params.pop("headers", None) or {})
+    cookies = params.pop("cookies", None)
+    if cookies:
+        # httpx deprecates per-request cookies; send them as a header instead
+        headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+    if "data" in params and not isinstance(params["data"], dict):
+        params["content"] = params.pop("data")
+    params["headers"] = headers
+    return params
+
+
+class PooledRestApiTool(RestApiTool):
+    """RestApiTool that sends its request through the shared pooled HTTP client."""
+
+    rate_limiter: Optional[ProviderLimiter] = None
+    declaration: Optional[types.FunctionDeclaration] = None
+
+    @classmethod
+    def from_parsed_operation(cls, parsed: ParsedOperation) -> "PooledRestApiTool":
+        # Same as RestApiTool's, without parsing the operation a second time in __init__
+        operation_parser = OperationParser.load(parsed.operation, parsed.parameters, parsed.return_value)
+        tool = cls(
+            name=_to_snake_case(operation_parser.get_function_name()),
+            description=parsed.operation.description or parsed.operation.summary or "",
+            endpoint=parsed.endpoint,
+            operation=parsed.operation,
+            auth_scheme=parsed.auth_scheme,
+            auth_credential=parsed.auth_credential,
+            should_parse_operation=False,
+        )
+        tool._operation_parser = operation_parser
+        return tool
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        return self.declaration or super()._get_declaration()
+
+    async def call(self, *, args: Dict[str, Any], tool_context: Optional[ToolContext]) -> Dict[str, Any]:
+        tool_auth_handler = ToolAuthHandler.from_tool_context(tool_context, self.auth_scheme, self.auth_credential)
+        auth_result = await tool_auth_handler.prepare_auth_credentials()
+        if auth_result.state == "pending":
+            return {"pending": True, "message": "Needs your authorization to access your data."}
+
+        api_params, api_args = self._operation_parser.get_parameters().copy(), args
+        if auth_result.auth_credential:
+            auth_param, auth_args = self._prepare_auth_request_params(auth_result.auth_scheme, auth_result.auth_credential)
+            if auth_param and auth_args:
+                api_params = [auth_param] + api_params
+                api_args.update(auth_args)
+
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.acquire()
+            except QuotaExceededError as e:
+                return quota_exhausted_response(e)
+
+        request_params = self._prepare_request_params(api_params, api_args)
+        response = await get_http_client().request(**to_httpx_request(request_params))
+
+        try:
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError:
+            return {
+                "error": (
+                    f"Tool {self.name} execution failed. Analyze this execution error and your inputs. "
+                    "Retry with adjustments if applicable. But make sure don't retry more than 3 times. "
+                    f"Execution Error: {response.text}"
+                )
+            }
+        except ValueError:
+            return {"text": response.text}
+
+
+class PooledOpenAPIToolset(OpenAPIToolset):
+    """
+    OpenAPIToolset that generates PooledRestApiTools.
+
+    Takes the same arguments as OpenAPIToolset plus an optional `rate_limiter`
+    applied to every operation, and an optional `compiled_path` of the spec's
+    precompiled artifact.
+    """
+
+    def __init__(
+        self, *, rate_limiter: Optional[ProviderLimiter] = None, compiled_path: Optional[str] = None, **kwargs
+    ):
+        # Read by _parse, which OpenAPIToolset.__init__ calls
+        self._compiled_path = compiled_path
+        super().__init__(**kwargs)
+        for tool in self._tools:
+            tool.rate_limiter = rate_limiter
+
+    def _parse(self, openapi_spec_dict: Dict[str, Any]) -> List[RestApiTool]:
+        compiled = load_compiled_spec(openapi_spec_dict, self._compiled_path) if self._compiled_path else None
+        operations = compiled.operations if compiled else OpenApiSpecParser().parse(openapi_spec_dict)
+        tools = []
+        for operation in operations:
+            tool = PooledRestApiTool.from_parsed_operation(operation)
+            if compiled:
+                tool.declaration = compiled.declarations.get(tool.name)
+            logger.info(f"{'Loaded compiled' if compiled else 'Parsed'} pooled tool: {tool.name}")
+            tools.append(tool)
+        return tools
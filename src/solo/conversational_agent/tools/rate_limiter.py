@@ -0,0 +1,237 @@
+# tools/rate_limiter.py
+"""
+Per-provider rate limits and daily quota budgets for outbound API calls.
+
+Every Yelp, Foursquare and BestTime request first takes a slot from its
+provider's limiter:
+
+- a token bucket smooths bursts from the parallel enrichment fan-out down to
+  the provider's QPS limit, waiting up to RATE_LIMIT_MAX_WAIT_S for a token;
+- a daily budget, counted per UTC day in SQLite (QUOTA_DB_PATH), stops calls
+  once the day's quota is spent, so one busy worker cannot burn the credits
+  of all the others.
+
+A call that cannot get a slot is not sent. Callers then fall back to cached
+data, or to the same null entry they produce for an unmatched restaurant.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from conversational_agent.config.settings import (
+    BESTTIME_DAILY_QUOTA,
+    BESTTIME_RATE_LIMIT_QPS,
+    FSQ_DAILY_QUOTA,
+    FSQ_RATE_LIMIT_QPS,
+    QUOTA_DB_PATH,
+    RATE_LIMIT_MAX_WAIT_S,
+    YELP_DAILY_QUOTA,
+    YELP_RATE_LIMIT_QPS,
+)
+
+logger = logging.getLogger(__name__)
+
+# provider -> (requests per second, daily quota); 0 disables either limit
+PROVIDER_LIMITS = {
+    "yelp": (YELP_RATE_LIMIT_QPS, YELP_DAILY_QUOTA),
+    "fsq": (FSQ_RATE_LIMIT_QPS, FSQ_DAILY_QUOTA),
+    "besttime": (BESTTIME_RATE_LIMIT_QPS, BESTTIME_DAILY_QUOTA),
+}
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a provider's rate limit or daily quota leaves no slot for a call."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+# ===================================================================
+# TOKEN BUCKET
+# ===================================================================
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate_per_s`, holding at most `burst` tokens.
+
+    Callers reserve a token up front (the balance may go negative) and then
+    sleep until it is theirs, so concurrent callers are spaced out in FIFO
+    order without polling.
+    """
+
+    def __init__(self, rate_per_s: float, burst: Optional[float] = None):
+        self.rate_per_s = rate_per_s
+        self.burst = burst or max(1.0, rate_per_s)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait_s: float) -> Optional[float]:
+        """Take a token; returns the seconds to wait before using it, or None if that exceeds max_wait_s."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_s)
+            self._updated_at = now
+            wait_s = max(0.0, (1.0 - self._tokens) / self.rate_per_s)
+            if wait_s > max_wait_s:
+                return None
+            self._tokens -= 1.0
+            return wait_s
+
+    async def acquire(self, max_wait_s: float) -> bool:
+        wait_s = self.reserve(max_wait_s)
+        if wait_s is None:
+            return False
+        if wait_s > 0:
+            await asyncio.sleep(wait_s)
+        return True
+
+
+# ===================================================================
+# DAILY QUOTAS
+# ===================================================================
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class DailyQuotaStore:
+    """SQLite counters of calls made per provider per UTC day; shareable between workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS api_quota ("
+            " provider TEXT NOT NULL,"
+            " day TEXT NOT NULL,"
+            " used INTEGER NOT NULL,"
+            " PRIMARY KEY (provider, day))"
+        )
+        self._conn.commit()
+
+    def try_consume(self, provider: str, limit: int) -> bool:
+        """Count one call against today's budget; False (and nothing counted) if it is spent."""
+        day = _utc_day()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO api_quota (provider, day, used) VALUES (?, ?, 0)", (provider, day)
+            )
+            cursor = self._conn.execute(
+                "UPDATE api_quota SET used = used + 1 WHERE provider = ? AND day = ? AND used < ?",
+                (provider, day, limit),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def refund(self, provider: str) -> None:
+        """Give back a call counted by try_consume that was never sent."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE api_quota SET used = used - 1 WHERE provider = ? AND day = ? AND used > 0",
+                (provider, _utc_day()),
+            )
+            self._conn.commit()
+
+    def used(self, provider: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM api_quota WHERE provider = ? AND day = ?", (provider, _utc_day())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def prune(self, keep_days: int = 7) -> None:
+        """Drop counters older than `keep_days`; ISO dates compare correctly as strings."""
+        cutoff = datetime.fromtimestamp(time.time() - keep_days * 86400, timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            self._conn.execute("DELETE FROM api_quota WHERE day < ?", (cutoff,))
+            self._conn.commit()
+
+
+_quota_store: Optional[DailyQuotaStore] = None
+_quota_store_lock = threading.Lock()
+
+
+def get_quota_store() -> DailyQuotaStore:
+    """Return the process-wide quota store (in memory if no path is configured)."""
+    global _quota_store
+    with _quota_store_lock:
+        if _quota_store is None:
+            if not QUOTA_DB_PATH:
+                logger.warning("⚠️ QUOTA_DB_PATH is empty: daily quotas are counted per process and reset on restart")
+            try:
+                _quota_store = DailyQuotaStore(QUOTA_DB_PATH or ":memory:")
+                _quota_store.prune()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Quota store could not open {QUOTA_DB_PATH}, counting in memory only: {e}")
+                _quota_store = DailyQuotaStore(":memory:")
+        return _quota_store
+
+
+# ===================================================================
+# PROVIDER LIMITERS
+# ===================================================================
+
+class ProviderLimiter:
+    """Rate limit plus daily budget for one provider."""
+
+    def __init__(self, provider: str, rate_per_s: float, daily_quota: int, max_wait_s: float = RATE_LIMIT_MAX_WAIT_S):
+        self.provider = provider
+        self.bucket = TokenBucket(rate_per_s) if rate_per_s > 0 else None
+        self.daily_quota = daily_quota
+        self.max_wait_s = max_wait_s
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot for one call.
+
+        Raises:
+            QuotaExceededError: the daily budget is spent, or the rate limit
+                would delay the call by more than max_wait_s.
+        """
+        # Budget first, so calls that will be refused anyway don't queue for a token
+        if self.daily_quota > 0 and not get_quota_store().try_consume(self.provider, self.daily_quota):
+            self._reject("daily quota exhausted")
+        if self.bucket is not None and not await self.bucket.acquire(self.max_wait_s):
+            if self.daily_quota > 0:
+                get_quota_store().refund(self.provider)
+            self._reject("rate limit exceeded")
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        logger.warning(f"⚠️ {self.provider} call skipped: {reason}")
+        raise QuotaExceededError(self.provider, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "used_today": get_quota_store().used(self.provider) if self.daily_quota > 0 else None,
+            "daily_quota": self.daily_quota or None,
+            "rejected": self.rejected,
+        }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> ProviderLimiter:
+    """Return the process-wide limiter for a provider in PROVIDER_LIMITS."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        rate_per_s, daily_quota = PROVIDER_LIMITS[provider]
+        limiter = _limiters[provider] = ProviderLimiter(provider, rate_per_s, daily_quota)
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Any]:
+    """Today's usage and rejected calls per provider."""
+    return {provider: limiter.stats() for provider, limiter in _limiters.items()}
@@ -0,0 +1,112 @@
+# tools/state_compaction.py
+"""
+Compact storage of the search and enrichment blobs kept in session state.
+
+Each prompt interpolates these blobs, and AgentTool copies them into the
+root session, so every extra field is paid for in tokens on every later
+turn. Agents store their outputs in a canonical compact form:
+
+- minified JSON (no whitespace, no ```json fences);
+- null and empty fields dropped (readers use .get(), so a missing field and
+  a null one are the same to them);
+- review texts capped at STATE_REVIEW_MAX_CHARS.
+
+When a new search starts, the previous search's outputs are cleared, so a
+stale blob is never carried into the next search's prompts.
+"""
+
+import logging
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from conversational_agent.config.settings import STATE_REVIEW_MAX_CHARS
+from conversational_agent.tools.enrichment_utils import dump_state_json, load_state_json
+
+logger = logging.getLogger(__name__)
+
+# Everything one search writes; cleared when the next search starts
+SEARCH_STATE_KEYS = (
+    "search_results",
+    "yelp_reviews_data",
+    "fsq_data",
+    "google_reviews_data",
+    "busyness_data",
+    "scored_recommendations",
+    "recommendation_prose",
+    "final_results",
+)
+# Lists whose entries carry a review `text`
+_REVIEW_LIST_KEYS = {"all_reviews", "reviews"}
+
+
+def _cap_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "…"
+
+
+def compact_value(value: Any, max_review_chars: int = STATE_REVIEW_MAX_CHARS, in_reviews: bool = False) -> Any:
+    """Drop null / empty fields recursively and cap review texts."""
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if in_reviews and key == "text" and isinstance(item, str):
+                item = _cap_text(item, max_review_chars)
+            else:
+                item = compact_value(item, max_review_chars, key in _REVIEW_LIST_KEYS)
+            if item not in (None, "", [], {}):
+                compacted[key] = item
+        return compacted
+    if isinstance(value, list):
+        return [compact_value(item, max_review_chars, in_reviews) for item in value]
+    return value
+
+
+def compact_state_json(value: Any) -> str:
+    """Canonical compact JSON for a state value (see module docstring)."""
+    return dump_state_json(compact_value(value))
+
+
+# ===================================================================
+# CALLBACKS
+# ===================================================================
+
+def compact_json_output(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """
+    After-model callback for LLM agents with a JSON output_key: rewrites the
+    final JSON answer in compact form before it is saved to state.
+    """
+    content = llm_response.content
+    if llm_response.partial or not content or not content.parts:
+        return None
+    if any(part.function_call for part in content.parts):
+        return None
+    text = "".join(part.text for part in content.parts if part.text and not part.thought)
+    data = load_state_json(text)
+    if not isinstance(data, (dict, list)):
+        return None
+
+    compacted = compact_state_json(data)
+    logger.info(f"✅ {callback_context.agent_name} output compacted from {len(text)} to {len(compacted)} chars")
+    return llm_response.model_copy(
+        update={"content": types.Content(role=content.role, parts=[types.Part(text=compacted)])}
+    )
+
+
+def clear_previous_search(callback_context: CallbackContext) -> None:
+    """
+    Before-agent callback for the search pipeline: drop the previous search's outputs.
+
+    State keys cannot be deleted through an event, so they are set to "": an
+    optional `{key?}` placeholder renders that as empty, where None would
+    render as the text "None".
+    """
+    state = callback_context.state
+    stale = [key for key in SEARCH_STATE_KEYS if state.get(key)]
+    for key in stale:
+        state[key] = ""
+    if stale:
+        logger.info(f"✅ {callback_context.agent_name} cleared previous search state: {stale}")
@@ -0,0 +1,338 @@
+# tools/telemetry.py
+"""
+Latency, token and error metrics for every agent, model call and tool call.
+
+`instrument_agents` attaches before/after agent, model and tool callbacks to
+an agent tree. Each step is recorded twice:
+
+- in in-process histograms, rendered in the Prometheus text format by
+  `render_metrics()` (served at /metrics by main.py);
+- as an OpenTelemetry span, nested under ADK's own `agent_run` /
+  `call_llm` / `execute_tool` spans, so it appears in whatever trace
+  exporter the app configures.
+
+Cache hit/miss counters of every TieredTTLCache are exported alongside, so a
+fast tool can be told apart from a cached one.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from opentelemetry import trace
+from opentelemetry.trace import Span, Status, StatusCode
+
+from conversational_agent.tools.ttl_cache import all_caches
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("forkcast")
+
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+# Steps still in flight after this long, or beyond this many, are ended as unfinished
+IN_FLIGHT_MAX_AGE_S = 900.0
+IN_FLIGHT_MAX_ENTRIES = 4096
+
+
+# ===================================================================
+# METRIC TYPES
+# ===================================================================
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with fixed label names (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # per series: [count per bucket..., count in +Inf, sum]
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = [(labels, list(series)) for labels, series in sorted(self._series.items())]
+        for labels, series in series_items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {int(cumulative)}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with fixed label names."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(v)}" for labels, v in items)
+        return lines
+
+
+AGENT_DURATION = Histogram(
+    "forkcast_agent_duration_seconds", "Wall time of one agent run.", ("agent",), LATENCY_BUCKETS_S
+)
+MODEL_DURATION = Histogram(
+    "forkcast_model_duration_seconds", "Wall time of one model call.", ("agent", "model"), LATENCY_BUCKETS_S
+)
+MODEL_TOKENS = Histogram(
+    "forkcast_model_tokens", "Tokens per model call.", ("agent", "model", "direction"), TOKEN_BUCKETS
+)
+TOOL_DURATION = Histogram(
+    "forkcast_tool_duration_seconds", "Wall time of one tool call, including cached answers.",
+    ("agent", "tool", "outcome"), LATENCY_BUCKETS_S
+)
+ERRORS = Counter("forkcast_errors_total", "Model and tool calls that returned an error.", ("agent", "kind", "name"))
+BRANCH_TIMEOUTS = Counter(
+    "forkcast_branch_timeouts_total", "Parallel branches cut off at their deadline.", ("agent",)
+)
+
+_METRICS = (AGENT_DURATION, MODEL_DURATION, MODEL_TOKENS, TOOL_DURATION, ERRORS, BRANCH_TIMEOUTS)
+
+
+# ===================================================================
+# CALLBACKS
+# ===================================================================
+
+# In-flight steps: key -> (start time, span, model name), oldest first. A step
+# that raised, or a branch cancelled mid-run, never reaches its after-callback;
+# _evict_stale() ends its span with an error status and drops the entry.
+_in_flight: "OrderedDict[tuple, Tuple[float, Span, str]]" = OrderedDict()
+
+
+def _end_unfinished(key: tuple, started: float, span: Span, now: float) -> None:
+    span.set_status(Status(StatusCode.ERROR, "never finished"))
+    span.end()
+    logger.warning(f"⚠️ {key[0]} step {key[-1]} never finished after {now - started:.0f}s; span ended")
+
+
+def _evict_stale(now: float) -> None:
+    while _in_flight:
+        key, (started, span, _) = next(iter(_in_flight.items()))
+        if now - started < IN_FLIGHT_MAX_AGE_S and len(_in_flight) <= IN_FLIGHT_MAX_ENTRIES:
+            return
+        del _in_flight[key]
+        _end_unfinished(key, started, span, now)
+
+
+def _start(key: tuple, span_name: str, attributes: Dict[str, Any], model: str = "") -> None:
+    now = time.perf_counter()
+    # The same step starting again (e.g. the next model call of an agent) means the last one raised
+    previous = _in_flight.pop(key, None)
+    if previous is not None:
+        _end_unfinished(key, previous[0], previous[1], now)
+    _in_flight[key] = (now, tracer.start_span(span_name, attributes=attributes), model)
+    _evict_stale(now)
+
+
+def _finish(key: tuple) -> Optional[Tuple[float, Span, str]]:
+    started = _in_flight.pop(key, None)
+    if started is None:
+        return None
+    return time.perf_counter() - started[0], started[1], started[2]
+
+
+def before_agent_metrics_callback(callback_context: CallbackContext) -> None:
+    name = callback_context.agent_name
+    _start(("agent", callback_context.invocation_id, name), f"forkcast.agent {name}", {"forkcast.agent": name})
+
+
+def after_agent_metrics_callback(callback_context: CallbackContext) -> None:
+    name = callback_context.agent_name
+    finished = _finish(("agent", callback_context.invocation_id, name))
+    if finished is None:
+        return
+    elapsed_s, span, _ = finished
+    AGENT_DURATION.observe(elapsed_s, name)
+    span.end()
+
+
+def record_branch_timeout(invocation_id: str, agent_name: str) -> None:
+    """Count a branch cut off by its deadline and close its agent span (its after-callback never runs)."""
+    BRANCH_TIMEOUTS.inc(agent_name)
+    finished = _finish(("agent", invocation_id, agent_name))
+    if finished is not None:
+        span = finished[1]
+        span.set_status(Status(StatusCode.ERROR, "deadline exceeded"))
+        span.end()
+
+
+def before_model_metrics_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    name = callback_context.agent_name
+    model = llm_request.model or ""
+    _start(
+        ("model", callback_context.invocation_id, name),
+        f"forkcast.model {name}",
+        {"forkcast.agent": name, "forkcast.model": model},
+        model,
+    )
+
+
+def after_model_metrics_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+    if llm_response.partial:
+        # Streaming: the call is over only at the final, aggregated response
+        return
+    name = callback_context.agent_name
+    finished = _finish(("model", callback_context.invocation_id, name))
+    if finished is None:
+        return
+    elapsed_s, span, model = finished
+    MODEL_DURATION.observe(elapsed_s, name, model)
+
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        input_tokens = usage.prompt_token_count or 0
+        output_tokens = usage.candidates_token_count or 0
+        MODEL_TOKENS.observe(input_tokens, name, model, "input")
+        MODEL_TOKENS.observe(output_tokens, name, model, "output")
+        span.set_attribute("forkcast.input_tokens", input_tokens)
+        span.set_attribute("forkcast.output_tokens", output_tokens)
+    if llm_response.error_code:
+        ERRORS.inc(name, "model", model)
+        span.set_status(Status(StatusCode.ERROR, f"{llm_response.error_code}: {llm_response.error_message}"))
+    span.end()
+
+
+def _is_error_response(response: Any) -> bool:
+    if not isinstance(response, dict):
+        return False
+    return "error" in response or str(response.get("status", "OK")).lower() == "error"
+
+
+def before_tool_metrics_callback(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> None:
+    _start(
+        ("tool", tool_context.function_call_id),
+        f"forkcast.tool {tool.name}",
+        {"forkcast.agent": tool_context.agent_name, "forkcast.tool": tool.name},
+    )
+
+
+def after_tool_metrics_callback(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> None:
+    finished = _finish(("tool", tool_context.function_call_id))
+    if finished is None:
+        return
+    elapsed_s, span, _ = finished
+    outcome = "error" if _is_error_response(tool_response) else "ok"
+    if isinstance(tool_response, dict) and tool_response.get("quota_exhausted"):
+        outcome = "quota_exhausted"
+    TOOL_DURATION.observe(elapsed_s, tool_context.agent_name, tool.name, outcome)
+    span.set_attribute("forkcast.outcome", outcome)
+    if outcome != "ok":
+        ERRORS.inc(tool_context.agent_name, "tool", tool.name)
+        span.set_status(Status(StatusCode.ERROR, outcome))
+    span.end()
+
+
+def _prepend(agent: BaseAgent, attribute: str, callback) -> None:
+    """Put `callback` first, so later callbacks that short-circuit cannot skip it."""
+    existing = getattr(agent, attribute)
+    if existing is None:
+        existing = []
+    elif not isinstance(existing, list):
+        existing = [existing]
+    if callback not in existing:
+        setattr(agent, attribute, [callback] + existing)
+
+
+def _walk(agent: BaseAgent) -> Iterable[BaseAgent]:
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def instrument_agents(*roots: BaseAgent) -> None:
+    """Attach the metrics callbacks to every agent under `roots` (idempotent)."""
+    for root in roots:
+        for agent in _walk(root):
+            _prepend(agent, "before_agent_callback", before_agent_metrics_callback)
+            _prepend(agent, "after_agent_callback", after_agent_metrics_callback)
+            if isinstance(agent, LlmAgent):
+                _prepend(agent, "before_model_callback", before_model_metrics_callback)
+                _prepend(agent, "after_model_callback", after_model_metrics_callback)
+                _prepend(agent, "before_tool_callback", before_tool_metrics_callback)
+                _prepend(agent, "after_tool_callback", after_tool_metrics_callback)
+
+
+# ===================================================================
+# EXPORT
+# ===================================================================
+
+def _render_cache_metrics() -> List[str]:
+    stats = sorted((cache.stats() for cache in all_caches()), key=lambda s: s["namespace"])
+    lines = [
+        "# HELP forkcast_cache_hits_total Response cache hits (memory or disk).",
+        "# TYPE forkcast_cache_hits_total counter",
+    ]
+    lines += [f'forkcast_cache_hits_total{{cache="{_escape(s["namespace"])}"}} {s["memory_hits"] + s["disk_hits"]}' for s in stats]
+    lines += [
+        "# HELP forkcast_cache_misses_total Response cache misses (not in memory or disk).",
+        "# TYPE forkcast_cache_misses_total counter",
+    ]
+    # A memory miss that is then found on disk counts as a hit
+    lines += [
+        f'forkcast_cache_misses_total{{cache="{_escape(s["namespace"])}"}} '
+        f'{s["memory_misses"] - s["disk_hits"]}'
+        for s in stats
+    ]
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_cache_metrics())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,330 @@
+# tools/ttl_cache.py
+"""
+Two-tier TTL cache for external API responses.
+
+An in-process LRU sits in front of an optional SQLite store. The SQLite file
+can be shared by every worker on a host, so a response fetched by one worker
+is reused by the others. Values must be JSON-serializable; each tier keeps
+hit/miss counters exposed through `stats()`.
+
+The SQLite tier never blocks the event loop on a write: set() queues the
+row and a writer thread commits queued rows in batches. Async callers read
+through aget(), which runs a disk lookup in a worker thread; get() is for
+synchronous callers. The writer thread also deletes expired rows when the
+store opens and every CACHE_PRUNE_INTERVAL_S, so the shared file does not
+keep every payload ever fetched.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from conversational_agent.config.settings import CACHE_PRUNE_INTERVAL_S
+
+logger = logging.getLogger(__name__)
+
+# Most rows the writer thread commits in one transaction
+_WRITE_BATCH_SIZE = 256
+
+
+# ===================================================================
+# IN-PROCESS LRU
+# ===================================================================
+
+class LRUTTLCache:
+    """Bounded LRU where every entry carries its own expiry time."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Return (expires_at, value) for a live entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ===================================================================
+# SQLITE STORE
+# ===================================================================
+
+class SQLiteTTLStore:
+    """
+    SQLite-backed key/value store with per-entry expiry.
+
+    Several caches can share one file; rows are separated by namespace.
+    Writes are queued and committed in batches by a writer thread; flush()
+    waits for the queue to drain. Between batches the writer thread prunes
+    expired rows every `prune_interval_s` (0 disables it).
+    """
+
+    def __init__(self, path: str, prune_interval_s: float = CACHE_PRUNE_INTERVAL_S):
+        self.path = path
+        self.prune_interval_s = prune_interval_s
+        # Prune once on open, then every prune_interval_s
+        self._next_prune = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ttl_cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+        self._writes: "queue.Queue[Optional[Tuple[str, str, str, float]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name=f"ttl-cache-writer:{path}", daemon=True)
+        self._writer.start()
+
+    def _prune_if_due(self) -> Optional[float]:
+        """Prune if the interval has elapsed; returns the seconds until the next prune (None if disabled)."""
+        if self.prune_interval_s <= 0:
+            return None
+        now = time.monotonic()
+        if now >= self._next_prune:
+            try:
+                removed = self.prune()
+                if removed:
+                    logger.info(f"✅ Cache store {self.path}: pruned {removed} expired rows")
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache store {self.path}: pruning failed: {e}")
+            self._next_prune = now + self.prune_interval_s
+        return max(0.0, self._next_prune - now)
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                item = self._writes.get(timeout=self._prune_if_due())
+            except queue.Empty:
+                continue
+            if item is None:
+                # Sentinel from close()
+                self._writes.task_done()
+                return
+            batch = [item]
+            while len(batch) < _WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO ttl_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                        batch,
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache store {self.path}: dropped {len(batch)} writes: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued write is committed."""
+        self._writes.join()
+
+    def get_entry(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ttl_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        """Queue a write; serialized now, so later changes to `value` are not stored."""
+        payload = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        self._writes.put((namespace, key, payload, expires_at))
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.execute("DELETE FROM ttl_cache WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+
+    def clear(self, namespace: str) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.execute("DELETE FROM ttl_cache WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Delete expired rows. Returns the number of rows removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM ttl_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.flush()
+        self._writes.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, SQLiteTTLStore] = {}
+_stores_lock = threading.Lock()
+# Every TieredTTLCache created in this process, for clear_all_caches()
+_caches: "weakref.WeakSet[TieredTTLCache]" = weakref.WeakSet()
+
+
+def get_sqlite_store(path: str) -> SQLiteTTLStore:
+    """Return the process-wide store for `path`, opening it on first use."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SQLiteTTLStore(path)
+        return store
+
+
+# ===================================================================
+# TIERED CACHE
+# ===================================================================
+
+class TieredTTLCache:
+    """
+    LRU in front of an optional SQLite store.
+
+    Reads check memory first, then disk; a disk hit is promoted into memory
+    with its remaining TTL. Writes go to both tiers (to disk through the
+    store's write queue).
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 512, db_path: Optional[str] = None):
+        self.namespace = namespace
+        self.memory = LRUTTLCache(max_entries)
+        self.disk: Optional[SQLiteTTLStore] = None
+        self.disk_hits = 0
+        self.disk_misses = 0
+        if db_path:
+            try:
+                self.disk = get_sqlite_store(db_path)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache '{namespace}' could not open {db_path}, using memory only: {e}")
+        _caches.add(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss. Blocks on a disk lookup; use aget() from async code."""
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry[1]
+        if self.disk is None:
+            return None
+        return self._get_from_disk(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for async callers: a disk lookup runs in a worker thread, off the event loop."""
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry[1]
+        if self.disk is None:
+            return None
+        return await asyncio.to_thread(self._get_from_disk, key)
+
+    def _get_from_disk(self, key: str) -> Optional[Any]:
+        try:
+            entry = self.disk.get_entry(self.namespace, key)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"⚠️ Cache '{self.namespace}' disk read failed: {e}")
+            entry = None
+        if entry is None:
+            self.disk_misses += 1
+            return None
+        self.disk_hits += 1
+        self.memory.set(key, entry[1], entry[0])
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        """Store a value in both tiers for `ttl_s` seconds."""
+        expires_at = time.time() + ttl_s
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            try:
+                self.disk.set(self.namespace, key, value, expires_at)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Cache '{self.namespace}' disk write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            try:
+                self.disk.delete(self.namespace, key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache '{self.namespace}' disk delete failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry of this cache from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            try:
+                self.disk.clear(self.namespace)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cache '{self.namespace}' disk clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per tier plus the overall hit ratio."""
+        hits = self.memory.hits + self.disk_hits
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "memory_misses": self.memory.misses,
+            "disk_hits": self.disk_hits,
+            "disk_misses": self.disk_misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def all_caches() -> List[TieredTTLCache]:
+    """Every live TieredTTLCache in the process."""
+    return list(_caches)
+
+
+def clear_all_caches() -> None:
+    """Empty every TieredTTLCache in the process, e.g. between cold-start benchmark runs."""
+    for cache in list(_caches):
+        cache.clear()